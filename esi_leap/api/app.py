@@ -16,7 +16,9 @@ from esi_leap.common.health import Health
 import pecan
 from pecan import hooks
 
+from esi_leap.common import policy
 import esi_leap.conf
+from esi_leap import resource_objects
 
 
 CONF = esi_leap.conf.CONF
@@ -31,6 +33,26 @@ class ContextHook(hooks.PecanHook):
         state.request.context = None
 
 
+class ResourceObjectHook(hooks.PecanHook):
+    """Fetch each resource at most once per request."""
+
+    def before(self, state):
+        resource_objects.start_identity_map()
+
+    def after(self, state):
+        resource_objects.clear_identity_map()
+
+
+class PolicyDecisionHook(hooks.PecanHook):
+    """Evaluate each policy check at most once per request."""
+
+    def before(self, state):
+        policy.start_decision_cache()
+
+    def after(self, state):
+        policy.clear_decision_cache()
+
+
 def get_pecan_config():
     cfg_dict = {
         "app": {
@@ -52,7 +74,7 @@ def setup_app(config=None):
 
     app = pecan.make_app(
         config.app.root,
-        hooks=lambda: [ContextHook()],
+        hooks=lambda: [ContextHook(), ResourceObjectHook(), PolicyDecisionHook()],
         debug=CONF.pecan.debug,
         static_root=config.app.static_root if CONF.pecan.debug else None,
         force_canonical=getattr(config.app, "force_canonical", True),
@@ -13,6 +13,10 @@
 # Borrowed from Ironic
 
 import json
+from urllib import parse
+
+from oslo_utils import strutils
+import wsme
 from wsme import types as wtypes
 
 
@@ -36,7 +40,30 @@ class JsonType(wtypes.UserType):
         return JsonType.validate(value)
 
 
+class BooleanType(wtypes.UserType):
+    """A simple boolean type."""
+
+    basetype = wtypes.text
+    name = "boolean"
+
+    @staticmethod
+    def validate(value):
+        try:
+            return strutils.bool_from_string(value, strict=True)
+        except ValueError as e:
+            raise wsme.exc.ClientSideError(str(e))
+
+    @staticmethod
+    def frombasetype(value):
+        if value is None:
+            return None
+        return BooleanType.validate(value)
+
+
 class Collection(wtypes.Base):
+    next = wtypes.text
+    """A link to retrieve the next subset of the collection"""
+
     @property
     def collection(self):
         return getattr(self, self._type)
@@ -45,16 +72,23 @@ class Collection(wtypes.Base):
         """Return whether collection has more items."""
         return len(self.collection) and len(self.collection) == limit
 
-    def get_next(self, limit, url=None, **kwargs):
-        if not self.has_next(limit):
-            return wtypes.Unset
+    def get_next(self, limit, url=None, marker=None, **kwargs):
+        """Return a link to the next subset of the collection.
+
+        :param marker: marker to resume from; if not given, the uuid of the
+                       last item is used when the collection is full
+        """
+        if marker is None:
+            if not self.has_next(limit):
+                return wtypes.Unset
+            marker = getattr(self.collection[-1], "uuid")
 
         url = url or self._type
-        q_args = "".join(["%s=%s&" % item for item in kwargs.items()])
+        q_args = "".join(["%s&" % parse.urlencode([item]) for item in kwargs.items()])
         next_args = "?%(args)slimit=%(limit)d&marker=%(marker)s" % {
             "args": q_args,
             "limit": limit,
-            "marker": getattr(self.collection[-1], "uuid"),
+            "marker": marker,
         }
 
         next_link = "%(url)s/v1/%(resource)s%(args)s" % {
@@ -66,4 +100,5 @@ class Collection(wtypes.Base):
         return next_link
 
 
+boolean = BooleanType()
 jsontype = JsonType()
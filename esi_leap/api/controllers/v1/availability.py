@@ -0,0 +1,175 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import datetime
+import pecan
+from pecan import rest
+import wsme
+from wsme import types as wtypes
+import wsmeext.pecan as wsme_pecan
+
+from esi_leap.api.controllers import base
+from esi_leap.api.controllers import types
+from esi_leap.api.controllers.v1 import utils
+from esi_leap.common import exception
+from esi_leap.common import statuses
+import esi_leap.conf
+from esi_leap.db import api as dbapi
+from esi_leap.objects import lease as lease_obj
+from esi_leap.resource_objects import get_resource_object
+from esi_leap.resource_objects import get_type
+
+CONF = esi_leap.conf.CONF
+
+
+class Conflict(base.ESILEAPBase):
+    source = wsme.wsattr(wtypes.text, readonly=True)
+    start_time = wsme.wsattr(datetime.datetime, readonly=True)
+    end_time = wsme.wsattr(datetime.datetime, readonly=True)
+
+    def __init__(self, **kwargs):
+        self.fields = ("source", "start_time", "end_time")
+        for field in self.fields:
+            setattr(self, field, kwargs.get(field, wtypes.Unset))
+
+
+class Availability(base.ESILEAPBase):
+    resource_type = wsme.wsattr(wtypes.text)
+    resource_uuid = wsme.wsattr(wtypes.text, mandatory=True)
+    start_time = wsme.wsattr(datetime.datetime, mandatory=True)
+    end_time = wsme.wsattr(datetime.datetime, mandatory=True)
+    available = wsme.wsattr(bool, readonly=True)
+    conflicts = wsme.wsattr([Conflict], readonly=True)
+
+    def __init__(self, **kwargs):
+        self.fields = (
+            "resource_type",
+            "resource_uuid",
+            "start_time",
+            "end_time",
+            "available",
+            "conflicts",
+        )
+        for field in self.fields:
+            setattr(self, field, kwargs.get(field, wtypes.Unset))
+
+
+class AvailabilityCollection(types.Collection):
+    availabilities = [Availability]
+
+    def __init__(self, **kwargs):
+        self._type = "availabilities"
+        self.availabilities = kwargs.get("availabilities", [])
+
+
+class AvailabilityController(rest.RestController):
+    @wsme_pecan.wsexpose(AvailabilityCollection, body=AvailabilityCollection)
+    def post(self, windows):
+        request = pecan.request.context
+        cdict = request.to_policy_values()
+        utils.policy_authorize("esi_leap:availability:check", cdict, cdict)
+
+        if len(windows.availabilities) > CONF.api.max_limit:
+            raise exception.AvailabilityTooManyWindows(
+                count=len(windows.availabilities), max_windows=CONF.api.max_limit
+            )
+
+        checks = []
+        for window in windows.availabilities:
+            window_dict = window.to_dict()
+            if "resource_type" not in window_dict:
+                window_dict["resource_type"] = CONF.api.default_resource_type
+            if window_dict["start_time"] >= window_dict["end_time"]:
+                raise exception.InvalidTimeRange(
+                    resource="an availability window",
+                    start_time=str(window_dict["start_time"]),
+                    end_time=str(window_dict["end_time"]),
+                )
+            resource = get_resource_object(
+                window_dict["resource_type"], window_dict["resource_uuid"]
+            )
+            window_dict["resource_uuid"] = resource.get_uuid()
+            checks.append(window_dict)
+
+        self._authorize_windows(cdict, request.project_id, checks)
+
+        conflicts = dbapi.resource_get_conflicts(
+            [
+                (c["resource_type"], c["resource_uuid"], c["start_time"], c["end_time"])
+                for c in checks
+            ]
+        )
+
+        availability_collection = AvailabilityCollection()
+        for check, window_conflicts in zip(checks, conflicts):
+            availability_collection.availabilities.append(
+                Availability(
+                    available=not window_conflicts,
+                    conflicts=[
+                        Conflict(source=source, start_time=start, end_time=end)
+                        for source, start, end in window_conflicts
+                    ],
+                    **check,
+                )
+            )
+
+        return availability_collection
+
+    @staticmethod
+    def _authorize_windows(cdict, project_id, checks):
+        """Check that the caller may see the offers and leases of every window.
+
+        Admins may check any resource. Others must own the resource, or hold
+        an active lease on it covering the whole window. Resources are
+        resolved with one get_many call and leases with one query per
+        resource type, however many windows there are.
+        """
+        try:
+            utils.policy_authorize("esi_leap:offer:offer_admin", cdict, cdict)
+            return
+        except exception.HTTPForbidden:
+            pass
+
+        uuids_by_type = collections.defaultdict(set)
+        for check in checks:
+            uuids_by_type[check["resource_type"]].add(check["resource_uuid"])
+
+        owned = set()
+        leases = collections.defaultdict(list)
+        for resource_type, uuids in uuids_by_type.items():
+            for uuid, info in get_type(resource_type).get_many(uuids).items():
+                if info["owner_project_id"] == project_id:
+                    owned.add((resource_type, uuid))
+            not_owned = [u for u in uuids if (resource_type, u) not in owned]
+            if not not_owned:
+                continue
+            filters = {
+                "project_id": project_id,
+                "resource_type": resource_type,
+                "resource_uuids": not_owned,
+                "status": [statuses.ACTIVE],
+                # sub-lessees may not look past their own lease
+                "parent_lease_uuid": None,
+            }
+            for lease in lease_obj.Lease.get_all(filters):
+                leases[(resource_type, lease.resource_uuid)].append(lease)
+
+        for check in checks:
+            key = (check["resource_type"], check["resource_uuid"])
+            if key in owned or any(
+                lease.start_time <= check["start_time"]
+                and lease.end_time >= check["end_time"]
+                for lease in leases[key]
+            ):
+                continue
+            raise exception.HTTPResourceForbidden(resource_type=key[0], resource=key[1])
@@ -46,6 +46,9 @@ class Event(base.ESILEAPBase):
             setattr(self, field, kwargs.get(field, wtypes.Unset))
 
 
+EVENT_FIELDS = tuple(attr.name for attr in wtypes.list_attributes(Event))
+
+
 class EventCollection(types.Collection):
     events = [Event]
 
@@ -62,6 +65,8 @@ class EventsController(rest.RestController):
         wtypes.text,
         wtypes.text,
         wtypes.text,
+        int,
+        int,
         wtypes.text,
     )
     def get_all(
@@ -72,10 +77,17 @@ class EventsController(rest.RestController):
         event_type=None,
         resource_type=None,
         resource_uuid=None,
+        limit=None,
+        marker=None,
+        fields=None,
     ):
         request = pecan.request.context
         cdict = request.to_policy_values()
 
+        limit = utils.validate_limit(limit)
+        # events have no computed fields, so there is no summary view
+        fields = utils.validate_fields(fields, None, EVENT_FIELDS, EVENT_FIELDS)
+
         try:
             utils.policy_authorize("esi_leap:offer:offer_admin", cdict, cdict)
         except exception.HTTPForbidden:
@@ -99,6 +111,9 @@ class EventsController(rest.RestController):
             "event_type": event_type,
             "resource_type": resource_type,
             "resource_uuid": resource_uuid,
+            "limit": limit,
+            "marker": marker,
+            "fields": utils.get_db_fields(fields, {}, required=("id",)),
         }
 
         # unpack iterator to tuple so we can use 'del'
@@ -110,17 +125,12 @@ class EventsController(rest.RestController):
         event_collection = EventCollection()
         event_collection.events = []
         for event in events:
-            e = Event(
-                id=event.id,
-                event_type=event.event_type,
-                event_time=event.event_time,
-                object_type=event.object_type,
-                object_uuid=event.object_uuid,
-                resource_type=event.resource_type,
-                resource_uuid=event.resource_uuid,
-                lessee_id=event.lessee_id,
-                owner_id=event.owner_id,
-            )
+            e = Event(**{f: getattr(event, f) for f in fields or EVENT_FIELDS})
             event_collection.events.append(e)
 
+        if len(events) == limit:
+            event_collection.next = utils.get_next_link(
+                event_collection, limit, events[-1].id
+            )
+
         return event_collection
@@ -25,7 +25,6 @@ from esi_leap.api.controllers import types
 from esi_leap.api.controllers.v1 import utils
 from esi_leap.common import constants
 from esi_leap.common import exception
-from esi_leap.common import ironic
 from esi_leap.common import keystone
 from esi_leap.common import statuses
 from esi_leap.common import utils as common_utils
@@ -35,6 +34,8 @@ from esi_leap.resource_objects import get_resource_object
 
 CONF = esi_leap.conf.CONF
 
+LEASE_SORT_KEYS = ("id", "uuid", "start_time", "end_time")
+
 
 class Lease(base.ESILEAPBase):
     name = wsme.wsattr(wtypes.text)
@@ -73,6 +74,20 @@ class Lease(base.ESILEAPBase):
             setattr(self, attr, kwargs.get(attr, wtypes.Unset))
 
 
+LEASE_FIELDS = tuple(attr.name for attr in wtypes.list_attributes(Lease))
+
+# columns each computed lease field is derived from
+LEASE_DERIVED_FIELDS = {
+    "project": ("project_id",),
+    "owner": ("owner_id",),
+    "resource": ("resource_type", "resource_uuid"),
+    "resource_class": ("resource_type", "resource_uuid"),
+    "resource_properties": ("resource_type", "resource_uuid"),
+}
+
+LEASE_SUMMARY_FIELDS = tuple(f for f in LEASE_FIELDS if f not in LEASE_DERIVED_FIELDS)
+
+
 class LeaseCollection(types.Collection):
     leases = [Lease]
 
@@ -103,6 +118,12 @@ class LeasesController(rest.RestController):
         wtypes.text,
         wtypes.text,
         wtypes.text,
+        int,
+        wtypes.text,
+        wtypes.text,
+        wtypes.text,
+        wtypes.text,
+        types.boolean,
     )
     def get_all(
         self,
@@ -116,10 +137,28 @@ class LeasesController(rest.RestController):
         resource_type=None,
         resource_uuid=None,
         resource_class=None,
+        limit=None,
+        marker=None,
+        sort_key=None,
+        sort_dir=None,
+        fields=None,
+        detail=None,
     ):
         request = pecan.request.context
         cdict = request.to_policy_values()
 
+        limit = utils.validate_limit(limit)
+        sort_key = utils.validate_sort_key(sort_key, LEASE_SORT_KEYS)
+        sort_dir = utils.validate_sort_dir(sort_dir)
+        fields = utils.validate_fields(
+            fields, detail, LEASE_FIELDS, LEASE_SUMMARY_FIELDS
+        )
+
+        # filtering by resource class needs it even if it is not returned
+        needed_fields = fields
+        if fields is not None and resource_class:
+            needed_fields = fields + ("resource_class",)
+
         if project_id is not None:
             project_id = keystone.get_project_uuid_from_ident(project_id)
 
@@ -146,39 +185,80 @@ class LeasesController(rest.RestController):
             resource_uuid=resource_uuid,
         )
 
+        filters["limit"] = limit
+        for k, v in (
+            ("marker", marker),
+            ("sort_key", sort_key),
+            ("sort_dir", sort_dir),
+        ):
+            if v is not None:
+                filters[k] = v
+
+        db_fields = utils.get_db_fields(needed_fields, LEASE_DERIVED_FIELDS)
+        if db_fields is not None:
+            filters["fields"] = db_fields
+
+        def get_leases_with_added_info(leases):
+            return LeasesController._get_leases_with_added_info(
+                leases, fields, needed_fields, resource_class
+            )
+
         lease_collection = LeaseCollection()
+
+        if CONF.api.stream_list_responses:
+            chunks = lease_obj.Lease.get_all_chunks(
+                filters, CONF.api.stream_chunk_size, request
+            )
+            return utils.stream_collection(
+                lease_collection, Lease, chunks, get_leases_with_added_info, limit
+            )
+
         leases = lease_obj.Lease.get_all(filters, request)
 
-        lease_collection.leases = []
+        lease_collection.leases = [
+            Lease(**lease) for lease in get_leases_with_added_info(leases)
+        ]
+
+        if len(leases) == limit:
+            lease_collection.next = utils.get_next_link(
+                lease_collection, limit, leases[-1].uuid
+            )
 
-        if len(leases) > 0:
-            project_list = None
-            node_list = None
+        return lease_collection
 
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                f1 = executor.submit(ironic.get_node_list)
+    @staticmethod
+    def _get_leases_with_added_info(leases, fields, needed_fields, resource_class):
+        if not leases:
+            return []
+
+        project_list = None
+        resource_info = None
+
+        # only fetch what the requested fields are computed from
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            f1 = f2 = None
+            if utils.fields_requested(needed_fields, *utils.RESOURCE_FIELDS):
+                f1 = executor.submit(utils.get_resource_info, leases)
+            if utils.fields_requested(needed_fields, "project", "owner"):
                 f2 = executor.submit(keystone.get_project_list)
-                node_list = f1.result()
+            if f1 is not None:
+                resource_info = f1.result()
+            if f2 is not None:
                 project_list = f2.result()
 
+        leases_with_added_info = [
+            utils.lease_get_dict_with_added_info(
+                lease, project_list, resource_info, needed_fields
+            )
+            for lease in leases
+        ]
+        if resource_class:
             leases_with_added_info = [
-                Lease(
-                    **utils.lease_get_dict_with_added_info(
-                        lease, project_list, node_list
-                    )
-                )
-                for lease in leases
+                lease
+                for lease in leases_with_added_info
+                if lease.get("resource_class") == resource_class
             ]
-            if resource_class:
-                lease_collection.leases = [
-                    lease
-                    for lease in leases_with_added_info
-                    if lease.resource_class == resource_class
-                ]
-            else:
-                lease_collection.leases = leases_with_added_info
-
-        return lease_collection
+        return [utils.select_fields(lease, fields) for lease in leases_with_added_info]
 
     @wsme_pecan.wsexpose(Lease, body=Lease, status_code=http_client.CREATED)
     def post(self, new_lease):
@@ -232,6 +312,7 @@ class LeasesController(rest.RestController):
 
         lease = lease_obj.Lease(**lease_dict)
         lease.create(request)
+        utils.notify_manager_lease(request, "fulfill_lease", lease)
         return Lease(**utils.lease_get_dict_with_added_info(lease))
 
     @wsme_pecan.wsexpose(Lease, wtypes.text, body={wtypes.text: wtypes.text})
@@ -252,6 +333,7 @@ class LeasesController(rest.RestController):
         )
         updates = {"end_time": new_end_time}
         lease.update(updates, request)
+        utils.notify_manager_lease(request, "expire_lease", lease)
 
         return Lease(**utils.lease_get_dict_with_added_info(lease))
 
@@ -263,7 +345,10 @@ class LeasesController(rest.RestController):
             request, "esi_leap:lease:get", lease_id, statuses.LEASE_CAN_DELETE
         )
 
-        lease.cancel(request)
+        # the manager cancels the lease; if the cast is lost, its periodic
+        # job picks up leases in wait cancel status
+        lease.request_cancel(request)
+        utils.notify_manager_lease(request, "cancel_lease", lease)
 
     @staticmethod
     def _lease_get_all_authorize_filters(
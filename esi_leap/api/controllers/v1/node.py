@@ -10,6 +10,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import concurrent.futures
 from datetime import datetime
 import pecan
@@ -20,15 +21,32 @@ import wsmeext.pecan as wsme_pecan
 
 from esi_leap.api.controllers import base
 from esi_leap.api.controllers import types
+from esi_leap.api.controllers.v1 import utils
 from esi_leap.common import ironic
 from esi_leap.common import keystone
 from esi_leap.common import statuses
 import esi_leap.conf
+from esi_leap.db import api as dbapi
 from esi_leap.objects import lease as lease_obj
 from esi_leap.objects import offer as offer_obj
 
 CONF = esi_leap.conf.CONF
 
+# Ironic node fields rendered by Node
+NODE_FIELDS = (
+    "uuid",
+    "name",
+    "owner",
+    "lessee",
+    "maintenance",
+    "provision_state",
+    "target_provision_state",
+    "power_state",
+    "target_power_state",
+    "properties",
+    "resource_class",
+)
+
 
 class Node(base.ESILEAPBase):
     name = wsme.wsattr(wtypes.text)
@@ -69,6 +87,32 @@ class Node(base.ESILEAPBase):
             setattr(self, field, kwargs.get(field, wtypes.Unset))
 
 
+NODE_API_FIELDS = tuple(attr.name for attr in wtypes.list_attributes(Node))
+
+# Ironic fields each computed node field is derived from; offer_uuid and
+# the future offers and leases come from the database instead
+NODE_DERIVED_FIELDS = {
+    "lease_uuid": ("properties",),
+    "offer_uuid": (),
+    "future_offers": (),
+    "future_leases": (),
+}
+
+# node fields copied from Ironic as they are
+NODE_PLAIN_FIELDS = (
+    "name",
+    "uuid",
+    "provision_state",
+    "target_provision_state",
+    "power_state",
+    "target_power_state",
+    "resource_class",
+)
+
+# fields that need neither Keystone nor the database
+NODE_SUMMARY_FIELDS = NODE_PLAIN_FIELDS + ("maintenance", "properties", "lease_uuid")
+
+
 class NodeCollection(types.Collection):
     nodes = [Node]
 
@@ -78,10 +122,38 @@ class NodeCollection(types.Collection):
 
 
 class NodesController(rest.RestController):
-    @wsme_pecan.wsexpose(NodeCollection, wtypes.text, wtypes.text, wtypes.text)
-    def get_all(self, resource_class=None, owner=None, lessee=None):
+    @wsme_pecan.wsexpose(
+        NodeCollection,
+        wtypes.text,
+        wtypes.text,
+        wtypes.text,
+        int,
+        wtypes.text,
+        wtypes.text,
+        wtypes.text,
+        wtypes.text,
+        types.boolean,
+    )
+    def get_all(
+        self,
+        resource_class=None,
+        owner=None,
+        lessee=None,
+        limit=None,
+        marker=None,
+        sort_key=None,
+        sort_dir=None,
+        fields=None,
+        detail=None,
+    ):
         context = pecan.request.context
 
+        limit = utils.validate_limit(limit)
+        sort_dir = utils.validate_sort_dir(sort_dir)
+        fields = utils.validate_fields(
+            fields, detail, NODE_API_FIELDS, NODE_SUMMARY_FIELDS
+        )
+
         if owner is not None:
             owner = keystone.get_project_uuid_from_ident(owner)
         if lessee is not None:
@@ -91,65 +163,147 @@ class NodesController(rest.RestController):
             "resource_class": resource_class,
             "owner": owner,
             "lessee": lessee,
+            "limit": limit,
+            "marker": marker,
+            "sort_key": sort_key,
+            "sort_dir": sort_dir,
         }
 
+        ironic_fields = NODE_FIELDS
+        if fields is not None:
+            ironic_fields = utils.get_db_fields(
+                fields, NODE_DERIVED_FIELDS, required=("uuid",)
+            )
+
         nodes = None
         project_list = None
 
         with concurrent.futures.ThreadPoolExecutor() as executor:
             filter_args = {k: v for k, v in filter_args.items() if v is not None}
-            f1 = executor.submit(ironic.get_node_list, context, **filter_args)
-            f2 = executor.submit(keystone.get_project_list)
+            f1 = executor.submit(
+                ironic.get_node_list, context, fields=ironic_fields, **filter_args
+            )
+            f2 = None
+            if utils.fields_requested(fields, "owner", "lessee"):
+                f2 = executor.submit(keystone.get_project_list)
             nodes = f1.result()
-            project_list = f2.result()
+            if f2 is not None:
+                project_list = f2.result()
 
         node_collection = NodeCollection()
 
         now = datetime.now()
 
-        offers = offer_obj.Offer.get_all({"status": [statuses.AVAILABLE]}, context)
+        want_offers = utils.fields_requested(
+            fields, "offer_uuid", "future_offers", "future_leases"
+        )
 
-        leases = lease_obj.Lease.get_all({"status": [statuses.CREATED]}, context)
+        offers_by_node = None
+        leases_by_node = None
+        if want_offers:
+            offers_by_node, leases_by_node = self._get_offers_and_leases(nodes, context)
 
         for node in nodes:
-            f_offer_uuids = []
-            current_offer = None
-
-            node_offers = [
-                offer for offer in offers if offer.resource_uuid == node.uuid
-            ]
-
-            for offer in node_offers:
-                if offer.start_time > now:
-                    f_offer_uuids.append(offer.uuid)
-                elif offer.end_time >= now:
-                    current_offer = offer
-
-            f_lease_uuids = [
-                lease.uuid for lease in leases if lease.resource_uuid == node.uuid
-            ]
-
             n = Node(
-                name=node.name,
-                uuid=node.uuid,
-                provision_state=node.provision_state,
-                target_provision_state=node.target_provision_state,
-                power_state=node.power_state,
-                target_power_state=node.target_power_state,
-                resource_class=node.resource_class,
-                properties=ironic.get_condensed_properties(node.properties),
-                maintenance=str(node.maintenance),
-                owner=keystone.get_project_name(node.owner, project_list),
-                lessee=keystone.get_project_name(node.lessee, project_list),
-                future_offers=f_offer_uuids,
-                future_leases=f_lease_uuids,
+                **{
+                    f: getattr(node, f)
+                    for f in NODE_PLAIN_FIELDS
+                    if utils.fields_requested(fields, f)
+                }
             )
+            if utils.fields_requested(fields, "properties"):
+                n.properties = ironic.get_condensed_properties(node.properties)
+            if utils.fields_requested(fields, "maintenance"):
+                n.maintenance = str(node.maintenance)
+            if utils.fields_requested(fields, "owner"):
+                n.owner = keystone.get_project_name(node.owner, project_list)
+            if utils.fields_requested(fields, "lessee"):
+                n.lessee = keystone.get_project_name(node.lessee, project_list)
+            if utils.fields_requested(fields, "lease_uuid"):
+                if "lease_uuid" in node.properties:
+                    n.lease_uuid = node.properties["lease_uuid"]
 
-            if current_offer:
-                n.offer_uuid = current_offer.uuid
-            if "lease_uuid" in node.properties:
-                n.lease_uuid = node.properties["lease_uuid"]
+            if want_offers:
+                self._add_offers_and_leases(
+                    n,
+                    offers_by_node.get(node.uuid, []),
+                    leases_by_node.get(node.uuid, []),
+                    now,
+                    fields,
+                )
 
             node_collection.nodes.append(n)
 
+        if len(nodes) == limit:
+            node_collection.next = utils.get_next_link(
+                node_collection, limit, nodes[-1].uuid
+            )
+
         return node_collection
+
+    @staticmethod
+    def _get_offers_and_leases(nodes, context):
+        """Return the available offers and created leases of nodes.
+
+        :returns: tuple of dicts mapping node uuid to its offers and to its
+                  leases
+        """
+        offers_by_node = collections.defaultdict(list)
+        leases_by_node = collections.defaultdict(list)
+        uuids = [node.uuid for node in nodes]
+        if not uuids:
+            return offers_by_node, leases_by_node
+
+        # with the interval index each node is looked up in memory, which
+        # may lag writes by other processes (see interval_index_enabled);
+        # otherwise query the offers and leases of these nodes only
+        if CONF.api.interval_index_enabled:
+            for uuid in uuids:
+                for i in dbapi.resource_get_intervals("ironic_node", uuid):
+                    if i.source == "offer":
+                        offers_by_node[uuid].append(i)
+                    elif i.status == statuses.CREATED:
+                        leases_by_node[uuid].append(i)
+            return offers_by_node, leases_by_node
+
+        offers = offer_obj.Offer.get_all(
+            {
+                "status": [statuses.AVAILABLE],
+                "resource_type": "ironic_node",
+                "resource_uuids": uuids,
+                "fields": ["uuid", "resource_uuid", "start_time", "end_time"],
+            },
+            context,
+        )
+        leases = lease_obj.Lease.get_all(
+            {
+                "status": [statuses.CREATED],
+                "resource_type": "ironic_node",
+                "resource_uuids": uuids,
+                "fields": ["uuid", "resource_uuid"],
+            },
+            context,
+        )
+        for offer in offers:
+            offers_by_node[offer.resource_uuid].append(offer)
+        for lease in leases:
+            leases_by_node[lease.resource_uuid].append(lease)
+        return offers_by_node, leases_by_node
+
+    @staticmethod
+    def _add_offers_and_leases(n, node_offers, node_leases, now, fields):
+        f_offer_uuids = []
+        current_offer = None
+
+        for offer in node_offers:
+            if offer.start_time > now:
+                f_offer_uuids.append(offer.uuid)
+            elif offer.end_time >= now:
+                current_offer = offer
+
+        if utils.fields_requested(fields, "future_offers"):
+            n.future_offers = f_offer_uuids
+        if utils.fields_requested(fields, "future_leases"):
+            n.future_leases = [lease.uuid for lease in node_leases]
+        if current_offer and utils.fields_requested(fields, "offer_uuid"):
+            n.offer_uuid = current_offer.uuid
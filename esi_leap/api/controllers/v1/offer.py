@@ -25,7 +25,6 @@ from esi_leap.api.controllers import types
 from esi_leap.api.controllers.v1 import lease
 from esi_leap.api.controllers.v1 import utils
 from esi_leap.common import exception
-from esi_leap.common import ironic
 from esi_leap.common import keystone
 from esi_leap.common import statuses
 from esi_leap.common import utils as common_utils
@@ -36,6 +35,8 @@ from esi_leap.resource_objects import get_resource_object
 
 CONF = esi_leap.conf.CONF
 
+OFFER_SORT_KEYS = ("id", "uuid", "start_time", "end_time")
+
 
 class Offer(base.ESILEAPBase):
     name = wsme.wsattr(wtypes.text)
@@ -72,6 +73,21 @@ class Offer(base.ESILEAPBase):
             setattr(self, attr, kwargs.get(attr, wtypes.Unset))
 
 
+OFFER_FIELDS = tuple(attr.name for attr in wtypes.list_attributes(Offer))
+
+# columns each computed offer field is derived from
+OFFER_DERIVED_FIELDS = {
+    "availabilities": ("status", "start_time", "end_time"),
+    "project": ("project_id",),
+    "lessee": ("lessee_id",),
+    "resource": ("resource_type", "resource_uuid"),
+    "resource_class": ("resource_type", "resource_uuid"),
+    "resource_properties": ("resource_type", "resource_uuid"),
+}
+
+OFFER_SUMMARY_FIELDS = tuple(f for f in OFFER_FIELDS if f not in OFFER_DERIVED_FIELDS)
+
+
 class OfferCollection(types.Collection):
     offers = [Offer]
 
@@ -107,6 +123,12 @@ class OffersController(rest.RestController):
         datetime.datetime,
         datetime.datetime,
         wtypes.text,
+        int,
+        wtypes.text,
+        wtypes.text,
+        wtypes.text,
+        wtypes.text,
+        types.boolean,
     )
     def get_all(
         self,
@@ -119,11 +141,29 @@ class OffersController(rest.RestController):
         available_start_time=None,
         available_end_time=None,
         status=None,
+        limit=None,
+        marker=None,
+        sort_key=None,
+        sort_dir=None,
+        fields=None,
+        detail=None,
     ):
         request = pecan.request.context
         cdict = request.to_policy_values()
         utils.policy_authorize("esi_leap:offer:get_all", cdict, cdict)
 
+        limit = utils.validate_limit(limit)
+        sort_key = utils.validate_sort_key(sort_key, OFFER_SORT_KEYS)
+        sort_dir = utils.validate_sort_dir(sort_dir)
+        fields = utils.validate_fields(
+            fields, detail, OFFER_FIELDS, OFFER_SUMMARY_FIELDS
+        )
+
+        # filtering by resource class needs it even if it is not returned
+        needed_fields = fields
+        if fields is not None and resource_class:
+            needed_fields = fields + ("resource_class",)
+
         if project_id is not None:
             project_id = keystone.get_project_uuid_from_ident(project_id)
 
@@ -181,6 +221,11 @@ class OffersController(rest.RestController):
             "end_time": end_time,
             "available_start_time": available_start_time,
             "available_end_time": available_end_time,
+            "limit": limit,
+            "marker": marker,
+            "sort_key": sort_key,
+            "sort_dir": sort_dir,
+            "fields": utils.get_db_fields(needed_fields, OFFER_DERIVED_FIELDS),
         }
 
         # unpack iterator to tuple so we can use 'del'
@@ -188,36 +233,75 @@ class OffersController(rest.RestController):
             if v is None:
                 del filters[k]
 
+        def get_offers_with_added_info(offers):
+            return OffersController._get_offers_with_added_info(
+                offers, fields, needed_fields, resource_class
+            )
+
         offer_collection = OfferCollection()
+
+        if CONF.api.stream_list_responses:
+            chunks = offer_obj.Offer.get_all_chunks(
+                filters, CONF.api.stream_chunk_size, request
+            )
+            return utils.stream_collection(
+                offer_collection, Offer, chunks, get_offers_with_added_info, limit
+            )
+
         offers = offer_obj.Offer.get_all(filters, request)
 
-        offer_collection.offers = []
+        offer_collection.offers = [
+            Offer(**o) for o in get_offers_with_added_info(offers)
+        ]
 
-        if len(offers) > 0:
-            project_list = None
-            node_list = None
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                f1 = executor.submit(ironic.get_node_list)
+        if len(offers) == limit:
+            offer_collection.next = utils.get_next_link(
+                offer_collection, limit, offers[-1].uuid
+            )
+
+        return offer_collection
+
+    @staticmethod
+    def _get_offers_with_added_info(offers, fields, needed_fields, resource_class):
+        if not offers:
+            return []
+
+        project_list = None
+        resource_info = None
+        availabilities = {}
+
+        # only fetch what the requested fields are computed from
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            f1 = f2 = None
+            if utils.fields_requested(needed_fields, *utils.RESOURCE_FIELDS):
+                f1 = executor.submit(utils.get_resource_info, offers)
+            if utils.fields_requested(needed_fields, "project", "lessee"):
                 f2 = executor.submit(keystone.get_project_list)
-                node_list = f1.result()
+            if f1 is not None:
+                resource_info = f1.result()
+            if f2 is not None:
                 project_list = f2.result()
 
+        if utils.fields_requested(needed_fields, "availabilities"):
+            availabilities = offer_obj.Offer.get_availabilities_by_offer(offers)
+
+        offers_with_added_info = [
+            utils.offer_get_dict_with_added_info(
+                o,
+                project_list,
+                resource_info,
+                availabilities.get(o.uuid),
+                needed_fields,
+            )
+            for o in offers
+        ]
+        if resource_class:
             offers_with_added_info = [
-                Offer(
-                    **utils.offer_get_dict_with_added_info(o, project_list, node_list)
-                )
-                for o in offers
+                o
+                for o in offers_with_added_info
+                if o.get("resource_class") == resource_class
             ]
-            if resource_class:
-                offer_collection.offers = [
-                    o
-                    for o in offers_with_added_info
-                    if o.resource_class == resource_class
-                ]
-            else:
-                offer_collection.offers = offers_with_added_info
-
-        return offer_collection
+        return [utils.select_fields(o, fields) for o in offers_with_added_info]
 
     @wsme_pecan.wsexpose(Offer, body=Offer, status_code=http_client.CREATED)
     def post(self, new_offer):
@@ -268,6 +352,7 @@ class OffersController(rest.RestController):
 
         o = offer_obj.Offer(**offer_dict)
         o.create()
+        utils.notify_manager_reschedule(request)
         return Offer(**utils.offer_get_dict_with_added_info(o))
 
     @wsme_pecan.wsexpose(Offer, wtypes.text)
@@ -326,4 +411,5 @@ class OffersController(rest.RestController):
 
         new_lease = lease_obj.Lease(**lease_dict)
         new_lease.create(request)
+        utils.notify_manager_lease(request, "fulfill_lease", new_lease)
         return lease.Lease(**utils.lease_get_dict_with_added_info(new_lease))
@@ -10,16 +10,33 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from oslo_log import log as logging
 from oslo_policy import policy as oslo_policy
 from oslo_utils import uuidutils
+import pecan
+import wsme
+import wsme.rest.json
 
+import collections
 import datetime
+import json
 
 from esi_leap.common import exception
 from esi_leap.common import keystone
 from esi_leap.common import policy
+import esi_leap.conf
+from esi_leap.manager import rpcapi
 from esi_leap.objects import lease as lease_obj
 from esi_leap.objects import offer as offer_obj
+from esi_leap.resource_objects import get_type
+
+CONF = esi_leap.conf.CONF
+LOG = logging.getLogger(__name__)
+
+_cached_manager_rpcapi = None
+
+# fields of leases and offers computed from their resource
+RESOURCE_FIELDS = ("resource", "resource_class", "resource_properties")
 
 
 def check_resource_admin(cdict, resource, project_id):
@@ -154,29 +171,86 @@ def check_offer_lessee(cdict, offer):
         )
 
 
-def offer_get_dict_with_added_info(offer, project_list=None, node_list=None):
-    resource = offer.resource_object()
+def get_resource_info(objects):
+    """Fetch listing details for the resources of leases or offers.
+
+    Only the resource types and uuids present in objects are looked up,
+    with one get_many call per resource type.
+
+    :returns: dict mapping (resource_type, resource_uuid) to the details
+              returned by get_many
+    """
+    uuids_by_type = collections.defaultdict(set)
+    for o in objects:
+        uuids_by_type[o.resource_type].add(o.resource_uuid)
+
+    resource_info = {}
+    for resource_type, uuids in uuids_by_type.items():
+        resources = get_type(resource_type).get_many(uuids)
+        for uuid, info in resources.items():
+            resource_info[(resource_type, uuid)] = info
+    return resource_info
+
+
+def _get_resource_info(o, resource_info):
+    if resource_info is not None:
+        info = resource_info.get((o.resource_type, o.resource_uuid))
+        if info is not None:
+            return info
+    resource = o.resource_object()
+    return {
+        "name": resource.get_name(),
+        "resource_class": resource.get_resource_class(),
+        "properties": resource.get_properties(),
+    }
 
-    o = offer.to_dict()
-    o["availabilities"] = offer.get_availabilities()
-    o["project"] = keystone.get_project_name(offer.project_id, project_list)
-    o["lessee"] = keystone.get_project_name(offer.lessee_id, project_list)
-    o["resource"] = resource.get_name(node_list)
-    o["resource_class"] = resource.get_resource_class(node_list)
-    o["resource_properties"] = resource.get_properties(node_list)
-    return o
 
+def _add_resource_info(obj_dict, o, resource_info, fields):
+    if fields_requested(fields, *RESOURCE_FIELDS):
+        info = _get_resource_info(o, resource_info)
+        obj_dict["resource"] = info["name"]
+        obj_dict["resource_class"] = info["resource_class"]
+        obj_dict["resource_properties"] = info["properties"]
 
-def lease_get_dict_with_added_info(lease, project_list=None, node_list=None):
-    resource = lease.resource_object()
 
+def offer_get_dict_with_added_info(
+    offer, project_list=None, resource_info=None, availabilities=None, fields=None
+):
+    """Return an offer as a dict with its computed fields.
+
+    :param fields: if given, only these fields are returned and the others
+                   are not computed
+    """
+    o = offer.to_dict()
+    if fields_requested(fields, "availabilities"):
+        if availabilities is None:
+            availabilities = offer.get_availabilities()
+        o["availabilities"] = availabilities
+    if fields_requested(fields, "project"):
+        o["project"] = keystone.get_project_name(offer.project_id, project_list)
+    if fields_requested(fields, "lessee"):
+        o["lessee"] = keystone.get_project_name(offer.lessee_id, project_list)
+    _add_resource_info(o, offer, resource_info, fields)
+    return select_fields(o, fields)
+
+
+def lease_get_dict_with_added_info(
+    lease, project_list=None, resource_info=None, fields=None
+):
+    """Return a lease as a dict with its computed fields.
+
+    :param fields: if given, only these fields are returned and the others
+                   are not computed
+    """
     lease_dict = lease.to_dict()
-    lease_dict["project"] = keystone.get_project_name(lease.project_id, project_list)
-    lease_dict["owner"] = keystone.get_project_name(lease.owner_id, project_list)
-    lease_dict["resource"] = resource.get_name(node_list)
-    lease_dict["resource_class"] = resource.get_resource_class(node_list)
-    lease_dict["resource_properties"] = resource.get_properties(node_list)
-    return lease_dict
+    if fields_requested(fields, "project"):
+        lease_dict["project"] = keystone.get_project_name(
+            lease.project_id, project_list
+        )
+    if fields_requested(fields, "owner"):
+        lease_dict["owner"] = keystone.get_project_name(lease.owner_id, project_list)
+    _add_resource_info(lease_dict, lease, resource_info, fields)
+    return select_fields(lease_dict, fields)
 
 
 def check_lease_length(cdict, start_time, end_time, max_time):
@@ -187,3 +261,164 @@ def check_lease_length(cdict, start_time, end_time, max_time):
             policy_authorize("esi_leap:lease:lease_admin", cdict, cdict)
         except exception.HTTPForbidden:
             raise exception.LeaseExceedMaxTimeRange(max_time=max_time)
+
+
+def validate_limit(limit):
+    if limit is None:
+        return CONF.api.max_limit
+
+    if limit <= 0:
+        raise exception.InvalidLimit(limit=limit)
+
+    return min(limit, CONF.api.max_limit)
+
+
+def validate_sort_dir(sort_dir):
+    if sort_dir is not None and sort_dir not in ("asc", "desc"):
+        raise exception.InvalidSortDir(sort_dir=sort_dir)
+    return sort_dir
+
+
+def validate_sort_key(sort_key, valid_keys):
+    if sort_key is not None and sort_key not in valid_keys:
+        raise exception.InvalidSortKey(
+            sort_key=sort_key, valid_keys=", ".join(valid_keys)
+        )
+    return sort_key
+
+
+def validate_fields(fields, detail, valid_fields, summary_fields):
+    """Return the fields a list request should return.
+
+    :param fields: comma separated field names, or None
+    :param detail: if False and fields is None, only summary_fields are
+                   returned
+    :returns: tuple of field names, or None if every field is returned
+    """
+    if fields is None:
+        return None if detail is None or detail else tuple(summary_fields)
+
+    requested = tuple(f.strip() for f in fields.split(",") if f.strip())
+    invalid = [f for f in requested if f not in valid_fields]
+    if invalid or not requested:
+        raise exception.InvalidFields(
+            fields=", ".join(invalid) or '""', valid_fields=", ".join(valid_fields)
+        )
+    return requested
+
+
+def get_db_fields(fields, derived_fields, required=("id", "uuid")):
+    """Return the database columns needed to render fields.
+
+    :param derived_fields: dict mapping each computed field to the columns
+                           it is computed from
+    :param required: columns always selected, e.g. for pagination
+    :returns: list of column names, or None if fields is None
+    """
+    if fields is None:
+        return None
+    columns = list(required)
+    for field in fields:
+        for column in derived_fields.get(field, (field,)):
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+def fields_requested(fields, *names):
+    """Return whether any of names is to be returned."""
+    return fields is None or any(name in fields for name in names)
+
+
+def select_fields(obj_dict, fields):
+    if fields is None:
+        return obj_dict
+    return {k: v for k, v in obj_dict.items() if k in fields}
+
+
+def get_next_link(collection, limit, marker):
+    """Return a link to the page after marker, keeping the request's filters"""
+    params = {
+        k: v for k, v in pecan.request.GET.items() if k not in ("limit", "marker")
+    }
+    url = CONF.api.public_endpoint or pecan.request.host_url
+    return collection.get_next(limit, url=url, marker=marker, **params)
+
+
+def stream_collection(collection, item_type, chunks, get_items, limit):
+    """Write a list response as JSON one chunk at a time.
+
+    The response has the same shape as a serialized collection, but only
+    one chunk of objects is held in memory at a time. The body is written
+    after the controller returns, so get_items must not use pecan.request.
+
+    :param collection: empty collection, used for its type and next link
+    :param item_type: wsme type of the collection's items
+    :param chunks: iterable of lists of objects with a uuid
+    :param get_items: callable turning a list of objects into a list of
+                      dicts of item_type fields
+    :param limit: page size; a next link is added if it is reached
+    :returns: a wsme Response for the controller to return
+    """
+    params = {
+        k: v for k, v in pecan.request.GET.items() if k not in ("limit", "marker")
+    }
+    url = CONF.api.public_endpoint or pecan.request.host_url
+
+    def generate():
+        yield ('{"%s": [' % collection._type).encode()
+        count = 0
+        last = None
+        sep = ""
+        for objs in chunks:
+            if not objs:
+                continue
+            count += len(objs)
+            last = objs[-1].uuid
+            # yield each item on its own: pecan tees the body iterator, and
+            # a tee keeps everything yielded within its current block of
+            # values, so few large pieces would keep the whole body alive
+            for item in get_items(objs):
+                yield (
+                    sep
+                    + json.dumps(wsme.rest.json.tojson(item_type, item_type(**item)))
+                ).encode()
+                sep = ", "
+        yield b"]"
+        if count == limit:
+            next_link = collection.get_next(limit, url=url, marker=last, **params)
+            yield (', "next": %s' % json.dumps(next_link)).encode()
+        yield b"}"
+
+    pecan.response.app_iter = generate()
+    # the body is already set, so skip rendering but keep the content type
+    pecan.override_template(None, "application/json")
+    return wsme.api.Response(None, status_code=200, return_type=None)
+
+
+def get_manager_rpcapi():
+    global _cached_manager_rpcapi
+    if _cached_manager_rpcapi is None:
+        _cached_manager_rpcapi = rpcapi.ManagerRPCAPI()
+    return _cached_manager_rpcapi
+
+
+def notify_manager_reschedule(context):
+    """Wake the manager so it picks up changed lease and offer deadlines."""
+    try:
+        get_manager_rpcapi().reschedule(context)
+    except Exception as e:
+        LOG.warning("Failed to notify manager of schedule change: %s", e)
+
+
+def notify_manager_lease(context, method, lease):
+    """Ask the manager to act on a lease now rather than on its next poll.
+
+    :param method: one of fulfill_lease, expire_lease or cancel_lease
+    """
+    try:
+        getattr(get_manager_rpcapi(), method)(context, lease.uuid)
+    except Exception as e:
+        LOG.warning(
+            "Failed to send %s for lease %s to manager: %s", method, lease.uuid, e
+        )
@@ -0,0 +1,98 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import random
+import time
+
+from oslo_db.sqlalchemy import enginefacade
+from oslo_utils import uuidutils
+
+from esi_leap.common import exception as e
+from esi_leap.common import statuses
+from esi_leap.db.sqlalchemy import api
+from esi_leap.db.sqlalchemy import interval_index
+from esi_leap.db.sqlalchemy import models
+import esi_leap.tests.base as base
+
+now = datetime.datetime(2016, 7, 16, 19, 20, 30)
+
+
+class IntervalIndexBenchmark(base.DBTestCase):
+    """Compare index and SQL conflict checks over 100k leases."""
+
+    LEASES = 100000
+    RESOURCES = 1000
+    CHECKS = 2000
+
+    def test_benchmark(self):
+        rand = random.Random(0)
+        rows = []
+        for i in range(self.LEASES):
+            start = now + datetime.timedelta(hours=(i // self.RESOURCES) * 24)
+            rows.append(
+                dict(
+                    uuid=uuidutils.generate_uuid(),
+                    project_id="1e5533",
+                    owner_id="0wn3r",
+                    resource_uuid=str(i % self.RESOURCES),
+                    resource_type="dummy_node",
+                    start_time=start,
+                    end_time=start + datetime.timedelta(hours=12),
+                    status=statuses.CREATED,
+                )
+            )
+        with enginefacade.writer.using(api._CONTEXT) as session:
+            session.bulk_insert_mappings(models.Lease, rows)
+
+        windows = []
+        for _ in range(self.CHECKS):
+            start = now + datetime.timedelta(
+                hours=rand.randint(0, 24 * self.LEASES // self.RESOURCES)
+            )
+            windows.append(
+                (
+                    "dummy_node",
+                    str(rand.randrange(self.RESOURCES)),
+                    start,
+                    start + datetime.timedelta(hours=6),
+                )
+            )
+
+        t = time.time()
+        sql_conflicts = 0
+        for window in windows:
+            try:
+                api.resource_verify_availability(*window)
+            except e.ResourceTimeConflict:
+                sql_conflicts += 1
+        sql_time = time.time() - t
+
+        index = interval_index.IntervalIndex()
+        t = time.time()
+        with enginefacade.reader.using(api._CONTEXT) as session:
+            index.rebuild(session)
+        build_time = time.time() - t
+
+        t = time.time()
+        index_conflicts = 0
+        for window in windows:
+            if index.get_intervals(*window):
+                index_conflicts += 1
+        index_time = time.time() - t
+
+        self.assertEqual(sql_conflicts, index_conflicts)
+        print(
+            "\n%d checks over %d leases: sql %.3fs, index %.3fs "
+            "(rebuild %.3fs)"
+            % (self.CHECKS, self.LEASES, sql_time, index_time, build_time)
+        )
@@ -0,0 +1,90 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import http.server
+import json
+import threading
+import time
+
+from keystoneauth1 import loading as ks_loading
+import mock
+
+from esi_leap.common import ironic
+from esi_leap.tests import base
+
+
+class _NodeListHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = json.dumps({"nodes": []}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class IronicClientBenchmark(base.TestCase):
+    """Compare node list requests per second with and without pooling."""
+
+    REQUESTS = 500
+
+    def setUp(self):
+        super(IronicClientBenchmark, self).setUp()
+        for name in (
+            "_cached_ironic_client",
+            "_cached_http_session",
+            "_cached_service_auth",
+            "_cached_endpoint",
+        ):
+            patcher = mock.patch.object(ironic, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_benchmark(self):
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _NodeListHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.shutdown)
+        endpoint = "http://127.0.0.1:%d" % server.server_port
+        ironic.CONF.register_opts(
+            ks_loading.get_auth_plugin_conf_options("admin_token"), group="ironic"
+        )
+        self.config(auth_type="admin_token", group="ironic")
+        self.config(endpoint=endpoint, token="token", group="ironic")
+
+        def unpooled_client():
+            # how every client was built before clients were pooled
+            auth = ks_loading.load_auth_from_conf_options(ironic.CONF, "ironic")
+            sess = ks_loading.load_session_from_conf_options(
+                ironic.CONF, "ironic", auth=auth
+            )
+            return ironic.ironic_client.get_client(
+                1, session=sess, os_ironic_api_version="1.65"
+            )
+
+        def rate(get_client):
+            t = time.time()
+            for _ in range(self.REQUESTS):
+                get_client().node.list(fields=["uuid"])
+            return self.REQUESTS / (time.time() - t)
+
+        unpooled = rate(unpooled_client)
+        pooled = rate(ironic.get_ironic_client)
+        print(
+            "\n%d node lists: unpooled %.0f req/s, pooled %.0f req/s"
+            % (self.REQUESTS, unpooled, pooled)
+        )
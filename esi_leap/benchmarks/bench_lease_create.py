@@ -0,0 +1,161 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import tempfile
+import threading
+import time
+
+import mock
+from oslo_db.sqlalchemy import enginefacade
+from oslo_utils import uuidutils
+import sqlalchemy as sa
+
+from esi_leap.common import exception
+from esi_leap.common import statuses
+from esi_leap.db.sqlalchemy import api as sqlalchemy_api
+from esi_leap.db.sqlalchemy import models
+from esi_leap.objects import lease as lease_obj
+from esi_leap.tests import base
+
+
+class LeaseCreateBenchmark(base.DBTestCase):
+    """Compare lease creates checked by the application and the database."""
+
+    LEASES = 2000
+    RESOURCES = 50
+
+    def setUp(self):
+        super(LeaseCreateBenchmark, self).setUp()
+        self.config(lock_path=tempfile.mkdtemp(), group="oslo_concurrency")
+
+    def _create_all(self, resource_prefix):
+        start = datetime.datetime(2016, 7, 16)
+        t = time.time()
+        for i in range(self.LEASES):
+            # each resource gets back-to-back day long leases
+            day = start + datetime.timedelta(days=i // self.RESOURCES)
+            lease_obj.Lease(
+                uuid=uuidutils.generate_uuid(),
+                project_id="le55ee",
+                owner_id="0wn3r",
+                resource_type="dummy_node",
+                resource_uuid="%s-%d" % (resource_prefix, i % self.RESOURCES),
+                start_time=day,
+                end_time=day + datetime.timedelta(days=1),
+            ).create()
+        return time.time() - t
+
+    def test_benchmark(self):
+        application = self._create_all("app")
+        self.config(overlap_enforcement="database", group="api")
+        database = self._create_all("db")
+        print(
+            "\n%d lease creates: application %.2fms, database %.2fms per create"
+            % (
+                self.LEASES,
+                application * 1000 / self.LEASES,
+                database * 1000 / self.LEASES,
+            )
+        )
+
+
+def _verify_availability_two_queries(r_type, r_uuid, start, end):
+    """The former conflict check, one query per source."""
+    offers = sqlalchemy_api.model_query(models.Offer.start_time).filter(
+        models.Offer.resource_uuid == r_uuid,
+        models.Offer.resource_type == r_type,
+        models.Offer.status == statuses.AVAILABLE,
+    )
+    if sqlalchemy_api.add_offer_conflict_filter(offers, start, end).first():
+        raise exception.ResourceTimeConflict(resource_uuid=r_uuid, resource_type=r_type)
+    leases = sqlalchemy_api.model_query(models.Lease.start_time).filter(
+        models.Lease.resource_uuid == r_uuid,
+        models.Lease.resource_type == r_type,
+        models.Lease.status.in_(statuses.LEASE_HOLDS_TIME),
+    )
+    if sqlalchemy_api.add_lease_conflict_filter(leases, start, end).first():
+        raise exception.ResourceTimeConflict(resource_uuid=r_uuid, resource_type=r_type)
+
+
+class LeaseCreateContentionBenchmark(base.DBTestCase):
+    """Lease create throughput with every thread locking the same resource.
+
+    SQLite runs in process, so each statement also waits a simulated
+    network round trip of RTT seconds.
+    """
+
+    THREADS = 8
+    LEASES = 250
+    RTT = 0.0005
+
+    def setUp(self):
+        super(LeaseCreateContentionBenchmark, self).setUp()
+        self.config(lock_path=tempfile.mkdtemp(), group="oslo_concurrency")
+
+    def _create_all(self, resource_uuid):
+        start = datetime.datetime(2016, 7, 16)
+
+        def create(thread):
+            for i in range(self.LEASES):
+                day = start + datetime.timedelta(days=i * self.THREADS + thread)
+                lease_obj.Lease(
+                    uuid=uuidutils.generate_uuid(),
+                    project_id="le55ee",
+                    owner_id="0wn3r",
+                    resource_type="dummy_node",
+                    resource_uuid=resource_uuid,
+                    start_time=day,
+                    end_time=day + datetime.timedelta(days=1),
+                ).create()
+
+        threads = [
+            threading.Thread(target=create, args=(t,)) for t in range(self.THREADS)
+        ]
+        t = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.time() - t
+
+        self.assertEqual(
+            self.THREADS * self.LEASES,
+            len(lease_obj.Lease.get_all({"resource_uuid": resource_uuid})),
+        )
+        return self.THREADS * self.LEASES / elapsed
+
+    def test_benchmark(self):
+        def round_trip(*args):
+            time.sleep(self.RTT)
+
+        engine = enginefacade.writer.get_engine()
+        sa.event.listen(engine, "before_cursor_execute", round_trip)
+        self.addCleanup(
+            sa.event.remove,
+            engine,
+            "before_cursor_execute",
+            round_trip,
+        )
+
+        with mock.patch.object(
+            sqlalchemy_api,
+            "resource_verify_availability",
+            _verify_availability_two_queries,
+        ):
+            two_queries = self._create_all("1111")
+        one_query = self._create_all("2222")
+        print(
+            "\n%d threads x %d creates on one resource, %.1fms round trips: "
+            "two queries %.0f/s, one query %.0f/s"
+            % (self.THREADS, self.LEASES, self.RTT * 1000, two_queries, one_query)
+        )
@@ -0,0 +1,98 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import tracemalloc
+
+import mock
+from oslo_db.sqlalchemy import enginefacade
+from oslo_utils import uuidutils
+import webob
+
+from esi_leap.common import keystone
+from esi_leap.common import statuses
+from esi_leap.db.sqlalchemy import api as db_api
+from esi_leap.db.sqlalchemy import models
+from esi_leap.tests.api import base as test_api_base
+
+
+class LeasesStreamBenchmark(test_api_base.APITestCase):
+    """Compare peak memory of buffered and streamed lease listings."""
+
+    SIZES = (5000, 20000)
+
+    def setUp(self):
+        super(LeasesStreamBenchmark, self).setUp()
+        patcher = mock.patch(
+            "esi_leap.api.controllers.v1.lease.LeasesController."
+            "_lease_get_all_authorize_filters",
+            return_value={},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch(
+            "esi_leap.common.keystone.get_project_list",
+            return_value=keystone.ProjectList([]),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _add_leases(self, count):
+        start = datetime.datetime(2016, 7, 16, 19, 20, 30)
+        rows = [
+            dict(
+                uuid=uuidutils.generate_uuid(),
+                project_id="lesseeid",
+                owner_id="ownerid",
+                resource_type="test_node",
+                resource_uuid=str(i),
+                start_time=start,
+                end_time=start + datetime.timedelta(days=1),
+                status=statuses.CREATED,
+            )
+            for i in range(count)
+        ]
+        with enginefacade.writer.using(db_api._CONTEXT) as session:
+            session.bulk_insert_mappings(models.Lease, rows)
+
+    def _measure(self, stream):
+        self.config(stream_list_responses=stream, group="api")
+        tracemalloc.start()
+        request = webob.Request.blank("/v1/leases")
+        _, _, app_iter = request.call_application(self.app.app)
+        # consume the body without keeping it, as a client socket would
+        size = sum(len(chunk) for chunk in app_iter)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return size, peak
+
+    def test_benchmark(self):
+        self.config(max_limit=max(self.SIZES), group="api")
+        total = 0
+        for count in self.SIZES:
+            self._add_leases(count - total)
+            total = count
+
+            buffered_size, buffered_peak = self._measure(False)
+            streamed_size, streamed_peak = self._measure(True)
+
+            self.assertEqual(buffered_size, streamed_size)
+            print(
+                "\n%d leases (%d bytes): buffered peak %.1f MiB, "
+                "streamed peak %.1f MiB"
+                % (
+                    count,
+                    streamed_size,
+                    buffered_peak / 2**20,
+                    streamed_peak / 2**20,
+                )
+            )
@@ -0,0 +1,103 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+import sqlalchemy as sa
+
+from esi_leap.common import utils
+import esi_leap.conf
+from esi_leap.db.sqlalchemy import models
+from esi_leap.tests import base
+
+
+CONF = esi_leap.conf.CONF
+
+
+def _lock_worker(connection, backend, lock_path, counter_dir, names, count):
+    """Increment per-name counter files under the lock, in a fresh process."""
+    CONF([], project="esi-leap")
+    CONF.set_override("connection", connection, group="database")
+    CONF.set_override("lock_backend", backend, group="api")
+    CONF.set_override("lock_path", lock_path, group="oslo_concurrency")
+    for i in range(count):
+        name = names[i % len(names)]
+        with utils.lock(name, external=True):
+            path = os.path.join(counter_dir, name)
+            with open(path) as f:
+                value = int(f.read())
+            with open(path, "w") as f:
+                f.write(str(value + 1))
+
+
+class LockBenchmark(base.TestCase):
+    """Compare lock backends with several processes contending.
+
+    The database backend needs MySQL or PostgreSQL, since SQLite ignores
+    FOR UPDATE; set ESI_LEAP_BENCHMARK_DB to its connection URL.
+    """
+
+    PROCESSES = 8
+    LOCKS = 500
+    NAMES = ["dummy_node-%d" % i for i in range(4)]
+
+    def _run(self, connection, backend):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        for name in self.NAMES:
+            with open(os.path.join(tmp, name), "w") as f:
+                f.write("0")
+
+        args = (connection, backend, tmp, tmp, self.NAMES, self.LOCKS)
+        ctx = multiprocessing.get_context("spawn")
+        processes = [
+            ctx.Process(target=_lock_worker, args=args) for _ in range(self.PROCESSES)
+        ]
+        t = time.time()
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+        elapsed = time.time() - t
+
+        total = 0
+        for name in self.NAMES:
+            with open(os.path.join(tmp, name)) as f:
+                total += int(f.read())
+        # a lost update means two processes held the same lock at once
+        self.assertEqual(self.PROCESSES * self.LOCKS, total)
+        print(
+            "\n%s locks, %d processes x %d: %.2fs (%.0f locks/s)"
+            % (
+                backend,
+                self.PROCESSES,
+                self.LOCKS,
+                elapsed,
+                self.PROCESSES * self.LOCKS / elapsed,
+            )
+        )
+
+    def test_benchmark(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        self._run("sqlite:///" + os.path.join(tmp, "esi-leap.db"), "file")
+
+        connection = os.environ.get("ESI_LEAP_BENCHMARK_DB")
+        if connection:
+            engine = sa.create_engine(connection)
+            models.Base.metadata.create_all(engine, [models.ResourceLock.__table__])
+            engine.dispose()
+            self._run(connection, "database")
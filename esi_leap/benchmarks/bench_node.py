@@ -0,0 +1,116 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from datetime import datetime
+from datetime import timedelta
+import time
+
+import mock
+from oslo_db.sqlalchemy import enginefacade
+from oslo_utils import uuidutils
+
+from esi_leap.common import keystone
+from esi_leap.common import statuses
+from esi_leap.db.sqlalchemy import api as db_api
+from esi_leap.db.sqlalchemy import models
+from esi_leap.objects import lease as lease_obj
+from esi_leap.objects import offer as offer_obj
+from esi_leap.tests.api import base as test_api_base
+from esi_leap.tests.api.controllers.v1.test_node import FakeIronicNode
+
+
+class NodesControllerBenchmark(test_api_base.APITestCase):
+    """Compare grouped and scanned offer lookups for 5k nodes, 50k offers."""
+
+    NODES = 5000
+    OFFERS = 50000
+    LEASES = 10000
+
+    def setUp(self):
+        super(NodesControllerBenchmark, self).setUp()
+        self.nodes = []
+        for i in range(self.NODES):
+            n = FakeIronicNode()
+            n.uuid = uuidutils.generate_uuid()
+            self.nodes.append(n)
+
+        now = datetime.now()
+        offers = [
+            dict(
+                uuid=uuidutils.generate_uuid(),
+                project_id="0wn3r",
+                resource_type="ironic_node",
+                resource_uuid=self.nodes[i % self.NODES].uuid,
+                start_time=now + timedelta(days=i // self.NODES + 1),
+                end_time=now + timedelta(days=i // self.NODES + 2),
+                status=statuses.AVAILABLE,
+            )
+            for i in range(self.OFFERS)
+        ]
+        leases = [
+            dict(
+                uuid=uuidutils.generate_uuid(),
+                project_id="1e5533",
+                owner_id="0wn3r",
+                resource_type="ironic_node",
+                resource_uuid=self.nodes[i % self.NODES].uuid,
+                start_time=now + timedelta(days=i // self.NODES),
+                end_time=now + timedelta(days=i // self.NODES + 1),
+                status=statuses.CREATED,
+            )
+            for i in range(self.LEASES)
+        ]
+        with enginefacade.writer.using(db_api._CONTEXT) as session:
+            session.bulk_insert_mappings(models.Offer, offers)
+            session.bulk_insert_mappings(models.Lease, leases)
+
+        self.config(max_limit=self.NODES, group="api")
+        patcher = mock.patch(
+            "esi_leap.common.keystone.get_project_list",
+            return_value=keystone.ProjectList([]),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch("esi_leap.common.ironic.get_node_list")
+        self.mock_gnl = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _scan(self, nodes):
+        # the previous implementation: every offer and lease, scanned per node
+        offers = offer_obj.Offer.get_all({"status": [statuses.AVAILABLE]})
+        leases = lease_obj.Lease.get_all({"status": [statuses.CREATED]})
+        for n in nodes:
+            [offer for offer in offers if offer.resource_uuid == n.uuid]
+            [lease for lease in leases if lease.resource_uuid == n.uuid]
+
+    def test_benchmark(self):
+        for count in (100, self.NODES):
+            nodes = self.nodes[:count]
+            self.mock_gnl.return_value = nodes
+
+            t = time.time()
+            data = self.get_json("/nodes?limit=%d" % count)
+            grouped_time = time.time() - t
+            self.assertEqual(count, len(data["nodes"]))
+            self.assertEqual(
+                self.OFFERS // self.NODES, len(data["nodes"][0]["future_offers"])
+            )
+
+            t = time.time()
+            self._scan(nodes)
+            scan_time = time.time() - t
+
+            print(
+                "\n%d of %d nodes, %d offers: grouped request %.2fs, "
+                "scan lookups alone %.2fs"
+                % (count, self.NODES, self.OFFERS, grouped_time, scan_time)
+            )
@@ -0,0 +1,55 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import time
+
+from oslo_context import context
+
+from esi_leap.common import policy
+import esi_leap.conf
+from esi_leap.tests import base
+
+
+CONF = esi_leap.conf.CONF
+
+
+class PolicyBenchmark(base.TestCase):
+    """Compare authorize latency with and without the decision cache."""
+
+    CALLS = 10000
+
+    def setUp(self):
+        super(PolicyBenchmark, self).setUp()
+        CONF.set_override("auth_enable", True, group="pecan")
+
+    def _time(self, creds):
+        t = time.time()
+        for _ in range(self.CALLS):
+            policy.authorize("esi_leap:lease:get_all", creds, creds)
+        return (time.time() - t) / self.CALLS * 1e6
+
+    def test_benchmark(self):
+        # the credentials the API passes for a request
+        creds = context.RequestContext(
+            project_id="0wn3r", roles=["esi_leap_owner"]
+        ).to_policy_values()
+        policy.get_enforcer()
+        uncached = self._time(creds)
+
+        policy.start_decision_cache()
+        self.addCleanup(policy.clear_decision_cache)
+        cached = self._time(creds)
+
+        print(
+            "\nauthorize over %d calls: %.1fus uncached, %.1fus cached"
+            % (self.CALLS, uncached, cached)
+        )
@@ -19,6 +19,7 @@ from oslo_config import cfg
 from esi_leap.common.i18n import _
 from esi_leap.common import service
 import esi_leap.conf
+from esi_leap.db import api as db_api
 from esi_leap.db import migration
 
 
@@ -44,6 +45,9 @@ class DBCommand(object):
     def version(self):
         print(migration.version())
 
+    def rebuild_time_ranges(self):
+        db_api.resource_time_ranges_rebuild()
+
 
 def add_command_parsers(subparsers):
     command_object = DBCommand()
@@ -77,6 +81,12 @@ def add_command_parsers(subparsers):
     )
     parser.set_defaults(func=command_object.version)
 
+    parser = subparsers.add_parser(
+        "rebuild_time_ranges",
+        help=_("Rebuild the time ranges used for database overlap enforcement."),
+    )
+    parser.set_defaults(func=command_object.rebuild_time_ranges)
+
 
 def main():
     command_opt = cfg.SubCommandOpt(
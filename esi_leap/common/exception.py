@@ -51,6 +51,11 @@ class LeaseInvalidPatch(ESILeapException):
     msg_fmt = _("Only the end_time field may be updated")
 
 
+class LeaseInvalidState(ESILeapException):
+    code = http_client.CONFLICT
+    msg_fmt = _("Lease %(lease_id)s cannot be cancelled while %(status)s.")
+
+
 class HTTPForbidden(ESILeapException):
     code = http_client.FORBIDDEN
     msg_fmt = _("Access was denied to %(rule)s.")
@@ -128,6 +133,11 @@ class ResourceTimeConflict(ESILeapException):
     msg_fmt = "Time conflict for %(resource_type)s %(resource_uuid)s."
 
 
+class ResourceLockTimeout(ESILeapException):
+    code = http_client.CONFLICT
+    msg_fmt = _("Timed out after %(timeout)s seconds waiting for the lock on %(name)s.")
+
+
 class ResourceNoPermission(ESILeapException):
     msg_fmt = _(
         "You do not have permissions on " "%(resource_type)s %(resource_uuid)s."
@@ -165,6 +175,39 @@ class InvalidAvailabilityAPICommand(ESILeapException):
     )
 
 
+class InvalidLimit(ESILeapException):
+    code = http_client.BAD_REQUEST
+    msg_fmt = _("Limit must be a positive integer. Got %(limit)s.")
+
+
+class InvalidSortKey(ESILeapException):
+    code = http_client.BAD_REQUEST
+    msg_fmt = _("Invalid sort key %(sort_key)s. Valid keys are %(valid_keys)s.")
+
+
+class InvalidSortDir(ESILeapException):
+    code = http_client.BAD_REQUEST
+    msg_fmt = _('Invalid sort direction %(sort_dir)s. Must be "asc" or "desc".')
+
+
+class InvalidFields(ESILeapException):
+    code = http_client.BAD_REQUEST
+    msg_fmt = _("Invalid fields %(fields)s. Valid fields are %(valid_fields)s.")
+
+
+class MarkerNotFound(ESILeapException):
+    code = http_client.BAD_REQUEST
+    msg_fmt = _("Marker %(marker)s could not be found.")
+
+
+class AvailabilityTooManyWindows(ESILeapException):
+    code = http_client.BAD_REQUEST
+    msg_fmt = _(
+        "Attempted to check %(count)s availability windows. At most "
+        "%(max_windows)s windows may be checked at once."
+    )
+
+
 class InvalidTimeRange(ESILeapException):
     msg_fmt = _(
         "Attempted to create %(resource)s resource with an invalid "
@@ -10,52 +10,207 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
+
 from keystoneauth1 import loading as ks_loading
 from keystoneauth1 import service_token
+from keystoneauth1 import session as ks_session
 from keystoneauth1 import token_endpoint
+import requests
 
 from ironicclient import client as ironic_client
-
+from esi_leap.common import utils
 import esi_leap.conf
 
 
 CONF = esi_leap.conf.CONF
+IRONIC_API_VERSION = "1.65"
+
+_client_lock = threading.Lock()
 _cached_ironic_client = None
+_cached_http_session = None
+_cached_service_auth = None
+_cached_endpoint = None
+
+
+def _get_http_session():
+    """Return the connection pool shared by every Ironic client."""
+    global _cached_http_session
+    with _client_lock:
+        if _cached_http_session is None:
+            http_session = requests.Session()
+            for scheme in ("https://", "http://"):
+                http_session.mount(
+                    scheme,
+                    ks_session.TCPKeepAliveAdapter(
+                        pool_connections=CONF.ironic.connection_pool_size,
+                        pool_maxsize=CONF.ironic.connection_pool_size,
+                    ),
+                )
+            _cached_http_session = http_session
+    return _cached_http_session
+
+
+def _get_service_auth():
+    global _cached_service_auth
+    with _client_lock:
+        if _cached_service_auth is None:
+            _cached_service_auth = ks_loading.load_auth_from_conf_options(
+                CONF, "ironic"
+            )
+    return _cached_service_auth
+
+
+def _get_endpoint():
+    global _cached_endpoint
+    if _cached_endpoint is None:
+        _cached_endpoint = ks_loading.load_adapter_from_conf_options(
+            CONF, "ironic", session=_get_session(), auth=_get_service_auth()
+        ).get_endpoint()
+    return _cached_endpoint
+
+
+def _get_session(auth=None):
+    return ks_loading.load_session_from_conf_options(
+        CONF,
+        "ironic",
+        auth=auth or _get_service_auth(),
+        session=_get_http_session(),
+    )
+
+
+def _build_client(auth=None):
+    return ironic_client.get_client(
+        1, session=_get_session(auth), os_ironic_api_version=IRONIC_API_VERSION
+    )
 
 
 def get_ironic_client(context=None):
-    session = ks_loading.load_session_from_conf_options(CONF, "ironic")
-    service_auth = ks_loading.load_auth_from_conf_options(CONF, "ironic")
+    """Return an Ironic client.
 
-    # use user context if provided
-    user_auth = None
+    Without a context this is a shared client using the service
+    credentials. With a context, a client acting with the user's token is
+    built on each call; it is cheap, as every client shares the same
+    service auth, endpoint and connection pool.
+    """
+    global _cached_ironic_client
     if context:
-        endpoint = ks_loading.load_adapter_from_conf_options(
-            CONF, "ironic", session=session, auth=service_auth
-        ).get_endpoint()
         user_auth = service_token.ServiceTokenAuthWrapper(
-            user_auth=token_endpoint.Token(endpoint, context.auth_token),
-            service_auth=service_auth,
+            user_auth=token_endpoint.Token(_get_endpoint(), context.auth_token),
+            service_auth=_get_service_auth(),
         )
-    sess = ks_loading.load_session_from_conf_options(
-        CONF, "ironic", auth=user_auth or service_auth
-    )
+        return _build_client(user_auth)
+
+    if _cached_ironic_client is None:
+        client = _build_client()
+        with _client_lock:
+            if _cached_ironic_client is None:
+                _cached_ironic_client = client
+    return _cached_ironic_client
+
+
+_node_list_cache = utils.TTLCache()
 
-    kwargs = {"os_ironic_api_version": "1.65"}
-    cli = ironic_client.get_client(1, session=sess, **kwargs)
-    return cli
+# node fields used to add resource details to lease and offer listings;
+# the shared node list is fetched with exactly these fields
+ENRICHMENT_FIELDS = (
+    "uuid",
+    "name",
+    "resource_class",
+    "properties",
+    "owner",
+    "lessee",
+)
 
 
-def get_node_list(context=None, **filter_args):
+class NodeList(object):
+    """Snapshot of fetched nodes indexed by uuid and by name.
+
+    Iterating yields the nodes in the order Ironic returned them.
+    """
+
+    def __init__(self, nodes):
+        self._nodes = list(nodes)
+        self._by_uuid = {n.uuid: n for n in self._nodes}
+        self._by_name = {}
+        for n in self._nodes:
+            name = getattr(n, "name", None)
+            if name:
+                self._by_name[name] = n
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def __getitem__(self, index):
+        return self._nodes[index]
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def get(self, ident):
+        """Return the node with the given uuid or name, or None."""
+        node = self._by_uuid.get(ident)
+        if node is None:
+            node = self._by_name.get(ident)
+        return node
+
+
+def _fetch_node_list(context=None, fields=None, **filter_args):
     client = get_ironic_client(context)
-    return client.node.list(detail=True, **filter_args)
+    if fields is None:
+        nodes = client.node.list(detail=True, **filter_args)
+    else:
+        # nodes are always indexed by uuid
+        fields = list(fields) + ([] if "uuid" in fields else ["uuid"])
+        nodes = client.node.list(fields=fields, **filter_args)
+    return NodeList(nodes)
+
+
+def _fetch_enrichment_node_list():
+    return _fetch_node_list(fields=ENRICHMENT_FIELDS)
+
+
+def get_node_list(context=None, fields=None, **filter_args):
+    """Return a NodeList of nodes.
+
+    Lists fetched with the service credentials, no filters and fields
+    within ENRICHMENT_FIELDS are shared through a process-wide cache;
+    other lists are always fetched from Ironic.
+
+    :param fields: node fields the caller uses; None fetches every field
+    """
+    if (
+        context is not None
+        or filter_args
+        or fields is None
+        or not set(fields) <= set(ENRICHMENT_FIELDS)
+        or CONF.ironic.node_list_cache_ttl <= 0
+    ):
+        return _fetch_node_list(context, fields, **filter_args)
+    return _node_list_cache.get(
+        _fetch_enrichment_node_list,
+        CONF.ironic.node_list_cache_ttl,
+        CONF.ironic.node_list_cache_max_stale,
+    )
+
+
+def get_cached_node_list():
+    """Return the cached node list if it is fresh, without fetching."""
+    if CONF.ironic.node_list_cache_ttl <= 0:
+        return None
+    return _node_list_cache.peek(CONF.ironic.node_list_cache_ttl)
+
+
+def invalidate_node_list_cache():
+    """Drop the cached node list after a node is changed."""
+    _node_list_cache.invalidate()
 
 
 def get_node(node_uuid, node_list=None):
     if node_list is None:
         node = get_ironic_client().node.get(node_uuid)
     else:
-        node = next((n for n in node_list if n.uuid == node_uuid), None)
+        node = node_list.get(node_uuid)
     return node
 
 
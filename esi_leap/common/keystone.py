@@ -10,17 +10,20 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
+
 from keystoneauth1 import loading as ks_loading
 from keystoneclient import client as keystone_client
 from oslo_utils import uuidutils
 
 from esi_leap.common import exception
+from esi_leap.common import utils
 import esi_leap.conf
 
 
 CONF = esi_leap.conf.CONF
 _cached_keystone_client = None
-_cached_project_list = None
+_project_list_cache = utils.TTLCache()
 
 
 def get_keystone_client():
@@ -37,19 +40,79 @@ def get_keystone_client():
 
 
 def get_parent_project_id_tree(project_id):
-    ks_client = get_keystone_client()
-    project = ks_client.projects.get(project_id)
+    """Return project_id followed by the ids of all of its ancestors.
+
+    Ancestors are resolved from the cached project list; projects missing
+    from it, such as new projects or the domains at the top of each tree,
+    are fetched from Keystone and remembered until the next refresh.
+    """
+    project_list = None
+    if CONF.keystone.project_list_cache_ttl > 0:
+        project_list = get_project_list()
+    project = _get_project(project_id, project_list)
     project_ids = [project.id]
     while project.parent_id is not None:
-        project = ks_client.projects.get(project.parent_id)
+        project = _get_project(project.parent_id, project_list)
         project_ids.append(project.id)
     return project_ids
 
 
+def _get_project(project_id, project_list):
+    if project_list is None:
+        return get_keystone_client().projects.get(project_id)
+    project = project_list.get(project_id)
+    if project is None:
+        project = get_keystone_client().projects.get(project_id)
+        project_list.add(project)
+    return project
+
+
+class ProjectList(object):
+    """Projects indexed by id and by name.
+
+    Iterating yields the projects in the order Keystone returned them.
+    The listed projects never change; projects added later are kept in a
+    separate map under a lock, since the list is shared between threads.
+    """
+
+    def __init__(self, projects):
+        self._projects = list(projects)
+        self._by_id = {p.id: p for p in self._projects}
+        # projects have unique names
+        self._id_by_name = {p.name: p.id for p in self._projects}
+        self._added = {}
+        self._added_lock = threading.Lock()
+
+    def __iter__(self):
+        return iter(self._projects)
+
+    def __len__(self):
+        return len(self._projects)
+
+    def get(self, project_id):
+        project = self._by_id.get(project_id)
+        if project is None:
+            with self._added_lock:
+                project = self._added.get(project_id)
+        return project
+
+    def add(self, project):
+        """Remember a project fetched on its own, for id lookups only."""
+        with self._added_lock:
+            self._added[project.id] = project
+
+    def get_id(self, name):
+        return self._id_by_name.get(name)
+
+
 def get_project_uuid_from_ident(project_ident):
     if uuidutils.is_uuid_like(project_ident):
         return project_ident
     else:
+        project_id = get_project_list().get_id(project_ident)
+        if project_id is not None:
+            return project_id
+        # the project may be newer than the cached list
         projects = get_keystone_client().projects.list(name=project_ident)
         if len(projects) > 0:
             # projects have unique names
@@ -57,8 +120,19 @@ def get_project_uuid_from_ident(project_ident):
         raise exception.ProjectNoSuchName(name=project_ident)
 
 
+def _fetch_project_list():
+    return ProjectList(get_keystone_client().projects.list())
+
+
 def get_project_list():
-    return get_keystone_client().projects.list()
+    """Return a ProjectList of all projects, shared across API requests."""
+    if CONF.keystone.project_list_cache_ttl <= 0:
+        return _fetch_project_list()
+    return _project_list_cache.get(
+        _fetch_project_list,
+        CONF.keystone.project_list_cache_ttl,
+        CONF.keystone.project_list_cache_max_stale,
+    )
 
 
 def get_project_name(project_id, project_list=None):
@@ -66,9 +140,7 @@ def get_project_name(project_id, project_list=None):
         if project_list is None:
             project = get_keystone_client().projects.get(project_id)
         else:
-            project = next(
-                (p for p in project_list if getattr(p, "id") == project_id), None
-            )
+            project = project_list.get(project_id)
         return project.name if project else ""
     else:
         return ""
@@ -10,7 +10,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections.abc
 import itertools
+import threading
 
 from oslo_policy import policy
 
@@ -18,6 +20,9 @@ import esi_leap.conf
 
 CONF = esi_leap.conf.CONF
 _ENFORCER = None
+_ENFORCER_LOCK = threading.Lock()
+
+_local = threading.local()
 
 default_policies = [
     policy.RuleDefault(
@@ -169,24 +174,95 @@ event_policies = [
 ]
 
 
+availability_policies = [
+    policy.DocumentedRuleDefault(
+        "esi_leap:availability:check",
+        "rule:is_admin or rule:is_owner",
+        "Check resource availability for many time windows",
+        [{"path": "/availability", "method": "POST"}],
+    ),
+]
+
+
 def list_rules():
     policies = itertools.chain(
-        default_policies, lease_policies, offer_policies, node_policies, event_policies
+        default_policies,
+        lease_policies,
+        offer_policies,
+        node_policies,
+        event_policies,
+        availability_policies,
     )
     return policies
 
 
 def get_enforcer():
-    CONF([], project="esi-leap")
+    """Return the process-wide enforcer, creating it on first use.
+
+    The enforcer checks the policy file's modification time on every
+    enforcement and only reloads the rules when it has changed.
+    """
     global _ENFORCER
-    if not _ENFORCER:
-        _ENFORCER = policy.Enforcer(CONF)
-        _ENFORCER.register_defaults(list_rules())
+    if _ENFORCER is None:
+        with _ENFORCER_LOCK:
+            if _ENFORCER is None:
+                CONF([], project="esi-leap")
+                enforcer = policy.Enforcer(CONF)
+                enforcer.register_defaults(list_rules())
+                _ENFORCER = enforcer
     return _ENFORCER
 
 
+def start_decision_cache():
+    """Cache authorize decisions until clear_decision_cache is called.
+
+    :returns: False if a cache was already active and is left in place
+    """
+    if getattr(_local, "decisions", None) is not None:
+        return False
+    _local.decisions = {}
+    return True
+
+
+def clear_decision_cache():
+    _local.decisions = None
+
+
+def _freeze(value):
+    # RequestContext.to_policy_values() returns a mapping, not a dict
+    if isinstance(value, collections.abc.Mapping):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _decision_key(rule, target, creds):
+    try:
+        key = (rule, _freeze(target), _freeze(creds))
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
 def authorize(rule, target, creds, *args, **kwargs):
     if not CONF.pecan.auth_enable:
         return True
 
-    return get_enforcer().authorize(rule, target, creds, do_raise=True, *args, **kwargs)
+    decisions = getattr(_local, "decisions", None)
+    key = None
+    if decisions is not None and not args and not kwargs:
+        key = _decision_key(rule, target, creds)
+    if key is None:
+        return get_enforcer().authorize(
+            rule, target, creds, do_raise=True, *args, **kwargs
+        )
+
+    allowed = decisions.get(key)
+    if allowed is None:
+        allowed = get_enforcer().authorize(rule, target, creds)
+        decisions[key] = allowed
+    if not allowed:
+        raise policy.PolicyNotAuthorized(rule, target, creds)
+    return allowed
@@ -22,3 +22,5 @@ WAIT_FULFILL = "wait fulfill"
 
 OFFER_CAN_DELETE = [AVAILABLE, ERROR]
 LEASE_CAN_DELETE = [ACTIVE, CREATED, ERROR, WAIT_FULFILL]
+# leases in these statuses keep their time on the resource
+LEASE_HOLDS_TIME = [ACTIVE, CREATED, WAIT_CANCEL]
@@ -10,19 +10,149 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
 import datetime
+import threading
 
 from oslo_concurrency import lockutils
+from oslo_log import log as logging
+from oslo_utils import timeutils
+
+from esi_leap.db import api as db_api
+import esi_leap.conf
+
+CONF = esi_leap.conf.CONF
+LOG = logging.getLogger(__name__)
 
 _prefix = "esileap"
-lock = lockutils.lock_with_prefix(_prefix)
+_lock = lockutils.lock_with_prefix(_prefix)
+
+
+def lock(name, external=False):
+    """Return a context manager that serializes work on name.
+
+    Internal locks only serialize threads of this process. External locks
+    use the configured lock backend: file locks work between processes on
+    one host, while database row locks work across hosts. The database
+    backend needs MySQL or PostgreSQL and uses file locks on SQLite.
+    """
+    if (
+        external
+        and CONF.api.lock_backend == "database"
+        and db_api.resource_lock_supported()
+    ):
+        return db_api.resource_lock(_prefix + "-" + name, CONF.api.lock_timeout)
+    return _lock(name, external=external)
 
 
 def get_resource_lock_name(resource_type, resource_uuid):
     return resource_type + "-" + resource_uuid
 
 
+def overlap_enforced_by_database():
+    return CONF.api.overlap_enforcement == "database"
+
+
+def resource_conflict_lock(resource_type, resource_uuid):
+    """Lock a resource while its time conflicts are checked and written.
+
+    When the database enforces non-overlap itself, a conflicting write
+    fails on its own and no lock is taken.
+    """
+    if overlap_enforced_by_database():
+        return contextlib.nullcontext()
+    return lock(get_resource_lock_name(resource_type, resource_uuid), external=True)
+
+
+def time_range_within(outer_start, outer_end, start, end):
+    return datetime_aware(outer_start) <= datetime_aware(start) and datetime_aware(
+        end
+    ) <= datetime_aware(outer_end)
+
+
 def datetime_aware(dt):
     if dt.tzinfo is not None and dt.tzinfo.utcoffset(dt) is not None:
         return dt
     return dt.replace(tzinfo=datetime.timezone.utc)
+
+
+class _CacheFetch(object):
+    def __init__(self, generation):
+        self.generation = generation
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache(object):
+    """Single cached value shared by every thread in the process.
+
+    A value younger than the TTL is returned as is. An older value is
+    returned while a single background thread fetches a new one, until
+    it is more than max_stale past the TTL. With no usable value, one
+    caller fetches and concurrent callers wait for its result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = None
+        self._fetched_at = None
+        self._generation = 0
+        self._pending = None
+
+    def get(self, fetch, ttl, max_stale):
+        with self._lock:
+            if self._value is not None:
+                age = timeutils.delta_seconds(self._fetched_at, timeutils.utcnow())
+                if age < ttl:
+                    return self._value
+                if age < ttl + max_stale:
+                    if self._pending is None:
+                        self._pending = _CacheFetch(self._generation)
+                        threading.Thread(
+                            target=self._run_fetch, args=(fetch, self._pending)
+                        ).start()
+                    return self._value
+            pending = self._pending
+            owner = pending is None
+            if owner:
+                pending = self._pending = _CacheFetch(self._generation)
+
+        if owner:
+            self._run_fetch(fetch, pending)
+        else:
+            pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.value
+
+    def peek(self, max_age):
+        """Return the cached value if it is younger than max_age, else None."""
+        with self._lock:
+            if self._value is None:
+                return None
+            age = timeutils.delta_seconds(self._fetched_at, timeutils.utcnow())
+            return self._value if age < max_age else None
+
+    def _run_fetch(self, fetch, pending):
+        fetched_at = timeutils.utcnow()
+        try:
+            pending.value = fetch()
+        except Exception as e:
+            LOG.warning("Failed to refresh cached value: %s", e)
+            pending.error = e
+        with self._lock:
+            # a value fetched before an invalidation may miss its changes
+            if pending.error is None and pending.generation == self._generation:
+                self._value = pending.value
+                self._fetched_at = fetched_at
+            if self._pending is pending:
+                self._pending = None
+        pending.done.set()
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+            self._fetched_at = None
+            self._generation += 1
+            self._pending = None
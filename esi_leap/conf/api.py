@@ -23,6 +23,37 @@ opts = [
     cfg.StrOpt("default_resource_type", default="ironic_node"),
     cfg.IntOpt("max_lease_time", default=21),
     cfg.IntOpt("default_lease_time", default=7),
+    cfg.BoolOpt(
+        "interval_index_enabled",
+        default=False,
+        help="Serve the per-node offer and lease intervals of the node "
+        "listing from a per-process in-memory index. The index is "
+        "best-effort: offers and leases changed by other processes "
+        "show up within interval_index_refresh_interval seconds, and "
+        "ones hard-deleted by other processes linger for up to "
+        "interval_index_rebuild_interval seconds. Availability checks "
+        "and offer availabilities always read the database.",
+    ),
+    cfg.IntOpt(
+        "interval_index_refresh_interval",
+        default=5,
+        help="Seconds between reads of the offers and leases changed "
+        "since the last interval index refresh.",
+    ),
+    cfg.IntOpt(
+        "interval_index_rebuild_interval",
+        default=600,
+        help="Seconds between full rebuilds of the interval index.",
+    ),
+    cfg.BoolOpt("stream_list_responses", default=False),
+    cfg.IntOpt("stream_chunk_size", default=500, min=1),
+    cfg.StrOpt("lock_backend", default="file", choices=["file", "database"]),
+    cfg.IntOpt("lock_timeout", default=60, min=1),
+    cfg.StrOpt(
+        "overlap_enforcement",
+        default="application",
+        choices=["application", "database"],
+    ),
 ]
 
 
@@ -16,7 +16,49 @@ from keystoneauth1 import loading
 from oslo_config import cfg
 
 
-opts = []
+opts = [
+    cfg.IntOpt(
+        "connection_pool_size",
+        default=20,
+        min=1,
+        help="Maximum number of keep-alive connections to Ironic shared by "
+        "all Ironic clients in a process.",
+    ),
+    cfg.IntOpt(
+        "node_list_cache_ttl",
+        default=10,
+        min=0,
+        help="Seconds a node list fetched with the service credentials is "
+        "reused across API requests. The cache is per process: it is "
+        "invalidated when this process changes a node, but lessee "
+        "changes made by the manager only show up once it expires. "
+        "0 disables the cache.",
+    ),
+    cfg.IntOpt(
+        "node_list_cache_max_stale",
+        default=20,
+        min=0,
+        help="Seconds past node_list_cache_ttl an expired node list is "
+        "still returned while a fresh one is fetched in the background. "
+        "Node changes made by other processes may stay hidden for up to "
+        "node_list_cache_ttl plus this many seconds.",
+    ),
+    cfg.IntOpt(
+        "node_get_many_threshold",
+        default=10,
+        min=0,
+        help="Listings that reference at most this many distinct nodes, "
+        "with no fresh cached node list, fetch each node individually "
+        "instead of listing every node. 0 always lists every node.",
+    ),
+    cfg.IntOpt(
+        "node_get_max_workers",
+        default=8,
+        min=1,
+        help="Maximum number of nodes fetched in parallel when nodes are "
+        "fetched individually.",
+    ),
+]
 ironic_group = cfg.OptGroup("ironic", title="Ironic Options")
 
 
@@ -16,7 +16,22 @@ from keystoneauth1 import loading
 from oslo_config import cfg
 
 
-opts = []
+opts = [
+    cfg.IntOpt(
+        "project_list_cache_ttl",
+        default=60,
+        min=0,
+        help="Seconds the project list is reused across API requests. "
+        "0 disables the cache.",
+    ),
+    cfg.IntOpt(
+        "project_list_cache_max_stale",
+        default=600,
+        min=0,
+        help="Seconds past project_list_cache_ttl an expired project list "
+        "is still returned while a fresh one is fetched in the background.",
+    ),
+]
 keystone_group = cfg.OptGroup("keystone", title="Keystone Options")
 
 
@@ -90,6 +90,18 @@ def offer_get_conflict_times(offer_ref):
     return IMPL.offer_get_conflict_times(offer_ref)
 
 
+def offer_get_all_chunks(filters, chunk_size):
+    return IMPL.offer_get_all_chunks(filters, chunk_size)
+
+
+def offer_get_conflict_times_by_offer(offer_uuids):
+    return IMPL.offer_get_conflict_times_by_offer(offer_uuids)
+
+
+def offer_get_end_times(status, until):
+    return IMPL.offer_get_end_times(status, until)
+
+
 def offer_get_next_lease_start_time(offer_uuid, start):
     return IMPL.offer_get_next_lease_start_time(offer_uuid, start)
 
@@ -126,6 +138,26 @@ def lease_get_all():
     return IMPL.lease_get_all()
 
 
+def lease_get_all_chunks(filters, chunk_size):
+    return IMPL.lease_get_all_chunks(filters, chunk_size)
+
+
+def lease_get_start_times(status, until):
+    return IMPL.lease_get_start_times(status, until)
+
+
+def lease_get_end_times(status, until):
+    return IMPL.lease_get_end_times(status, until)
+
+
+def lease_get_due_to_fulfill(status, now, limit, marker=None):
+    return IMPL.lease_get_due_to_fulfill(status, now, limit, marker)
+
+
+def lease_get_due_to_expire(status, now, limit, marker=None):
+    return IMPL.lease_get_due_to_expire(status, now, limit, marker)
+
+
 def lease_create(values):
     return IMPL.lease_create(values)
 
@@ -143,6 +175,10 @@ def lease_verify_child_availability(lease_ref, start, end):
 
 
 # Resource object
+def resource_get_intervals(r_type, r_uuid):
+    return IMPL.resource_get_intervals(r_type, r_uuid)
+
+
 def resource_verify_availability(r_type, r_uuid, start, end):
     return IMPL.resource_verify_availability(r_type, r_uuid, start, end)
 
@@ -165,6 +201,22 @@ def resource_check_admin(
     )
 
 
+def resource_get_conflicts(windows):
+    return IMPL.resource_get_conflicts(windows)
+
+
+def resource_lock(name, timeout):
+    return IMPL.resource_lock(name, timeout)
+
+
+def resource_lock_supported():
+    return IMPL.resource_lock_supported()
+
+
+def resource_time_ranges_rebuild():
+    return IMPL.resource_time_ranges_rebuild()
+
+
 # Event
 @to_dict
 def event_get_all():
@@ -0,0 +1,41 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Add offer status and end time index
+
+Revision ID: 2e7b4c91f0d6
+Revises: c3f9a0b7d215
+Create Date: 2026-10-18 16:41:09.733520
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "2e7b4c91f0d6"
+down_revision = "c3f9a0b7d215"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "offer_status_end_time_idx",
+        "offers",
+        ["status", "end_time"],
+        unique=False,
+    )
+
+
+def downgrade():
+    pass
@@ -0,0 +1,39 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Add created_at and updated_at indexes to offers and leases
+
+Revision ID: 8d41e7a2c9b0
+Revises: 5b2c6d1f8e3a
+Create Date: 2026-10-18 14:03:17.508213
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "8d41e7a2c9b0"
+down_revision = "5b2c6d1f8e3a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("offer_created_at_idx", "offers", ["created_at"], unique=False)
+    op.create_index("offer_updated_at_idx", "offers", ["updated_at"], unique=False)
+    op.create_index("lease_created_at_idx", "leases", ["created_at"], unique=False)
+    op.create_index("lease_updated_at_idx", "leases", ["updated_at"], unique=False)
+
+
+def downgrade():
+    pass
@@ -0,0 +1,47 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Add lease status and due time indexes
+
+Revision ID: c3f9a0b7d215
+Revises: 8d41e7a2c9b0
+Create Date: 2026-10-18 15:27:44.120958
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "c3f9a0b7d215"
+down_revision = "8d41e7a2c9b0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "lease_status_start_time_idx",
+        "leases",
+        ["status", "start_time"],
+        unique=False,
+    )
+    op.create_index(
+        "lease_status_end_time_idx",
+        "leases",
+        ["status", "end_time"],
+        unique=False,
+    )
+
+
+def downgrade():
+    pass
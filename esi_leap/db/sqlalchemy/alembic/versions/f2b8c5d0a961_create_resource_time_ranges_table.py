@@ -0,0 +1,71 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Create resource time ranges table
+
+Revision ID: f2b8c5d0a961
+Revises: d6a3e9f4b172
+Create Date: 2026-10-18 20:14:52.604117
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f2b8c5d0a961"
+down_revision = "d6a3e9f4b172"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    is_postgresql = op.get_bind().dialect.name == "postgresql"
+    if is_postgresql:
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    op.create_table(
+        "resource_time_ranges",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("scope", sa.String(length=255), nullable=False),
+        sa.Column("source", sa.String(length=15), nullable=False),
+        sa.Column("uuid", sa.String(length=36), nullable=False),
+        sa.Column("start_time", sa.DateTime(), nullable=False),
+        sa.Column("end_time", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "resource_time_range_holder_idx",
+        "resource_time_ranges",
+        ["source", "uuid"],
+        unique=False,
+    )
+    op.create_index(
+        "resource_time_range_scope_idx",
+        "resource_time_ranges",
+        ["scope", "start_time"],
+        unique=False,
+    )
+
+    if is_postgresql:
+        op.execute(
+            "ALTER TABLE resource_time_ranges "
+            "ADD CONSTRAINT resource_time_ranges_no_overlap "
+            "EXCLUDE USING gist (scope WITH =, tsrange(start_time, end_time) WITH &&)"
+        )
+
+
+def downgrade():
+    pass
@@ -10,22 +10,27 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import contextlib
 import sys
 import threading
 
 from oslo_config import cfg
+from oslo_db import exception as db_exc
 from oslo_db.sqlalchemy import enginefacade
+from oslo_db.sqlalchemy import utils as db_utils
 from oslo_log import log as logging
 from oslo_utils import timeutils
 
 import sqlalchemy as sa
 from sqlalchemy import or_
+from sqlalchemy import orm
 
 from esi_leap.common import constants
 from esi_leap.common import exception
 from esi_leap.common import keystone
 from esi_leap.common import statuses
 from esi_leap.common import utils
+from esi_leap.db.sqlalchemy import interval_index
 from esi_leap.db.sqlalchemy import models
 
 
@@ -33,6 +38,8 @@ CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
 _CONTEXT = threading.local()
+# resource locks are held in their own transactions
+_LOCK_CONTEXT = threading.local()
 
 
 def get_backend():
@@ -48,6 +55,29 @@ def _session_for_write():
     return enginefacade.writer.using(_CONTEXT)
 
 
+def _get_interval_index():
+    """Return the refreshed in-memory interval index, if it is enabled."""
+    if not CONF.api.interval_index_enabled:
+        return None
+
+    index = interval_index.get_index()
+    with _session_for_read() as session:
+        index.refresh(session)
+    return index
+
+
+def _index_write(source, ref):
+    """Apply a committed offer or lease write to this process's index."""
+    if CONF.api.interval_index_enabled:
+        interval_index.get_index().apply_row(source, ref)
+
+
+def _index_remove(source, uuid):
+    """Drop a hard-deleted offer or lease from this process's index."""
+    if CONF.api.interval_index_enabled:
+        interval_index.get_index().remove(source, uuid)
+
+
 def model_query(model, *args):
     """Query helper.
 
@@ -58,6 +88,76 @@ def model_query(model, *args):
         return query
 
 
+def _load_only(model, query, fields):
+    """Select only the given columns of model, plus its primary key.
+
+    The other columns of the returned rows are left unloaded and must not
+    be read. Queries without fields are returned unchanged.
+    """
+    if fields is None:
+        return query
+    return query.options(orm.load_only(*(getattr(model, f) for f in fields)))
+
+
+def _iter_chunks(query, chunk_size):
+    """Yield the rows of query in lists of at most chunk_size.
+
+    Rows are fetched chunk_size at a time through a server-side cursor
+    where the database supports one, so the full result is never held in
+    memory.
+    """
+    chunk = []
+    for row in query.yield_per(chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _paginate_query(
+    model,
+    query,
+    limit=None,
+    marker=None,
+    sort_key=None,
+    sort_dir=None,
+    marker_key="uuid",
+):
+    """Apply keyset pagination to a query.
+
+    Results are ordered by (sort_key, id) and resume after the row
+    identified by marker. Queries without any pagination arguments are
+    returned unchanged.
+    """
+    if limit is None and marker is None and sort_key is None and sort_dir is None:
+        return query
+
+    sort_keys = ["id"]
+    if sort_key and sort_key not in sort_keys:
+        sort_keys.insert(0, sort_key)
+
+    marker_ref = None
+    if marker is not None:
+        marker_ref = (
+            model_query(model)
+            .filter(getattr(model, marker_key) == marker)
+            .one_or_none()
+        )
+        if marker_ref is None:
+            raise exception.MarkerNotFound(marker=marker)
+
+    try:
+        return db_utils.paginate_query(
+            query, model, limit, sort_keys, marker=marker_ref, sort_dir=sort_dir
+        )
+    except db_exc.InvalidSortKey:
+        raise exception.InvalidSortKey(
+            sort_key=sort_key, valid_keys=", ".join(model.__table__.columns.keys())
+        )
+
+
 # Helpers for building constraints / equality checks
 
 
@@ -117,18 +217,27 @@ def offer_get_all(filters):
     query = model_query(models.Offer)
 
     lessee_id = filters.pop("lessee_id", None)
+    resource_uuids = filters.pop("resource_uuids", None)
+    fields = filters.pop("fields", None)
     start = filters.pop("start_time", None)
     end = filters.pop("end_time", None)
     time_filter_type = filters.pop("time_filter_type", None)
     a_start = filters.pop("available_start_time", None)
     status = filters.pop("status", None)
     a_end = filters.pop("available_end_time", None)
+    limit = filters.pop("limit", None)
+    marker = filters.pop("marker", None)
+    sort_key = filters.pop("sort_key", None)
+    sort_dir = filters.pop("sort_dir", None)
 
     query = query.filter_by(**filters)
 
     if status:
         query = query.filter((models.Offer.status.in_(status)))
 
+    if resource_uuids is not None:
+        query = query.filter(models.Offer.resource_uuid.in_(resource_uuids))
+
     if lessee_id:
         lessee_id_list = keystone.get_parent_project_id_tree(lessee_id)
         query = query.filter(
@@ -151,13 +260,25 @@ def offer_get_all(filters):
             )
 
     if a_start and a_end:
-        for o in query:
-            try:
-                offer_verify_availability(o, a_start, a_end)
-            except exception.OfferNoTimeAvailabilities:
-                query = query.filter(models.Offer.uuid != o.uuid)
+        # offers must cover the window and have no lease holding time
+        # overlapping it; resolved as a single anti-join
+        conflicting_leases = sa.exists().where(
+            models.Lease.offer_uuid == models.Offer.uuid,
+            models.Lease.status.in_(statuses.LEASE_HOLDS_TIME),
+            _lease_conflict_clause(a_start, a_end),
+        )
+        query = query.filter(
+            models.Offer.start_time <= a_start,
+            models.Offer.end_time >= a_end,
+            ~conflicting_leases,
+        )
+
+    query = _load_only(models.Offer, query, fields)
+    return _paginate_query(models.Offer, query, limit, marker, sort_key, sort_dir)
+
 
-    return query
+def offer_get_all_chunks(filters, chunk_size):
+    return _iter_chunks(offer_get_all(filters), chunk_size)
 
 
 def offer_get_conflict_times(offer_ref):
@@ -176,6 +297,26 @@ def offer_get_conflict_times(offer_ref):
     )
 
 
+def offer_get_conflict_times_by_offer(offer_uuids):
+    if not offer_uuids:
+        return []
+
+    l_query = model_query(models.Lease)
+
+    return (
+        l_query.with_entities(
+            models.Lease.offer_uuid, models.Lease.start_time, models.Lease.end_time
+        )
+        .filter(
+            models.Lease.offer_uuid.in_(offer_uuids),
+            (models.Lease.status != statuses.EXPIRED)
+            & (models.Lease.status != statuses.DELETED),
+        )
+        .order_by(models.Lease.offer_uuid, models.Lease.start_time)
+        .all()
+    )
+
+
 def offer_get_next_lease_start_time(offer_uuid, start):
     l_query = model_query(models.Lease)
 
@@ -183,8 +324,7 @@ def offer_get_next_lease_start_time(offer_uuid, start):
         l_query.with_entities(models.Lease.start_time)
         .filter(
             models.Lease.offer_uuid == offer_uuid,
-            (models.Lease.status == statuses.CREATED)
-            | (models.Lease.status == statuses.ACTIVE),
+            models.Lease.status.in_(statuses.LEASE_HOLDS_TIME),
         )
         .order_by(models.Lease.start_time)
         .filter((models.Lease.end_time >= start) & (models.Lease.start_time >= start))
@@ -206,8 +346,7 @@ def offer_verify_availability(offer_ref, start, end):
         models.Lease.start_time, models.Lease.end_time
     ).filter(
         (models.Lease.offer_uuid == offer_ref.uuid),
-        (models.Lease.status == statuses.CREATED)
-        | (models.Lease.status == statuses.ACTIVE),
+        models.Lease.status.in_(statuses.LEASE_HOLDS_TIME),
     )
     leases = add_lease_conflict_filter(leases, start, end)
     conflict = leases.first()
@@ -218,6 +357,17 @@ def offer_verify_availability(offer_ref, start, end):
         )
 
 
+def offer_get_end_times(status, until):
+    """Return distinct end times of offers in status up to until."""
+    query = (
+        model_query(models.Offer)
+        .with_entities(models.Offer.end_time)
+        .filter(models.Offer.status.in_(status), models.Offer.end_time <= until)
+        .distinct()
+    )
+    return [row[0] for row in query]
+
+
 def offer_create(values):
     offer_ref = models.Offer()
     offer_ref.update(values)
@@ -225,7 +375,10 @@ def offer_create(values):
     with _session_for_write() as session:
         session.add(offer_ref)
         session.flush()
-        return offer_ref
+        if utils.overlap_enforced_by_database():
+            _time_ranges_sync(session, interval_index.OFFER, offer_ref)
+    _index_write(interval_index.OFFER, offer_ref)
+    return offer_ref
 
 
 def offer_update(offer_uuid, values):
@@ -249,7 +402,12 @@ def offer_update(offer_uuid, values):
 
         offer_ref.update(values)
         session.flush()
-        return offer_ref
+        if utils.overlap_enforced_by_database() and _TIME_RANGE_FIELDS.intersection(
+            values
+        ):
+            _time_ranges_sync(session, interval_index.OFFER, offer_ref)
+    _index_write(interval_index.OFFER, offer_ref)
+    return offer_ref
 
 
 def offer_destroy(offer_uuid):
@@ -261,19 +419,24 @@ def offer_destroy(offer_uuid):
             raise exception.OfferNotFound(offer_uuid=offer_uuid)
 
         model_query(models.Offer).filter_by(uuid=offer_uuid).delete()
+        if utils.overlap_enforced_by_database():
+            _time_ranges_delete(session, interval_index.OFFER, offer_uuid)
         session.flush()
+    _index_remove(interval_index.OFFER, offer_uuid)
 
 
-def add_offer_conflict_filter(query, start, end):
-    return query.filter(
-        (
-            ((start >= models.Offer.start_time) & (start < models.Offer.end_time))
-            | ((end > models.Offer.start_time) & (end <= models.Offer.end_time))
-            | ((start <= models.Offer.start_time) & (end >= models.Offer.end_time))
-        )
+def _offer_conflict_clause(start, end):
+    return (
+        ((start >= models.Offer.start_time) & (start < models.Offer.end_time))
+        | ((end > models.Offer.start_time) & (end <= models.Offer.end_time))
+        | ((start <= models.Offer.start_time) & (end >= models.Offer.end_time))
     )
 
 
+def add_offer_conflict_filter(query, start, end):
+    return query.filter(_offer_conflict_clause(start, end))
+
+
 # Leases
 def lease_get_by_uuid(lease_uuid):
     query = model_query(models.Lease)
@@ -290,17 +453,26 @@ def lease_get_by_name(name):
 def lease_get_all(filters):
     query = model_query(models.Lease)
 
+    resource_uuids = filters.pop("resource_uuids", None)
+    fields = filters.pop("fields", None)
     start = filters.pop("start_time", None)
     end = filters.pop("end_time", None)
     time_filter_type = filters.pop("time_filter_type", None)
     status = filters.pop("status", None)
     project_or_owner_id = filters.pop("project_or_owner_id", None)
+    limit = filters.pop("limit", None)
+    marker = filters.pop("marker", None)
+    sort_key = filters.pop("sort_key", None)
+    sort_dir = filters.pop("sort_dir", None)
 
     query = query.filter_by(**filters)
 
     if status:
         query = query.filter((models.Lease.status.in_(status)))
 
+    if resource_uuids is not None:
+        query = query.filter(models.Lease.resource_uuid.in_(resource_uuids))
+
     if start and end:
         if time_filter_type == constants.WITHIN_TIME_FILTER:
             query = query.filter(
@@ -320,7 +492,67 @@ def lease_get_all(filters):
             | (project_or_owner_id == models.Lease.owner_id)
         )
 
-    return query
+    query = _load_only(models.Lease, query, fields)
+    return _paginate_query(models.Lease, query, limit, marker, sort_key, sort_dir)
+
+
+def lease_get_all_chunks(filters, chunk_size):
+    return _iter_chunks(lease_get_all(filters), chunk_size)
+
+
+def lease_get_start_times(status, until):
+    """Return distinct start times of leases in status up to until."""
+    query = (
+        model_query(models.Lease)
+        .with_entities(models.Lease.start_time)
+        .filter(models.Lease.status.in_(status), models.Lease.start_time <= until)
+        .distinct()
+    )
+    return [row[0] for row in query]
+
+
+def lease_get_end_times(status, until):
+    """Return distinct end times of leases in status up to until."""
+    query = (
+        model_query(models.Lease)
+        .with_entities(models.Lease.end_time)
+        .filter(models.Lease.status.in_(status), models.Lease.end_time <= until)
+        .distinct()
+    )
+    return [row[0] for row in query]
+
+
+def _lease_get_batch(query, limit, marker):
+    if marker is not None:
+        query = query.filter(models.Lease.id > marker)
+    return query.order_by(models.Lease.id).limit(limit).all()
+
+
+def lease_get_due_to_fulfill(status, now, limit, marker=None):
+    """Return leases in the given statuses whose time window contains now.
+
+    :param limit: maximum number of leases to return
+    :param marker: only return leases with an id greater than this
+    """
+    query = model_query(models.Lease).filter(
+        models.Lease.status.in_(status),
+        models.Lease.start_time <= now,
+        models.Lease.end_time > now,
+    )
+    return _lease_get_batch(query, limit, marker)
+
+
+def lease_get_due_to_expire(status, now, limit, marker=None):
+    """Return leases in the given statuses whose end time has passed.
+
+    :param limit: maximum number of leases to return
+    :param marker: only return leases with an id greater than this
+    """
+    query = model_query(models.Lease).filter(
+        models.Lease.status.in_(status),
+        models.Lease.end_time <= now,
+    )
+    return _lease_get_batch(query, limit, marker)
 
 
 def lease_create(values):
@@ -330,7 +562,10 @@ def lease_create(values):
     with _session_for_write() as session:
         session.add(lease_ref)
         session.flush()
-        return lease_ref
+        if utils.overlap_enforced_by_database():
+            _time_ranges_sync(session, interval_index.LEASE, lease_ref)
+    _index_write(interval_index.LEASE, lease_ref)
+    return lease_ref
 
 
 def lease_update(lease_uuid, values):
@@ -354,7 +589,12 @@ def lease_update(lease_uuid, values):
 
         lease_ref.update(values)
         session.flush()
-        return lease_ref
+        if utils.overlap_enforced_by_database() and _TIME_RANGE_FIELDS.intersection(
+            values
+        ):
+            _time_ranges_sync(session, interval_index.LEASE, lease_ref)
+    _index_write(interval_index.LEASE, lease_ref)
+    return lease_ref
 
 
 def lease_destroy(lease_uuid):
@@ -365,7 +605,10 @@ def lease_destroy(lease_uuid):
         if not lease_ref:
             raise exception.LeaseNotFound(lease_uuid=lease_uuid)
         query.delete()
+        if utils.overlap_enforced_by_database():
+            _time_ranges_delete(session, interval_index.LEASE, lease_uuid)
         session.flush()
+    _index_remove(interval_index.LEASE, lease_uuid)
 
 
 def lease_verify_child_availability(lease_ref, start, end):
@@ -376,83 +619,426 @@ def lease_verify_child_availability(lease_ref, start, end):
             lease_uuid=lease_ref.uuid, start_time=start, end_time=end
         )
 
-    # check lease conflicts
-    l_query = model_query(models.Lease)
-    leases = l_query.with_entities(
-        models.Lease.start_time, models.Lease.end_time
-    ).filter(
+    leases = model_query(models.Lease).filter(
         (models.Lease.parent_lease_uuid == lease_ref.uuid),
-        (models.Lease.status == statuses.CREATED)
-        | (models.Lease.status == statuses.ACTIVE),
+        models.Lease.status.in_(statuses.LEASE_HOLDS_TIME),
     )
-    leases = add_lease_conflict_filter(leases, start, end)
-    lease_conflict = leases.first()
-
-    if lease_conflict:
-        raise exception.LeaseNoTimeAvailabilities(
-            lease_uuid=lease_ref.uuid, start_time=start, end_time=end
-        )
-
-    # check offer conflicts
-    o_query = model_query(models.Offer)
-    offers = o_query.with_entities(
-        models.Offer.start_time, models.Offer.end_time
-    ).filter(
+    offers = model_query(models.Offer).filter(
         (models.Offer.parent_lease_uuid == lease_ref.uuid),
         (models.Offer.status == statuses.AVAILABLE),
     )
-    offers = add_offer_conflict_filter(offers, start, end)
-    offer_conflict = offers.first()
 
-    if offer_conflict:
+    if _any_conflict(offers, leases, start, end):
         raise exception.LeaseNoTimeAvailabilities(
             lease_uuid=lease_ref.uuid, start_time=start, end_time=end
         )
 
 
+def _any_conflict(offers, leases, start, end):
+    """Return an offer or lease conflicting with [start, end].
+
+    Both queries are combined with UNION ALL so the check is a single
+    round trip. The rows are not ordered, so which conflict is returned
+    is up to the database; callers only test whether there is one.
+
+    :param offers: offer query filtered to the candidate offers
+    :param leases: lease query filtered to the candidate leases
+    :returns: (source, start_time, end_time), where source is "offer" or
+              "lease", or None if nothing conflicts
+    """
+    offers = add_offer_conflict_filter(offers, start, end).with_entities(
+        sa.literal("offer").label("source"),
+        models.Offer.start_time,
+        models.Offer.end_time,
+    )
+    leases = add_lease_conflict_filter(leases, start, end).with_entities(
+        sa.literal("lease").label("source"),
+        models.Lease.start_time,
+        models.Lease.end_time,
+    )
+    return offers.union_all(leases).first()
+
+
+def _lease_conflict_clause(start, end):
+    return (
+        ((start >= models.Lease.start_time) & (start < models.Lease.end_time))
+        | ((end > models.Lease.start_time) & (end <= models.Lease.end_time))
+        | ((start <= models.Lease.start_time) & (end >= models.Lease.end_time))
+    )
+
+
 def add_lease_conflict_filter(query, start, end):
-    return query.filter(
-        (
-            ((start >= models.Lease.start_time) & (start < models.Lease.end_time))
-            | ((end > models.Lease.start_time) & (end <= models.Lease.end_time))
-            | ((start <= models.Lease.start_time) & (end >= models.Lease.end_time))
+    return query.filter(_lease_conflict_clause(start, end))
+
+
+# Resources
+def resource_get_intervals(r_type, r_uuid):
+    """Return the available offers and unexpired leases of a resource.
+
+    :returns: list of interval_index.Interval ordered by start_time
+    """
+    index = _get_interval_index()
+    if index is not None:
+        return index.get_intervals(r_type, r_uuid)
+
+    offers = (
+        model_query(models.Offer)
+        .with_entities(
+            models.Offer.start_time,
+            models.Offer.end_time,
+            sa.literal(interval_index.OFFER),
+            models.Offer.uuid,
+            models.Offer.status,
+            models.Offer.resource_type,
+            models.Offer.resource_uuid,
+            sa.literal(None, sa.String),
+        )
+        .filter(
+            models.Offer.resource_type == r_type,
+            models.Offer.resource_uuid == r_uuid,
+            models.Offer.status == statuses.AVAILABLE,
         )
     )
+    leases = (
+        model_query(models.Lease)
+        .with_entities(
+            models.Lease.start_time,
+            models.Lease.end_time,
+            sa.literal(interval_index.LEASE),
+            models.Lease.uuid,
+            models.Lease.status,
+            models.Lease.resource_type,
+            models.Lease.resource_uuid,
+            models.Lease.offer_uuid,
+        )
+        .filter(
+            models.Lease.resource_type == r_type,
+            models.Lease.resource_uuid == r_uuid,
+            models.Lease.status.notin_([statuses.EXPIRED, statuses.DELETED]),
+        )
+    )
+    return sorted(
+        (interval_index.Interval(*row) for row in offers.union_all(leases)),
+        key=lambda i: (i.start_time, i.source, i.uuid),
+    )
 
 
-# Resources
 def resource_verify_availability(r_type, r_uuid, start, end):
-    # check conflict with offers
-    o_query = model_query(models.Offer)
-
-    offers = o_query.with_entities(
-        models.Offer.start_time, models.Offer.end_time
-    ).filter(
+    # the interval index may lag behind other API workers, so this check
+    # guards writes and always goes to the DB
+    offers = model_query(models.Offer).filter(
         (models.Offer.resource_uuid == r_uuid),
         (models.Offer.resource_type == r_type),
         (models.Offer.status == statuses.AVAILABLE),
     )
-    offers = add_offer_conflict_filter(offers, start, end)
-    offer_conflict = offers.first()
+    leases = model_query(models.Lease).filter(
+        (models.Lease.resource_uuid == r_uuid),
+        (models.Lease.resource_type == r_type),
+        models.Lease.status.in_(statuses.LEASE_HOLDS_TIME),
+    )
 
-    if offer_conflict:
+    if _any_conflict(offers, leases, start, end):
         raise exception.ResourceTimeConflict(resource_uuid=r_uuid, resource_type=r_type)
 
-    # check conflict with leases
-    l_query = model_query(models.Lease)
 
-    leases = l_query.with_entities(
-        models.Lease.start_time, models.Lease.end_time
-    ).filter(
-        (models.Lease.resource_uuid == r_uuid),
-        (models.Lease.resource_type == r_type),
-        (models.Lease.status.in_([statuses.CREATED, statuses.ACTIVE])),
+def resource_get_conflicts(windows):
+    """Find offer and lease conflicts for many resource time windows.
+
+    All windows are resolved with a single UNION ALL query over available
+    offers and created/active leases.
+
+    :param windows: list of (resource_type, resource_uuid, start, end)
+    :returns: list parallel to windows; each entry is a list of
+              (source, start_time, end_time) tuples ordered by start_time,
+              where source is "offer" or "lease"
+    """
+    if not windows:
+        return []
+
+    offer_clauses = []
+    lease_clauses = []
+    for r_type, r_uuid, start, end in windows:
+        offer_clauses.append(
+            sa.and_(
+                models.Offer.resource_type == r_type,
+                models.Offer.resource_uuid == r_uuid,
+                _offer_conflict_clause(start, end),
+            )
+        )
+        lease_clauses.append(
+            sa.and_(
+                models.Lease.resource_type == r_type,
+                models.Lease.resource_uuid == r_uuid,
+                _lease_conflict_clause(start, end),
+            )
+        )
+
+    offers = (
+        model_query(models.Offer)
+        .with_entities(
+            sa.literal("offer").label("source"),
+            models.Offer.resource_type,
+            models.Offer.resource_uuid,
+            models.Offer.start_time,
+            models.Offer.end_time,
+        )
+        .filter(models.Offer.status == statuses.AVAILABLE, or_(*offer_clauses))
+    )
+    leases = (
+        model_query(models.Lease)
+        .with_entities(
+            sa.literal("lease").label("source"),
+            models.Lease.resource_type,
+            models.Lease.resource_uuid,
+            models.Lease.start_time,
+            models.Lease.end_time,
+        )
+        .filter(
+            models.Lease.status.in_(statuses.LEASE_HOLDS_TIME),
+            or_(*lease_clauses),
+        )
     )
-    leases = add_lease_conflict_filter(leases, start, end)
-    lease_conflict = leases.first()
 
-    if lease_conflict:
-        raise exception.ResourceTimeConflict(resource_uuid=r_uuid, resource_type=r_type)
+    intervals = {}
+    for source, r_type, r_uuid, start_time, end_time in offers.union_all(leases):
+        intervals.setdefault((r_type, r_uuid), []).append(
+            (source, start_time, end_time)
+        )
+
+    conflicts = []
+    for r_type, r_uuid, start, end in windows:
+        start = utils.datetime_aware(start)
+        end = utils.datetime_aware(end)
+        conflicts.append(
+            sorted(
+                (
+                    interval
+                    for interval in intervals.get((r_type, r_uuid), [])
+                    if utils.datetime_aware(interval[1]) < end
+                    and utils.datetime_aware(interval[2]) > start
+                ),
+                key=lambda interval: interval[1],
+            )
+        )
+    return conflicts
+
+
+@contextlib.contextmanager
+def _lock_timeout(session, timeout):
+    """Limit how long session waits for row locks while the block runs.
+
+    MySQL keeps the setting for the life of the connection, so its previous
+    value is put back before the connection returns to the pool.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "mysql":
+        previous = session.execute(
+            sa.text("SELECT @@innodb_lock_wait_timeout")
+        ).scalar()
+        session.execute(sa.text("SET innodb_lock_wait_timeout = %d" % timeout))
+        try:
+            yield
+        finally:
+            session.execute(sa.text("SET innodb_lock_wait_timeout = %d" % previous))
+        return
+    if dialect == "postgresql":
+        # SET LOCAL ends with the transaction
+        session.execute(sa.text("SET LOCAL lock_timeout = %d" % (timeout * 1000)))
+    yield
+
+
+def resource_lock_supported():
+    """Return whether the database can hold resource_lock row locks.
+
+    SQLite ignores FOR UPDATE, so its row locks exclude no one.
+    """
+    return enginefacade.writer.get_engine().dialect.name != "sqlite"
+
+
+def _resource_lock_create(name):
+    try:
+        with enginefacade.writer.using(_LOCK_CONTEXT) as session:
+            lock = models.ResourceLock()
+            lock.update({"name": name})
+            session.add(lock)
+    except db_exc.DBDuplicateEntry:
+        # another worker created it first
+        pass
+
+
+@contextlib.contextmanager
+def resource_lock(name, timeout):
+    """Hold the database row lock of name while the block runs.
+
+    The lock row is selected FOR UPDATE in a transaction of its own, so
+    database calls made inside the block commit as usual while every other
+    worker, on any host, waits for the lock. The row is created the first
+    time a name is locked. SQLite ignores FOR UPDATE, so the lock only
+    excludes other workers on MySQL and PostgreSQL; see
+    resource_lock_supported.
+
+    :param timeout: seconds to wait for the lock before raising
+                    ResourceLockTimeout
+    """
+    for _ in range(2):
+        with enginefacade.writer.using(_LOCK_CONTEXT) as session:
+            try:
+                with _lock_timeout(session, timeout):
+                    lock = (
+                        session.query(models.ResourceLock.id)
+                        .filter(models.ResourceLock.name == name)
+                        .with_for_update()
+                        .first()
+                    )
+            except db_exc.DBError:
+                LOG.exception("Error acquiring resource lock %s", name)
+                raise exception.ResourceLockTimeout(name=name, timeout=timeout)
+            if lock is not None:
+                yield
+                return
+        _resource_lock_create(name)
+    raise exception.ResourceLockTimeout(name=name, timeout=timeout)
+
+
+# Resource time ranges
+_TIME_RANGE_FIELDS = frozenset(("start_time", "end_time", "status"))
+
+
+def _holds_time(source, ref):
+    if source == interval_index.OFFER:
+        return ref.status == statuses.AVAILABLE
+    return ref.status in statuses.LEASE_HOLDS_TIME
+
+
+def _time_range_scope(source, ref):
+    """Return the scope ref takes its time from, and its conflict error."""
+    start, end = str(ref.start_time), str(ref.end_time)
+    if source == interval_index.LEASE and ref.offer_uuid:
+        return (
+            "offer:" + ref.offer_uuid,
+            exception.OfferNoTimeAvailabilities(
+                offer_uuid=ref.offer_uuid, start_time=start, end_time=end
+            ),
+        )
+    if ref.parent_lease_uuid:
+        return (
+            "lease:" + ref.parent_lease_uuid,
+            exception.LeaseNoTimeAvailabilities(
+                lease_uuid=ref.parent_lease_uuid, start_time=start, end_time=end
+            ),
+        )
+    return (
+        "resource:%s:%s" % (ref.resource_type, ref.resource_uuid),
+        exception.ResourceTimeConflict(
+            resource_type=ref.resource_type, resource_uuid=ref.resource_uuid
+        ),
+    )
+
+
+def _time_range_scope_lock(session, scope):
+    """Lock scope until the end of session's transaction.
+
+    Used where the database cannot reject overlapping ranges itself. The
+    scope's row in resource_locks is selected FOR UPDATE, and created the
+    first time the scope is written. SQLite ignores FOR UPDATE but lets
+    only one transaction write at a time, and the caller has already
+    written its offer or lease.
+    """
+    name = "time-range:" + scope
+    for _ in range(2):
+        lock = (
+            session.query(models.ResourceLock.id)
+            .filter(models.ResourceLock.name == name)
+            .with_for_update()
+            .first()
+        )
+        if lock is not None:
+            return
+        try:
+            with session.begin_nested():
+                lock = models.ResourceLock()
+                lock.update({"name": name})
+                session.add(lock)
+        except db_exc.DBDuplicateEntry:
+            # another writer created it first
+            pass
+    raise exception.ResourceLockTimeout(name=name, timeout=CONF.api.lock_timeout)
+
+
+def _is_exclusion_violation(e):
+    orig = getattr(e.inner_exception, "orig", None)
+    return getattr(orig, "pgcode", None) == "23P01"
+
+
+def _time_ranges_delete(session, source, uuid):
+    session.query(models.ResourceTimeRange).filter_by(source=source, uuid=uuid).delete(
+        synchronize_session=False
+    )
+
+
+def _time_ranges_sync(session, source, ref):
+    """Replace the time held by ref, failing if it overlaps another hold.
+
+    Runs in the caller's transaction, so a conflict also rolls back the
+    offer or lease write that caused it.
+    """
+    _time_ranges_delete(session, source, ref.uuid)
+    if not _holds_time(source, ref):
+        return
+
+    scope, conflict = _time_range_scope(source, ref)
+    start = timeutils.normalize_time(ref.start_time)
+    end = timeutils.normalize_time(ref.end_time)
+
+    if session.get_bind().dialect.name != "postgresql":
+        _time_range_scope_lock(session, scope)
+        # a locking read sees ranges committed after this transaction began
+        overlap = (
+            session.query(models.ResourceTimeRange.id)
+            .filter(
+                models.ResourceTimeRange.scope == scope,
+                models.ResourceTimeRange.start_time < end,
+                models.ResourceTimeRange.end_time > start,
+            )
+            .with_for_update()
+            .first()
+        )
+        if overlap is not None:
+            raise conflict
+
+    time_range = models.ResourceTimeRange()
+    time_range.update(
+        dict(scope=scope, source=source, uuid=ref.uuid, start_time=start, end_time=end)
+    )
+    try:
+        session.add(time_range)
+        session.flush()
+    except db_exc.DBError as e:
+        if _is_exclusion_violation(e):
+            raise conflict
+        raise
+
+
+def resource_time_ranges_rebuild():
+    """Rebuild every held time range from the offers and leases.
+
+    Run this when enabling database overlap enforcement, since ranges are
+    only kept up to date while it is enabled.
+    """
+    with _session_for_write() as session:
+        session.query(models.ResourceTimeRange).delete(synchronize_session=False)
+        offers = session.query(models.Offer).filter(
+            models.Offer.status == statuses.AVAILABLE
+        )
+        leases = session.query(models.Lease).filter(
+            models.Lease.status.in_(statuses.LEASE_HOLDS_TIME)
+        )
+        for source, query in (
+            (interval_index.OFFER, offers),
+            (interval_index.LEASE, leases),
+        ):
+            for ref in query:
+                _time_ranges_sync(session, source, ref)
 
 
 # Events
@@ -461,9 +1047,12 @@ def resource_verify_availability(r_type, r_uuid, start, end):
 def event_get_all(filters):
     query = model_query(models.Event)
 
+    fields = filters.pop("fields", None)
     last_event_time = filters.pop("last_event_time", None)
     last_event_id = filters.pop("last_event_id", None)
     lessee_or_owner_id = filters.pop("lessee_or_owner_id", None)
+    limit = filters.pop("limit", None)
+    marker = filters.pop("marker", None)
 
     query = query.filter_by(**filters)
 
@@ -477,7 +1066,8 @@ def event_get_all(filters):
             | (lessee_or_owner_id == models.Event.owner_id)
         )
 
-    return query
+    query = _load_only(models.Event, query, fields)
+    return _paginate_query(models.Event, query, limit, marker, marker_key="id")
 
 
 def event_create(values):
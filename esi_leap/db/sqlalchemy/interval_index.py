@@ -0,0 +1,337 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""In-memory index of offer and lease time intervals per resource.
+
+The database remains the source of truth. The index is loaded with a full
+scan, then kept current by periodically reading the offers and leases whose
+created_at or updated_at changed since the last refresh. Writes made by this
+process are applied right away; rows hard-deleted by other processes are only
+dropped by the next full rebuild, which runs in a background thread. Only
+best-effort views such as the node listing read from it.
+"""
+
+import bisect
+import collections
+import datetime
+import threading
+
+from oslo_config import cfg
+from oslo_db.sqlalchemy import enginefacade
+from oslo_log import log as logging
+from oslo_utils import timeutils
+import sqlalchemy as sa
+
+from esi_leap.common import statuses
+from esi_leap.db.sqlalchemy import models
+
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+OFFER = "offer"
+LEASE = "lease"
+
+# leases in these statuses never block a resource or an offer
+_LEASE_IGNORED_STATUSES = (statuses.EXPIRED, statuses.DELETED)
+
+# rows committed slightly out of timestamp order are re-read on refresh
+_REFRESH_OVERLAP = datetime.timedelta(seconds=5)
+
+Interval = collections.namedtuple(
+    "Interval",
+    [
+        "start_time",
+        "end_time",
+        "source",
+        "uuid",
+        "status",
+        "resource_type",
+        "resource_uuid",
+        "offer_uuid",
+    ],
+)
+
+_INDEX = None
+_INDEX_LOCK = threading.Lock()
+
+# background rebuilds read through their own transactions
+_REBUILD_CONTEXT = threading.local()
+
+
+def get_index():
+    global _INDEX
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                _INDEX = IntervalIndex()
+    return _INDEX
+
+
+def _naive(dt):
+    return timeutils.normalize_time(dt) if dt is not None else None
+
+
+def overlaps(interval, start, end):
+    """Mirror of the SQL offer and lease conflict clauses."""
+    return (
+        (start >= interval.start_time and start < interval.end_time)
+        or (end > interval.start_time and end <= interval.end_time)
+        or (start <= interval.start_time and end >= interval.end_time)
+    )
+
+
+class _ResourceIntervals(object):
+    """Intervals of a single resource, sorted by start time.
+
+    Any interval overlapping [start, end] starts no later than end and no
+    earlier than start minus the longest interval seen, so an overlap
+    query is two bisections plus a scan of that window.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.intervals = []
+        self.max_span = datetime.timedelta(0)
+
+    def add(self, interval):
+        key = (interval.start_time, interval.source, interval.uuid)
+        i = bisect.bisect_left(self.keys, key)
+        self.keys.insert(i, key)
+        self.intervals.insert(i, interval)
+        self.max_span = max(self.max_span, interval.end_time - interval.start_time)
+
+    def remove(self, interval):
+        key = (interval.start_time, interval.source, interval.uuid)
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            del self.keys[i]
+            del self.intervals[i]
+
+    def overlapping(self, start, end):
+        lo = bisect.bisect_left(self.keys, (start - self.max_span,))
+        hi = bisect.bisect_right(self.keys, (end, "\uffff"))
+        return [i for i in self.intervals[lo:hi] if overlaps(i, start, end)]
+
+
+def _interval(source, row):
+    """Build the interval of an offer or lease row.
+
+    Intervals that should not be indexed have status None.
+    """
+    if source == OFFER:
+        indexed = row.status == statuses.AVAILABLE
+        offer_uuid = None
+    else:
+        indexed = row.status not in _LEASE_IGNORED_STATUSES
+        offer_uuid = row.offer_uuid
+    return Interval(
+        _naive(row.start_time),
+        _naive(row.end_time),
+        source,
+        row.uuid,
+        row.status if indexed else None,
+        row.resource_type,
+        row.resource_uuid,
+        offer_uuid,
+    )
+
+
+class IntervalIndex(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._resources = {}
+        self._by_uuid = {}
+        self._watermark = None
+        self._last_refresh = None
+        self._last_rebuild = None
+        self._rebuild_thread = None
+
+    @staticmethod
+    def _read(session, since=None):
+        """Read offer and lease intervals from the database.
+
+        With since, every offer and lease created or updated since then is
+        returned; intervals that should leave the index have status None.
+
+        :returns: (list of intervals, newest timestamp seen)
+        """
+        offer_q = session.query(
+            models.Offer.uuid,
+            models.Offer.status,
+            models.Offer.resource_type,
+            models.Offer.resource_uuid,
+            models.Offer.start_time,
+            models.Offer.end_time,
+            models.Offer.created_at,
+            models.Offer.updated_at,
+        )
+        lease_q = session.query(
+            models.Lease.uuid,
+            models.Lease.status,
+            models.Lease.resource_type,
+            models.Lease.resource_uuid,
+            models.Lease.start_time,
+            models.Lease.end_time,
+            models.Lease.created_at,
+            models.Lease.updated_at,
+            models.Lease.offer_uuid,
+        )
+        if since is None:
+            offer_q = offer_q.filter(models.Offer.status == statuses.AVAILABLE)
+            lease_q = lease_q.filter(
+                models.Lease.status.notin_(_LEASE_IGNORED_STATUSES)
+            )
+        else:
+            offer_q = offer_q.filter(
+                sa.or_(
+                    models.Offer.created_at >= since, models.Offer.updated_at >= since
+                )
+            )
+            lease_q = lease_q.filter(
+                sa.or_(
+                    models.Lease.created_at >= since, models.Lease.updated_at >= since
+                )
+            )
+
+        intervals = []
+        watermark = None
+        for source, query in ((OFFER, offer_q), (LEASE, lease_q)):
+            for row in query:
+                watermark = max(
+                    filter(None, (watermark, row.created_at, row.updated_at))
+                )
+                intervals.append(_interval(source, row))
+        return intervals, watermark
+
+    def _apply(self, intervals):
+        for interval in intervals:
+            key = (interval.source, interval.uuid)
+            old = self._by_uuid.pop(key, None)
+            if old is not None:
+                self._resources[(old.resource_type, old.resource_uuid)].remove(old)
+            if interval.status is None:
+                continue
+            self._by_uuid[key] = interval
+            self._resources.setdefault(
+                (interval.resource_type, interval.resource_uuid),
+                _ResourceIntervals(),
+            ).add(interval)
+
+    def rebuild(self, session):
+        now = timeutils.utcnow()
+        intervals, _ = self._read(session)
+        intervals.sort(key=lambda i: (i.start_time, i.source, i.uuid))
+
+        resources = {}
+        by_uuid = {}
+        for interval in intervals:
+            by_uuid[(interval.source, interval.uuid)] = interval
+            resource = resources.setdefault(
+                (interval.resource_type, interval.resource_uuid),
+                _ResourceIntervals(),
+            )
+            # intervals are already sorted, so append instead of bisecting
+            resource.keys.append((interval.start_time, interval.source, interval.uuid))
+            resource.intervals.append(interval)
+            resource.max_span = max(
+                resource.max_span, interval.end_time - interval.start_time
+            )
+
+        with self._lock:
+            self._resources = resources
+            self._by_uuid = by_uuid
+            self._watermark = now
+            self._last_rebuild = self._last_refresh = now
+        LOG.debug("Rebuilt interval index with %d intervals", len(by_uuid))
+
+    def _rebuild_in_background(self):
+        def _rebuild():
+            try:
+                with enginefacade.reader.using(_REBUILD_CONTEXT) as session:
+                    self.rebuild(session)
+            except Exception:
+                LOG.exception("Failed to rebuild interval index")
+
+        self._rebuild_thread = threading.Thread(target=_rebuild, daemon=True)
+        self._rebuild_thread.start()
+
+    def refresh(self, session, force=False):
+        """Bring the index up to date if it is older than the refresh interval.
+
+        Only one thread refreshes at a time; others keep reading the
+        current contents instead of waiting. The first load is done inline;
+        later full rebuilds run in a background thread while this one
+        carries on with an incremental refresh.
+
+        :param session: database session used to read changed rows
+        :param force: refresh even if the refresh interval has not passed
+        """
+        if not self._refresh_lock.acquire(blocking=self._last_rebuild is None):
+            return
+        try:
+            now = timeutils.utcnow()
+            if self._last_rebuild is None:
+                self.rebuild(session)
+                return
+
+            if now - self._last_rebuild >= datetime.timedelta(
+                seconds=CONF.api.interval_index_rebuild_interval
+            ) and (self._rebuild_thread is None or not self._rebuild_thread.is_alive()):
+                self._rebuild_in_background()
+
+            if not force and now - self._last_refresh < datetime.timedelta(
+                seconds=CONF.api.interval_index_refresh_interval
+            ):
+                return
+
+            intervals, watermark = self._read(
+                session, self._watermark - _REFRESH_OVERLAP
+            )
+            with self._lock:
+                self._apply(intervals)
+                if watermark is not None:
+                    self._watermark = max(self._watermark, watermark)
+                self._last_refresh = now
+        finally:
+            self._refresh_lock.release()
+
+    def apply_row(self, source, row):
+        """Apply an offer or lease row written by this process.
+
+        Does nothing before the first load, which reads the row anyway.
+        """
+        with self._lock:
+            if self._last_rebuild is not None:
+                self._apply([_interval(source, row)])
+
+    def remove(self, source, uuid):
+        """Drop an offer or lease hard-deleted by this process."""
+        with self._lock:
+            old = self._by_uuid.pop((source, uuid), None)
+            if old is not None:
+                self._resources[(old.resource_type, old.resource_uuid)].remove(old)
+
+    def get_intervals(self, r_type, r_uuid, start=None, end=None):
+        """Return the indexed intervals of a resource ordered by start time.
+
+        :param start: if given with end, only intervals overlapping
+                      [start, end] are returned
+        """
+        with self._lock:
+            resource = self._resources.get((r_type, r_uuid))
+            if resource is None:
+                return []
+            if start is None or end is None:
+                return list(resource.intervals)
+            return resource.overlapping(_naive(start), _naive(end))
@@ -16,7 +16,7 @@ from oslo_db.sqlalchemy import types as db_types
 from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import declarative_base
 from sqlalchemy import orm
-from sqlalchemy import Column, DateTime, ForeignKey
+from sqlalchemy import Column, DateTime, DDL, event, ForeignKey
 from sqlalchemy import Index, Integer, String
 
 from esi_leap.common import statuses
@@ -49,6 +49,19 @@ class Offer(Base):
         Index("offer_project_id_idx", "project_id"),
         Index("offer_resource_idx", "resource_type", "resource_uuid"),
         Index("offer_status_idx", "status"),
+        Index("offer_name_idx", "name"),
+        Index(
+            "offer_resource_status_time_idx",
+            "resource_type",
+            "resource_uuid",
+            "status",
+            "start_time",
+            "end_time",
+        ),
+        Index("offer_parent_lease_uuid_idx", "parent_lease_uuid", "status"),
+        Index("offer_status_end_time_idx", "status", "end_time"),
+        Index("offer_created_at_idx", "created_at"),
+        Index("offer_updated_at_idx", "updated_at"),
     )
 
     id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
@@ -78,6 +91,21 @@ class Lease(Base):
         Index("lease_project_id_idx", "project_id"),
         Index("lease_owner_id_idx", "owner_id"),
         Index("lease_status_idx", "status"),
+        Index("lease_name_idx", "name"),
+        Index(
+            "lease_resource_status_time_idx",
+            "resource_type",
+            "resource_uuid",
+            "status",
+            "start_time",
+            "end_time",
+        ),
+        Index("lease_offer_uuid_idx", "offer_uuid", "status", "start_time"),
+        Index("lease_parent_lease_uuid_idx", "parent_lease_uuid", "status"),
+        Index("lease_status_start_time_idx", "status", "start_time"),
+        Index("lease_status_end_time_idx", "status", "end_time"),
+        Index("lease_created_at_idx", "created_at"),
+        Index("lease_updated_at_idx", "updated_at"),
     )
 
     id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
@@ -141,3 +169,51 @@ class ConsoleAuthToken(Base):
     node_uuid = Column(String(255), nullable=False)
     token_hash = Column(String(255), nullable=False)
     expires = Column(Integer, nullable=False)
+
+
+class ResourceLock(Base):
+    """Represents the lock row of a resource."""
+
+    __tablename__ = "resource_locks"
+
+    id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
+    name = Column(String(255), nullable=False, unique=True)
+
+
+class ResourceTimeRange(Base):
+    """Represents time held by an offer or lease within its scope.
+
+    The scope is the resource, offer or parent lease the time is taken
+    from. Each hold is one row. On PostgreSQL an exclusion constraint
+    rejects overlapping ranges in a scope; elsewhere writers lock the scope
+    and check for overlaps before inserting.
+    """
+
+    __tablename__ = "resource_time_ranges"
+    __table_args__ = (
+        Index("resource_time_range_holder_idx", "source", "uuid"),
+        Index("resource_time_range_scope_idx", "scope", "start_time"),
+    )
+
+    id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
+    scope = Column(String(255), nullable=False)
+    source = Column(String(15), nullable=False)
+    uuid = Column(String(36), nullable=False)
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+
+
+event.listen(
+    ResourceTimeRange.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
+event.listen(
+    ResourceTimeRange.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE resource_time_ranges "
+        "ADD CONSTRAINT resource_time_ranges_no_overlap "
+        "EXCLUDE USING gist (scope WITH =, tsrange(start_time, end_time) WITH &&)"
+    ).execute_if(dialect="postgresql"),
+)
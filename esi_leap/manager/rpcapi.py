@@ -24,9 +24,46 @@ class ManagerRPCAPI(object):
     API version history:
 
     * 1.0 - Initial version.
+    * 1.1 - Add reschedule.
+    * 1.2 - Add fulfill_lease, expire_lease and cancel_lease.
     """
 
     def __init__(self):
+        # casts go to any manager listening on the topic, not to a manager
+        # on this API's host
+        target = messaging.Target(
+            topic=utils.TOPIC,
+            version=utils.RPC_API_VERSION,
+            namespace=utils.NAMESPACE,
+        )
         self._client = messaging.RPCClient(
-            target=utils.get_target(), transport=messaging.get_rpc_transport(CONF)
+            target=target, transport=messaging.get_rpc_transport(CONF)
         )
+
+    def reschedule(self, context):
+        """Ask the manager to reload lease and offer deadlines.
+
+        The cast is not retried; the manager's safety poll picks up any
+        change whose notification is lost.
+        """
+        cctxt = self._client.prepare(version="1.1", retry=0)
+        cctxt.cast(context.to_dict(), "reschedule")
+
+    def fulfill_lease(self, context, lease_uuid):
+        """Ask the manager to fulfill a lease that is due to start.
+
+        Like all casts here this is not retried; the manager's periodic
+        jobs act on the lease if the message is lost.
+        """
+        cctxt = self._client.prepare(version="1.2", retry=0)
+        cctxt.cast(context.to_dict(), "fulfill_lease", lease_uuid=lease_uuid)
+
+    def expire_lease(self, context, lease_uuid):
+        """Ask the manager to expire a lease that is due to end."""
+        cctxt = self._client.prepare(version="1.2", retry=0)
+        cctxt.cast(context.to_dict(), "expire_lease", lease_uuid=lease_uuid)
+
+    def cancel_lease(self, context, lease_uuid):
+        """Ask the manager to cancel a lease in wait cancel status."""
+        cctxt = self._client.prepare(version="1.2", retry=0)
+        cctxt.cast(context.to_dict(), "cancel_lease", lease_uuid=lease_uuid)
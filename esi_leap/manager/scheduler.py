@@ -0,0 +1,122 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import heapq
+import threading
+
+from oslo_log import log as logging
+from oslo_utils import timeutils
+
+LOG = logging.getLogger(__name__)
+
+# seconds to wait before retrying after the scheduler itself fails
+ERROR_RETRY_INTERVAL = 10
+
+
+class DeadlineScheduler(object):
+    """Run jobs when lease and offer transition times come due.
+
+    Deadlines are kept in a min-heap of (time, job) loaded from the
+    database one horizon at a time. The scheduler sleeps until the earliest
+    deadline, runs each due job once, and reloads when it reaches the end
+    of the loaded horizon or when woken by reload().
+
+    :param jobs: dict mapping job name to a callable taking no arguments
+    :param load_deadlines: callable (until) returning (time, job) pairs for
+                           pending transitions due no later than until,
+                           including overdue ones
+    :param horizon: how far ahead deadlines are loaded, in seconds
+    """
+
+    def __init__(self, jobs, load_deadlines, horizon):
+        self._jobs = jobs
+        self._load_deadlines = load_deadlines
+        self._horizon = datetime.timedelta(seconds=horizon)
+        self._heap = []
+        self._loaded_until = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+
+    def add(self, deadline, job):
+        with self._lock:
+            heapq.heappush(self._heap, (deadline, job))
+        self._wakeup.set()
+
+    def run_soon(self, job):
+        """Run a job on the next iteration, ahead of its known deadlines."""
+        self.add(timeutils.utcnow(), job)
+
+    def reload(self):
+        """Reload deadlines from the database on the next iteration."""
+        with self._lock:
+            self._loaded_until = None
+        self._wakeup.set()
+
+    def poll(self):
+        """Run every job now, regardless of known deadlines."""
+        now = timeutils.utcnow()
+        with self._lock:
+            for job in self._jobs:
+                heapq.heappush(self._heap, (now, job))
+        self._wakeup.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+
+    def _load(self, now):
+        until = now + self._horizon
+        deadlines = list(self._load_deadlines(until))
+        with self._lock:
+            # keep due entries such as those pushed by poll()
+            due = [d for d in self._heap if d[0] <= now]
+            self._heap = due + deadlines
+            heapq.heapify(self._heap)
+            self._loaded_until = until
+
+    def run_once(self):
+        """Run due jobs and return the number of seconds until the next one."""
+        now = timeutils.utcnow()
+        if self._loaded_until is None or now >= self._loaded_until:
+            self._load(now)
+
+        due = set()
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due.add(heapq.heappop(self._heap)[1])
+
+        for job in sorted(due):
+            try:
+                self._jobs[job]()
+            except Exception:
+                LOG.exception("Error running scheduled job %s", job)
+
+        with self._lock:
+            next_run = self._loaded_until
+            if next_run is None:
+                return 0
+            if self._heap:
+                next_run = min(next_run, self._heap[0][0])
+        return max((next_run - timeutils.utcnow()).total_seconds(), 0)
+
+    def run(self):
+        while not self._stopped:
+            # clear before running so wakeups during the run are not lost
+            self._wakeup.clear()
+            try:
+                timeout = self.run_once()
+            except Exception:
+                LOG.exception("Error in lease scheduler")
+                timeout = ERROR_RETRY_INTERVAL
+            self._wakeup.wait(timeout)
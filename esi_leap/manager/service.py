@@ -10,13 +10,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
 
 from esi_leap.common import statuses
 import esi_leap.conf
+from esi_leap.manager import scheduler
 from esi_leap.manager import utils
 from esi_leap.objects import console_auth_token as cat_obj
 from esi_leap.objects import lease as lease_obj
 from esi_leap.objects import offer as offer_obj
+from esi_leap import resource_objects
 from oslo_context import context as ctx
 from oslo_log import log as logging
 import oslo_messaging as messaging
@@ -25,17 +28,48 @@ from oslo_utils import timeutils
 
 CONF = esi_leap.conf.CONF
 EVENT_INTERVAL = 60
+LEASE_BATCH_SIZE = 100
 LOG = logging.getLogger(__name__)
 
+# lease and offer transitions are run by the deadline scheduler; these
+# polls only repair missed wakeups
+SAFETY_POLL_INTERVAL = 600
+SCHEDULER_HORIZON = 3600
+# leases left waiting by a failed fulfill or expire are retried this soon
+WAIT_RETRY_INTERVAL = EVENT_INTERVAL
+
+FULFILL_LEASES = "fulfill_leases"
+EXPIRE_LEASES = "expire_leases"
+CANCEL_LEASES = "cancel_leases"
+EXPIRE_OFFERS = "expire_offers"
+
+LEASE_FULFILL_STATUSES = [statuses.CREATED, statuses.WAIT_FULFILL]
+LEASE_EXPIRE_STATUSES = [
+    statuses.ACTIVE,
+    statuses.CREATED,
+    statuses.WAIT_EXPIRE,
+    statuses.WAIT_FULFILL,
+]
+
 
 class ManagerService(service.Service):
     def __init__(self):
         super(ManagerService, self).__init__()
+        self._scheduler = scheduler.DeadlineScheduler(
+            {
+                FULFILL_LEASES: self._fulfill_leases,
+                EXPIRE_LEASES: self._expire_leases,
+                CANCEL_LEASES: self._cancel_leases,
+                EXPIRE_OFFERS: self._expire_offers,
+            },
+            self._load_deadlines,
+            SCHEDULER_HORIZON,
+        )
         LOG.info("Creating esi-leap manager RPC server")
         self._server = messaging.get_rpc_server(
             target=utils.get_target(),
             transport=messaging.get_rpc_transport(CONF),
-            endpoints=[ManagerEndpoint()],
+            endpoints=[ManagerEndpoint(self._scheduler)],
             executor="eventlet",
         )
         self._context = ctx.RequestContext(
@@ -46,63 +80,94 @@ class ManagerService(service.Service):
         super(ManagerService, self).start()
         LOG.info("Starting esi-leap manager RPC server")
         self.tg.add_thread(self._server.start)
-        LOG.info("Starting _fulfill_leases periodic job")
-        self.tg.add_timer(EVENT_INTERVAL, self._fulfill_leases)
-        LOG.info("Starting _expire_leases periodic job")
-        self.tg.add_timer(EVENT_INTERVAL, self._expire_leases)
+        LOG.info("Starting lease scheduler")
+        self._scheduler.poll()
+        self.tg.add_thread(self._scheduler.run)
+        LOG.info("Starting lease and offer safety poll")
+        self.tg.add_timer(
+            SAFETY_POLL_INTERVAL, self._scheduler.poll, SAFETY_POLL_INTERVAL
+        )
+        # cancellations are normally cast by the API; this poll covers
+        # casts lost while the message bus is down
         LOG.info("Starting _cancel_leases periodic job")
-        self.tg.add_timer(EVENT_INTERVAL, self._cancel_leases)
-        LOG.info("Starting _expire_offers periodic job")
-        self.tg.add_timer(EVENT_INTERVAL, self._expire_offers)
+        self.tg.add_timer(EVENT_INTERVAL, self._scheduler.run_soon, None, CANCEL_LEASES)
         LOG.info("Starting _clean_expired_console_tokens periodic job")
         self.tg.add_timer(EVENT_INTERVAL, self._clean_expired_console_tokens)
 
     def stop(self):
         super(ManagerService, self).stop()
         LOG.info("Shutting down esi-leap manager RPC server")
+        self._scheduler.stop()
         self._server.stop()
 
+    def _load_deadlines(self, until):
+        deadlines = []
+        for t in lease_obj.Lease.get_start_times(LEASE_FULFILL_STATUSES, until):
+            deadlines.append((t, FULFILL_LEASES))
+        for t in lease_obj.Lease.get_end_times(LEASE_EXPIRE_STATUSES, until):
+            deadlines.append((t, EXPIRE_LEASES))
+        for t in offer_obj.Offer.get_end_times(statuses.OFFER_CAN_DELETE, until):
+            deadlines.append((t, EXPIRE_OFFERS))
+        return deadlines
+
+    def _get_due_leases(self, get_batch, status, now):
+        marker = None
+        while True:
+            leases = get_batch(status, now, LEASE_BATCH_SIZE, marker, self._context)
+            for lease in leases:
+                yield lease
+            if len(leases) < LEASE_BATCH_SIZE:
+                return
+            marker = leases[-1].id
+
+    def _retry_later(self, job):
+        self._scheduler.add(
+            timeutils.utcnow() + datetime.timedelta(seconds=WAIT_RETRY_INTERVAL), job
+        )
+
     def _fulfill_leases(self):
         LOG.info("Checking for leases to fulfill")
-        leases = lease_obj.Lease.get_all(
-            {"status": [statuses.CREATED, statuses.WAIT_FULFILL]}, self._context
+        leases = self._get_due_leases(
+            lease_obj.Lease.get_due_to_fulfill,
+            LEASE_FULFILL_STATUSES,
+            timeutils.utcnow(),
         )
-        now = timeutils.utcnow()
+        waiting = False
         for lease in leases:
-            if lease.start_time <= now and now <= lease.end_time:
-                try:
-                    LOG.info("Fulfilling lease %s", lease.uuid)
+            try:
+                LOG.info("Fulfilling lease %s", lease.uuid)
+                with resource_objects.identity_map():
                     lease.fulfill(self._context)
-                except Exception as e:
-                    LOG.info("Error fulfilling lease: %s: %s" % (type(e).__name__, e))
-                    LOG.info("Setting lease status to ERROR")
-                    lease.status = statuses.ERROR
-                    lease.save()
+                waiting = waiting or lease.status == statuses.WAIT_FULFILL
+            except Exception as e:
+                LOG.info("Error fulfilling lease: %s: %s" % (type(e).__name__, e))
+                LOG.info("Setting lease status to ERROR")
+                lease.status = statuses.ERROR
+                lease.save()
+        if waiting:
+            self._retry_later(FULFILL_LEASES)
 
     def _expire_leases(self):
         LOG.info("Checking for expiring leases")
-        leases = lease_obj.Lease.get_all(
-            {
-                "status": [
-                    statuses.ACTIVE,
-                    statuses.CREATED,
-                    statuses.WAIT_EXPIRE,
-                    statuses.WAIT_FULFILL,
-                ]
-            },
-            self._context,
+        leases = self._get_due_leases(
+            lease_obj.Lease.get_due_to_expire,
+            LEASE_EXPIRE_STATUSES,
+            timeutils.utcnow(),
         )
-        now = timeutils.utcnow()
+        waiting = False
         for lease in leases:
-            if lease.end_time <= now:
-                try:
-                    LOG.info("Expiring lease %s", lease.uuid)
+            try:
+                LOG.info("Expiring lease %s", lease.uuid)
+                with resource_objects.identity_map():
                     lease.expire(self._context)
-                except Exception as e:
-                    LOG.info("Error expiring lease: %s: %s" % (type(e).__name__, e))
-                    LOG.info("Setting lease status to ERROR")
-                    lease.status = statuses.ERROR
-                    lease.save()
+                waiting = waiting or lease.status == statuses.WAIT_EXPIRE
+            except Exception as e:
+                LOG.info("Error expiring lease: %s: %s" % (type(e).__name__, e))
+                LOG.info("Setting lease status to ERROR")
+                lease.status = statuses.ERROR
+                lease.save()
+        if waiting:
+            self._retry_later(EXPIRE_LEASES)
 
     def _cancel_leases(self):
         LOG.info("Checking for leases to cancel")
@@ -112,7 +177,8 @@ class ManagerService(service.Service):
         for lease in leases:
             try:
                 LOG.info("Cancelling lease %s", lease.uuid)
-                lease.cancel()
+                with resource_objects.identity_map():
+                    lease.cancel()
             except Exception as e:
                 LOG.info("Error cancelling lease: %s: %s" % (type(e).__name__, e))
                 LOG.info("Setting lease status to ERROR")
@@ -134,7 +200,8 @@ class ManagerService(service.Service):
                         offer.resource_type,
                         offer.resource_uuid,
                     )
-                    offer.expire(self._context)
+                    with resource_objects.identity_map():
+                        offer.expire(self._context)
                 except Exception as e:
                     LOG.info("Error expiring offer: %s: %s" % (type(e).__name__, e))
                     offer.status = statuses.ERROR
@@ -147,3 +214,31 @@ class ManagerService(service.Service):
 
 class ManagerEndpoint(object):
     target = utils.get_target()
+
+    def __init__(self, scheduler):
+        self._scheduler = scheduler
+
+    def reschedule(self, context):
+        """Reload lease and offer deadlines after they were changed."""
+        self._scheduler.reload()
+
+    def fulfill_lease(self, context, lease_uuid):
+        """Fulfill a newly created lease without waiting for a poll.
+
+        The fulfill job runs in the scheduler thread, so it never races
+        with a scheduled run; it also picks up any other due lease.
+        """
+        LOG.info("Received fulfill request for lease %s", lease_uuid)
+        self._scheduler.reload()
+        self._scheduler.run_soon(FULFILL_LEASES)
+
+    def expire_lease(self, context, lease_uuid):
+        """Expire a lease whose end time was moved into the past."""
+        LOG.info("Received expire request for lease %s", lease_uuid)
+        self._scheduler.reload()
+        self._scheduler.run_soon(EXPIRE_LEASES)
+
+    def cancel_lease(self, context, lease_uuid):
+        """Cancel a lease the API has marked as waiting for cancellation."""
+        LOG.info("Received cancel request for lease %s", lease_uuid)
+        self._scheduler.run_soon(CANCEL_LEASES)
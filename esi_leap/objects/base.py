@@ -28,16 +28,23 @@ class ESILEAPObject(object_base.VersionedObject):
     }
 
     @staticmethod
-    def _from_db_object(context, obj, db_obj):
-        for key in obj.fields:
+    def _from_db_object(context, obj, db_obj, fields=None):
+        """Copy a database row into obj.
+
+        :param fields: if given, only these fields are copied; the others
+                       are left unset
+        """
+        for key in fields or obj.fields:
             setattr(obj, key, db_obj[key])
             obj.obj_reset_changes()
         obj._context = context
         return obj
 
     @classmethod
-    def _from_db_object_list(cls, context, db_objs):
-        return [cls._from_db_object(context, cls(), db_obj) for db_obj in db_objs]
+    def _from_db_object_list(cls, context, db_objs, fields=None):
+        return [
+            cls._from_db_object(context, cls(), db_obj, fields) for db_obj in db_objs
+        ]
 
     def to_dict(self):
         return dict(
@@ -40,8 +40,10 @@ class Event(base.ESILEAPObject):
 
     @classmethod
     def get_all(cls, filters, context=None):
+        # read before the db api consumes it
+        fields = filters.get("fields")
         db_events = cls.dbapi.event_get_all(filters)
-        return cls._from_db_object_list(context, db_events)
+        return cls._from_db_object_list(context, db_events, fields)
 
     def create(self, context=None):
         updates = self.obj_get_changes()
@@ -156,7 +156,34 @@ class Lease(base.ESILEAPObject):
 
     @classmethod
     def get_all(cls, filters, context=None):
+        # read before the db api consumes it
+        fields = filters.get("fields")
         db_leases = cls.dbapi.lease_get_all(filters)
+        return cls._from_db_object_list(context, db_leases, fields)
+
+    @classmethod
+    def get_all_chunks(cls, filters, chunk_size, context=None):
+        """Yield the leases matching filters in lists of at most chunk_size."""
+        fields = filters.get("fields")
+        for db_leases in cls.dbapi.lease_get_all_chunks(filters, chunk_size):
+            yield cls._from_db_object_list(context, db_leases, fields)
+
+    @classmethod
+    def get_start_times(cls, status, until):
+        return cls.dbapi.lease_get_start_times(status, until)
+
+    @classmethod
+    def get_end_times(cls, status, until):
+        return cls.dbapi.lease_get_end_times(status, until)
+
+    @classmethod
+    def get_due_to_fulfill(cls, status, now, limit, marker=None, context=None):
+        db_leases = cls.dbapi.lease_get_due_to_fulfill(status, now, limit, marker)
+        return cls._from_db_object_list(context, db_leases)
+
+    @classmethod
+    def get_due_to_expire(cls, status, now, limit, marker=None, context=None):
+        db_leases = cls.dbapi.lease_get_due_to_expire(status, now, limit, marker)
         return cls._from_db_object_list(context, db_leases)
 
     def create(self, context=None):
@@ -165,9 +192,7 @@ class Lease(base.ESILEAPObject):
         resource_uuid = updates["resource_uuid"]
         start_time = updates["start_time"]
         end_time = updates["end_time"]
-        with utils.lock(
-            utils.get_resource_lock_name(resource_type, resource_uuid), external=True
-        ):
+        with utils.resource_conflict_lock(resource_type, resource_uuid):
             self.verify_time_range(
                 start_time,
                 end_time,
@@ -185,10 +210,7 @@ class Lease(base.ESILEAPObject):
         if "end_time" not in updates:
             return
         new_end_time = updates["end_time"]
-        with utils.lock(
-            utils.get_resource_lock_name(self.resource_type, self.resource_uuid),
-            external=True,
-        ):
+        with utils.resource_conflict_lock(self.resource_type, self.resource_uuid):
             if self.start_time >= new_end_time:
                 raise exception.InvalidTimeRange(
                     resource="lease",
@@ -241,6 +263,27 @@ class Lease(base.ESILEAPObject):
                 self.status = statuses.WAIT_CANCEL
             self.save(context)
 
+    def request_cancel(self, context=None):
+        """Mark the lease for the manager to cancel.
+
+        The status is written under the resource lock, so a fulfill or
+        expire holding the lock cannot overwrite it.
+        """
+        with utils.lock(
+            utils.get_resource_lock_name(self.resource_type, self.resource_uuid),
+            external=True,
+        ):
+            # the lease may have expired since it was loaded
+            db_lease = self.dbapi.lease_get_by_uuid(self.uuid)
+            if db_lease is None:
+                raise exception.LeaseNotFound(lease_id=self.uuid)
+            if db_lease.status not in statuses.LEASE_CAN_DELETE:
+                raise exception.LeaseInvalidState(
+                    lease_id=self.uuid, status=db_lease.status
+                )
+            self.status = statuses.WAIT_CANCEL
+            self.save(context)
+
     def destroy(self):
         self.dbapi.lease_destroy(self.uuid)
         self.obj_reset_changes()
@@ -255,6 +298,12 @@ class Lease(base.ESILEAPObject):
             utils.get_resource_lock_name(self.resource_type, self.resource_uuid),
             external=True,
         ):
+            # cancellation may have been requested since this lease was loaded
+            db_lease = self.dbapi.lease_get_by_uuid(self.uuid)
+            if db_lease.status == statuses.WAIT_CANCEL:
+                LOG.info("Not fulfilling lease %s waiting to cancel", self.uuid)
+                return
+
             LOG.info("Fulfilling lease %s", self.uuid)
             try:
                 resource = self.resource_object()
@@ -313,6 +362,15 @@ class Lease(base.ESILEAPObject):
         return get_resource_object(self.resource_type, self.resource_uuid)
 
     def verify_child_availability(self, start_time, end_time):
+        if utils.overlap_enforced_by_database():
+            # the database rejects overlapping children when they are written
+            if not utils.time_range_within(
+                self.start_time, self.end_time, start_time, end_time
+            ):
+                raise exception.LeaseNoTimeAvailabilities(
+                    lease_uuid=self.uuid, start_time=start_time, end_time=end_time
+                )
+            return
         return self.dbapi.lease_verify_child_availability(self, start_time, end_time)
 
     def deactivate(self, context, resource):
@@ -363,7 +421,7 @@ class Lease(base.ESILEAPObject):
             if parent_lease.status != statuses.ACTIVE:
                 raise exception.LeaseNotActive(parent_lease_uuid)
             parent_lease.verify_child_availability(start_time, end_time)
-        else:
+        elif not utils.overlap_enforced_by_database():
             ro = get_resource_object(resource_type, resource_uuid)
             ro.verify_availability(start_time, end_time)
         return
@@ -56,15 +56,52 @@ class Offer(base.ESILEAPObject):
 
     @classmethod
     def get_all(cls, filters, context=None):
+        # read before the db api consumes it
+        fields = filters.get("fields")
         db_offers = cls.dbapi.offer_get_all(filters)
-        return cls._from_db_object_list(context, db_offers)
+        return cls._from_db_object_list(context, db_offers, fields)
+
+    @classmethod
+    def get_all_chunks(cls, filters, chunk_size, context=None):
+        """Yield the offers matching filters in lists of at most chunk_size."""
+        fields = filters.get("fields")
+        for db_offers in cls.dbapi.offer_get_all_chunks(filters, chunk_size):
+            yield cls._from_db_object_list(context, db_offers, fields)
+
+    @classmethod
+    def get_end_times(cls, status, until):
+        return cls.dbapi.offer_get_end_times(status, until)
+
+    @classmethod
+    def get_availabilities_by_offer(cls, offers):
+        """Compute availabilities for many offers with a single query.
+
+        :param offers: list of Offer objects
+        :returns: dict mapping offer uuid to its list of availabilities
+        """
+        available = [o for o in offers if o.status == statuses.AVAILABLE]
+        conflicts = {o.uuid: [] for o in available}
+        for (
+            offer_uuid,
+            start_time,
+            end_time,
+        ) in cls.dbapi.offer_get_conflict_times_by_offer(list(conflicts)):
+            conflicts[offer_uuid].append([start_time, end_time])
+
+        now = datetime.datetime.now()
+        availabilities = {o.uuid: [] for o in offers}
+        for o in available:
+            availabilities[o.uuid] = o._get_availabilities(conflicts[o.uuid], now)
+        return availabilities
 
     def get_availabilities(self):
         if self.status != statuses.AVAILABLE:
             return []
 
         conflicts = self.dbapi.offer_get_conflict_times(self)
-        now = datetime.datetime.now()
+        return self._get_availabilities(conflicts, datetime.datetime.now())
+
+    def _get_availabilities(self, conflicts, now):
         start_time = self.start_time if self.start_time >= now else now
 
         if conflicts:
@@ -118,11 +155,8 @@ class Offer(base.ESILEAPObject):
     def create(self, context=None):
         updates = self.obj_get_changes()
 
-        with utils.lock(
-            utils.get_resource_lock_name(
-                updates["resource_type"], updates["resource_uuid"]
-            ),
-            external=True,
+        with utils.resource_conflict_lock(
+            updates["resource_type"], updates["resource_uuid"]
         ):
             LOG.info("Creating offer")
             if updates["start_time"] >= updates["end_time"]:
@@ -142,7 +176,7 @@ class Offer(base.ESILEAPObject):
                 parent_lease.verify_child_availability(
                     updates["start_time"], updates["end_time"]
                 )
-            else:
+            elif not utils.overlap_enforced_by_database():
                 ro = get_resource_object(
                     updates["resource_type"], updates["resource_uuid"]
                 )
@@ -182,6 +216,15 @@ class Offer(base.ESILEAPObject):
             self.save(context)
 
     def verify_availability(self, start_time, end_time):
+        if utils.overlap_enforced_by_database():
+            # the database rejects overlapping leases when they are written
+            if not utils.time_range_within(
+                self.start_time, self.end_time, start_time, end_time
+            ):
+                raise exception.OfferNoTimeAvailabilities(
+                    offer_uuid=self.uuid, start_time=start_time, end_time=end_time
+                )
+            return
         return self.dbapi.offer_verify_availability(self, start_time, end_time)
 
     def destroy(self):
@@ -9,6 +9,9 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import contextlib
+import threading
+
 from esi_leap.common.exception import ResourceTypeUnknown
 from esi_leap.resource_objects import base
 
@@ -23,6 +26,8 @@ _RESOURCE_TYPE_MAP = {
 }
 RESOURCE_TYPES = tuple(_RESOURCE_TYPE_MAP.keys())
 
+_local = threading.local()
+
 
 def get_type(resource_type):
     if resource_type in RESOURCE_TYPES:
@@ -31,5 +36,44 @@ def get_type(resource_type):
         raise ResourceTypeUnknown(resource_type=resource_type)
 
 
+def start_identity_map():
+    """Share resource objects until clear_identity_map is called.
+
+    While a map is active in the current thread, get_resource_object
+    returns the same instance for the same resource, so each resource is
+    fetched at most once per unit of work.
+
+    :returns: False if a map was already active and is left in place
+    """
+    if getattr(_local, "resources", None) is not None:
+        return False
+    _local.resources = {}
+    return True
+
+
+def clear_identity_map():
+    _local.resources = None
+
+
+@contextlib.contextmanager
+def identity_map():
+    started = start_identity_map()
+    try:
+        yield
+    finally:
+        if started:
+            clear_identity_map()
+
+
 def get_resource_object(resource_type, resource_ident):
-    return get_type(resource_type)(resource_ident)
+    resources = getattr(_local, "resources", None)
+    if resources is None:
+        return get_type(resource_type)(resource_ident)
+
+    resource = resources.get((resource_type, resource_ident))
+    if resource is None:
+        resource = get_type(resource_type)(resource_ident)
+        resources[(resource_type, resource_ident)] = resource
+        # a resource looked up by name is also found by its uuid
+        resources.setdefault((resource_type, resource.get_uuid()), resource)
+    return resource
@@ -64,6 +64,29 @@ class ResourceObjectInterface(object, metaclass=abc.ABCMeta):
     def remove_lease(self, lease):
         """Disassociates a lease from the resource"""
 
+    @classmethod
+    def get_many(cls, uuids):
+        """Return listing details for several resources at once.
+
+        Backends that can fetch resources in bulk should override this.
+
+        :param uuids: iterable of resource uuids
+        :returns: dict mapping each uuid to a dict with the keys name,
+                  resource_class, properties, owner_project_id and
+                  lessee_project_id
+        """
+        resources = {}
+        for uuid in uuids:
+            resource = cls(uuid)
+            resources[uuid] = {
+                "name": resource.get_name(),
+                "resource_class": resource.get_resource_class(),
+                "properties": resource.get_properties(),
+                "owner_project_id": resource.get_owner_project_id(),
+                "lessee_project_id": resource.get_lessee_project_id(),
+            }
+        return resources
+
     def verify_availability(self, start_time, end_time):
         self.dbapi.resource_verify_availability(
             self.resource_type,
@@ -34,6 +34,31 @@ class DummyNode(base.ResourceObjectInterface):
         self._uuid = uuid
         self._path = os.path.join(DUMMY_NODE_DIR, uuid)
 
+    @classmethod
+    def get_many(cls, uuids):
+        resources = {}
+        for uuid in uuids:
+            try:
+                node_dict = cls(uuid)._get_node()
+            except exception.NodeNotFound:
+                LOG.exception("Error getting resource %s", uuid)
+                resources[uuid] = {
+                    "name": "dummy-node-%s" % uuid,
+                    "resource_class": error.UNKNOWN["resource_class"],
+                    "properties": error.UNKNOWN["properties"],
+                    "owner_project_id": error.UNKNOWN["owner_project_id"],
+                    "lessee_project_id": error.UNKNOWN["lessee_project_id"],
+                }
+                continue
+            resources[uuid] = {
+                "name": "dummy-node-%s" % uuid,
+                "resource_class": node_dict.get("resource_class", ""),
+                "properties": node_dict.get("properties", {}),
+                "owner_project_id": node_dict.get("project_owner_id", None),
+                "lessee_project_id": node_dict.get("project_id", ""),
+            }
+        return resources
+
     def get_uuid(self):
         return self._uuid
 
@@ -10,6 +10,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import concurrent.futures
+
 from ironicclient.common.apiclient import exceptions as ir_exception
 from oslo_log import log as logging
 from oslo_utils.uuidutils import is_uuid_like
@@ -46,6 +48,51 @@ class IronicNode(base.ResourceObjectInterface):
             self._node = None
             self._uuid = ident
 
+    @classmethod
+    def get_many(cls, uuids):
+        uuids = list(uuids)
+        node_list = ironic.get_cached_node_list()
+        if node_list is not None:
+            LOG.debug("Resolving %d nodes from the cached node list", len(uuids))
+        elif len(uuids) <= CONF.ironic.node_get_many_threshold:
+            LOG.debug("Fetching %d nodes individually", len(uuids))
+            node_list = ironic.NodeList(cls._get_nodes(uuids))
+        else:
+            LOG.debug("Listing all nodes to resolve %d nodes", len(uuids))
+            node_list = ironic.get_node_list(fields=ironic.ENRICHMENT_FIELDS)
+
+        resources = {}
+        for uuid in uuids:
+            node = node_list.get(uuid)
+            resources[uuid] = {
+                "name": getattr(node, "name", ""),
+                "resource_class": getattr(node, "resource_class", ""),
+                "properties": ironic.get_condensed_properties(
+                    getattr(node, "properties", {})
+                ),
+                "owner_project_id": getattr(node, "owner", ""),
+                "lessee_project_id": getattr(node, "lessee", ""),
+            }
+        return resources
+
+    @staticmethod
+    def _get_nodes(uuids):
+        def get_node(uuid):
+            try:
+                return get_ironic_client().node.get(
+                    uuid, fields=list(ironic.ENRICHMENT_FIELDS)
+                )
+            except ir_exception.NotFound:
+                LOG.warning("Node %s not found", uuid)
+                return None
+
+        if not uuids:
+            return []
+        workers = min(len(uuids), CONF.ironic.node_get_max_workers)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            nodes = executor.map(get_node, uuids)
+        return [n for n in nodes if n is not None]
+
     def get_uuid(self):
         return self._uuid
 
@@ -135,6 +182,8 @@ class IronicNode(base.ResourceObjectInterface):
             }
         )
         get_ironic_client().node.update(self._uuid, patches)
+        self._node = None
+        ironic.invalidate_node_list_cache()
 
     def remove_lease(self, lease):
         patches = []
@@ -172,6 +221,7 @@ class IronicNode(base.ResourceObjectInterface):
         if len(patches) > 0:
             # remove lease information and instance_info
             get_ironic_client().node.update(self._uuid, patches)
+            ironic.invalidate_node_list_cache()
 
         # disable console and any console tokens
         get_ironic_client().node.set_console_mode(self._uuid, False)
@@ -193,6 +243,9 @@ class IronicNode(base.ResourceObjectInterface):
             for vif in vifs:
                 get_ironic_client().node.vif_detach(self._uuid, vif.id)
 
+        # the node changed; fetch it again on next use
+        self._node = None
+
     def _get_node(self, resource_list=None):
         try:
             if not self._node:
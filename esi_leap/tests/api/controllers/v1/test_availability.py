@@ -0,0 +1,212 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import http.client as http_client
+import mock
+from oslo_utils import uuidutils
+
+from esi_leap.common import exception
+from esi_leap.common import statuses
+from esi_leap.db.sqlalchemy import api as db_api
+from esi_leap.objects import lease as lease_obj
+from esi_leap.tests.api import base as test_api_base
+
+
+class TestAvailabilityController(test_api_base.APITestCase):
+    def setUp(self):
+        super(TestAvailabilityController, self).setUp()
+        self.start = datetime.datetime(2016, 7, 16)
+        self.end = self.start + datetime.timedelta(days=10)
+
+    def _window(self, resource_uuid, **kwargs):
+        window = {
+            "resource_type": "dummy_node",
+            "resource_uuid": resource_uuid,
+            "start_time": self.start.isoformat(),
+            "end_time": self.end.isoformat(),
+        }
+        window.update(kwargs)
+        return window
+
+    @mock.patch("esi_leap.db.api.resource_get_conflicts")
+    def test_post(self, mock_grc):
+        mock_grc.return_value = [
+            [],
+            [("lease", self.start, self.start + datetime.timedelta(days=1))],
+        ]
+        data = {
+            "availabilities": [
+                self._window("1111"),
+                self._window("2222"),
+            ]
+        }
+
+        request = self.post_json("/availability", data)
+
+        mock_grc.assert_called_once_with(
+            [
+                ("dummy_node", "1111", self.start, self.end),
+                ("dummy_node", "2222", self.start, self.end),
+            ]
+        )
+        self.assertEqual(http_client.OK, request.status_int)
+        availabilities = request.json["availabilities"]
+        self.assertEqual(2, len(availabilities))
+        self.assertTrue(availabilities[0]["available"])
+        self.assertEqual([], availabilities[0]["conflicts"])
+        self.assertFalse(availabilities[1]["available"])
+        self.assertEqual(
+            [
+                {
+                    "source": "lease",
+                    "start_time": "2016-07-16T00:00:00",
+                    "end_time": "2016-07-17T00:00:00",
+                }
+            ],
+            availabilities[1]["conflicts"],
+        )
+
+    @mock.patch("esi_leap.api.controllers.v1.availability.get_resource_object")
+    @mock.patch("esi_leap.db.api.resource_get_conflicts")
+    def test_post_default_resource_type(self, mock_grc, mock_gro):
+        mock_grc.return_value = [[]]
+        mock_gro.return_value.get_uuid.return_value = "1111"
+        window = self._window("node-name")
+        del window["resource_type"]
+
+        request = self.post_json("/availability", {"availabilities": [window]})
+
+        mock_gro.assert_called_once_with("ironic_node", "node-name")
+        mock_grc.assert_called_once_with(
+            [("ironic_node", "1111", self.start, self.end)]
+        )
+        self.assertEqual(http_client.OK, request.status_int)
+        self.assertEqual(
+            "ironic_node", request.json["availabilities"][0]["resource_type"]
+        )
+
+    @mock.patch("esi_leap.db.api.resource_get_conflicts")
+    def test_post_invalid_time_range(self, mock_grc):
+        data = {
+            "availabilities": [
+                self._window(
+                    "1111",
+                    start_time=self.end.isoformat(),
+                    end_time=self.start.isoformat(),
+                )
+            ]
+        }
+
+        request = self.post_json("/availability", data, expect_errors=True)
+
+        mock_grc.assert_not_called()
+        self.assertEqual(http_client.INTERNAL_SERVER_ERROR, request.status_int)
+
+    @mock.patch("esi_leap.db.api.resource_get_conflicts")
+    def test_post_too_many_windows(self, mock_grc):
+        self.config(max_limit=1, group="api")
+        data = {"availabilities": [self._window("1111"), self._window("2222")]}
+
+        request = self.post_json("/availability", data, expect_errors=True)
+
+        mock_grc.assert_not_called()
+        self.assertEqual(http_client.BAD_REQUEST, request.status_int)
+
+    def _not_admin(self, policy_name, target, creds):
+        if policy_name == "esi_leap:offer:offer_admin":
+            raise exception.HTTPForbidden(rule=policy_name)
+
+    def _lease(self, resource_uuid, start, end, **kwargs):
+        values = dict(
+            uuid=uuidutils.generate_uuid(),
+            project_id=self.context.project_id,
+            owner_id="0wn3r",
+            resource_type="dummy_node",
+            resource_uuid=resource_uuid,
+            start_time=start,
+            end_time=end,
+            status=statuses.ACTIVE,
+        )
+        values.update(kwargs)
+        db_api.lease_create(values)
+
+    @mock.patch("esi_leap.resource_objects.dummy_node.DummyNode.get_many")
+    @mock.patch("esi_leap.api.controllers.v1.utils.policy_authorize")
+    @mock.patch("esi_leap.db.api.resource_get_conflicts")
+    def test_post_not_resource_admin(self, mock_grc, mock_pa, mock_gm):
+        mock_pa.side_effect = self._not_admin
+        mock_gm.return_value = {
+            "1111": {"owner_project_id": self.context.project_id},
+            "2222": {"owner_project_id": "0wn3r"},
+        }
+        # a lease that ends before the window does not grant access
+        self._lease("2222", self.start, self.end - datetime.timedelta(days=1))
+        data = {"availabilities": [self._window("1111"), self._window("2222")]}
+
+        request = self.post_json("/availability", data, expect_errors=True)
+
+        mock_gm.assert_called_once_with({"1111", "2222"})
+        mock_grc.assert_not_called()
+        self.assertEqual(http_client.FORBIDDEN, request.status_int)
+
+    @mock.patch("esi_leap.resource_objects.dummy_node.DummyNode.get_many")
+    @mock.patch("esi_leap.api.controllers.v1.utils.policy_authorize")
+    @mock.patch("esi_leap.db.api.resource_get_conflicts")
+    def test_post_resource_lessee(self, mock_grc, mock_pa, mock_gm):
+        mock_grc.return_value = [[], [], []]
+        mock_pa.side_effect = self._not_admin
+        mock_gm.return_value = {
+            "1111": {"owner_project_id": self.context.project_id},
+            "2222": {"owner_project_id": "0wn3r"},
+        }
+        self._lease(
+            "2222",
+            self.start - datetime.timedelta(days=1),
+            self.end + datetime.timedelta(days=1),
+        )
+        data = {
+            "availabilities": [
+                self._window("1111"),
+                self._window("2222"),
+                self._window("2222", end_time=self.end.isoformat()),
+            ]
+        }
+
+        with mock.patch.object(
+            lease_obj.Lease, "get_all", wraps=lease_obj.Lease.get_all
+        ) as mock_lga:
+            request = self.post_json("/availability", data)
+
+        mock_gm.assert_called_once_with({"1111", "2222"})
+        mock_lga.assert_called_once()
+        self.assertEqual(http_client.OK, request.status_int)
+        self.assertEqual(3, len(request.json["availabilities"]))
+
+    @mock.patch("esi_leap.resource_objects.dummy_node.DummyNode.get_many")
+    @mock.patch("esi_leap.api.controllers.v1.utils.policy_authorize")
+    @mock.patch("esi_leap.db.api.resource_get_conflicts")
+    def test_post_sub_lessee(self, mock_grc, mock_pa, mock_gm):
+        mock_pa.side_effect = self._not_admin
+        mock_gm.return_value = {"2222": {"owner_project_id": "0wn3r"}}
+        self._lease(
+            "2222", self.start, self.end, parent_lease_uuid=uuidutils.generate_uuid()
+        )
+
+        request = self.post_json(
+            "/availability",
+            {"availabilities": [self._window("2222")]},
+            expect_errors=True,
+        )
+
+        mock_grc.assert_not_called()
+        self.assertEqual(http_client.FORBIDDEN, request.status_int)
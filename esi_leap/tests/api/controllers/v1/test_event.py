@@ -41,7 +41,7 @@ class TestEventsController(test_api_base.APITestCase):
     @mock.patch("esi_leap.objects.event.Event.get_all")
     def test_get_all(self, mock_ega, mock_gro, mock_gpufi, mock_pa):
         fake_event = FakeEvent()
-        expected_filters = {}
+        expected_filters = {"limit": 1000}
         mock_pa.side_effect = None
         mock_ega.return_value = [fake_event]
 
@@ -54,13 +54,25 @@ class TestEventsController(test_api_base.APITestCase):
 
         self.assertEqual(data["events"][0]["id"], 1)
 
+    @mock.patch("esi_leap.api.controllers.v1.utils.policy_authorize")
+    @mock.patch("esi_leap.objects.event.Event.get_all")
+    def test_get_all_limit_marker(self, mock_ega, mock_pa):
+        fake_event = FakeEvent()
+        mock_ega.return_value = [fake_event]
+
+        data = self.get_json("/events?limit=1&marker=5")
+
+        mock_ega.assert_called_once_with({"limit": 1, "marker": 5}, self.context)
+        self.assertEqual(1, len(data["events"]))
+        self.assertIn("marker=1", data["next"])
+
     @mock.patch("esi_leap.api.controllers.v1.utils.policy_authorize")
     @mock.patch("esi_leap.common.keystone.get_project_uuid_from_ident")
     @mock.patch("esi_leap.api.controllers.v1.event.get_resource_object")
     @mock.patch("esi_leap.objects.event.Event.get_all")
     def test_get_all_not_admin(self, mock_ega, mock_gro, mock_gpufi, mock_pa):
         fake_event = FakeEvent()
-        expected_filters = {"lessee_or_owner_id": "fake-lessee-id"}
+        expected_filters = {"lessee_or_owner_id": "fake-lessee-id", "limit": 1000}
         mock_pa.side_effect = exception.HTTPForbidden(rule="esi_leap:offer:offer_admin")
         mock_gpufi.return_value = "fake-lessee-id"
         mock_ega.return_value = [fake_event]
@@ -80,7 +92,11 @@ class TestEventsController(test_api_base.APITestCase):
     @mock.patch("esi_leap.objects.event.Event.get_all")
     def test_get_all_resource_filter(self, mock_ega, mock_gro, mock_gpufi, mock_pa):
         fake_event = FakeEvent()
-        expected_filters = {"resource_type": "test_node", "resource_uuid": "1111"}
+        expected_filters = {
+            "resource_type": "test_node",
+            "resource_uuid": "1111",
+            "limit": 1000,
+        }
         mock_pa.side_effect = None
         mock_gro.return_value = FakeNode("1111")
         mock_ega.return_value = [fake_event]
@@ -93,3 +109,14 @@ class TestEventsController(test_api_base.APITestCase):
         mock_ega.assert_called_once_with(expected_filters, self.context)
 
         self.assertEqual(data["events"][0]["id"], 1)
+
+    @mock.patch("esi_leap.api.controllers.v1.utils.policy_authorize")
+    @mock.patch("esi_leap.objects.event.Event.get_all")
+    def test_get_all_fields(self, mock_ega, mock_pa):
+        expected_filters = {"limit": 1000, "fields": ["id", "event_type"]}
+        mock_ega.return_value = [FakeEvent()]
+
+        data = self.get_json("/events?fields=event_type")
+
+        mock_ega.assert_called_once_with(expected_filters, self.context)
+        self.assertEqual([{"event_type": "fake:event"}], data["events"])
@@ -20,6 +20,7 @@ import testtools
 from esi_leap.api.controllers.v1.lease import LeasesController
 from esi_leap.common import constants
 from esi_leap.common import exception
+from esi_leap.common import keystone
 from esi_leap.common import statuses
 from esi_leap.objects import lease as lease_obj
 from esi_leap.resource_objects.ironic_node import IronicNode
@@ -66,23 +67,24 @@ class TestLeasesController(test_api_base.APITestCase):
         data = self.get_json("/leases")
         self.assertEqual([], data["leases"])
 
-    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     @mock.patch("esi_leap.api.controllers.v1.utils." "lease_get_dict_with_added_info")
     @mock.patch("esi_leap.objects.lease.Lease.get_all")
-    def test_one(self, mock_ga, mock_lgdwai, mock_gpl, mock_gnl):
+    def test_one(self, mock_ga, mock_lgdwai, mock_gpl, mock_gri):
         mock_ga.return_value = [self.test_lease]
         mock_lgdwai.return_value = self.test_lease.to_dict()
         mock_gpl.return_value = []
-        mock_gnl.return_value = []
+        mock_gri.return_value = {}
 
         data = self.get_json("/leases")
 
         self.assertEqual(self.test_lease.uuid, data["leases"][0]["uuid"])
         mock_gpl.assert_called_once()
-        mock_gnl.assert_called_once()
+        mock_gri.assert_called_once()
         mock_lgdwai.assert_called_once()
 
+    @mock.patch("esi_leap.api.controllers.v1.utils.notify_manager_lease")
     @mock.patch("esi_leap.api.controllers.v1.utils." "lease_get_dict_with_added_info")
     @mock.patch("esi_leap.api.controllers.v1.lease.get_resource_object")
     @mock.patch("esi_leap.common.keystone.get_project_uuid_from_ident")
@@ -97,6 +99,7 @@ class TestLeasesController(test_api_base.APITestCase):
         mock_gpufi,
         mock_gro,
         mock_lgdwai,
+        mock_nmr,
     ):
         resource = FakeNode("1234567890")
         data = {
@@ -128,6 +131,7 @@ class TestLeasesController(test_api_base.APITestCase):
         )
         mock_create.assert_called_once()
         mock_lgdwai.assert_called_once()
+        mock_nmr.assert_called_once_with(self.context, "fulfill_lease", mock.ANY)
         self.assertEqual(return_data, request.json)
         self.assertEqual(http_client.CREATED, request.status_int)
 
@@ -333,7 +337,64 @@ class TestLeasesController(test_api_base.APITestCase):
         mock_lgdwai.assert_not_called()
         self.assertEqual(http_client.INTERNAL_SERVER_ERROR, request.status_int)
 
-    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    @mock.patch("esi_leap.objects.lease.Lease.get_all")
+    def test_get_fields(self, mock_get_all, mock_gpl, mock_gri):
+        mock_get_all.return_value = [self.test_lease]
+
+        data = self.get_json("/leases?fields=uuid,start_time")
+
+        self.assertEqual(
+            [{"uuid": self.test_lease.uuid, "start_time": "2016-07-16T19:20:30"}],
+            data["leases"],
+        )
+        self.assertEqual(
+            ["id", "uuid", "start_time"], mock_get_all.call_args[0][0]["fields"]
+        )
+        mock_gpl.assert_not_called()
+        mock_gri.assert_not_called()
+
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    @mock.patch("esi_leap.objects.lease.Lease.get_all")
+    def test_get_fields_project(self, mock_get_all, mock_gpl, mock_gri):
+        mock_get_all.return_value = [self.test_lease]
+        project = mock.Mock(id="lesseeid")
+        project.name = "lessee"
+        mock_gpl.return_value = keystone.ProjectList([project])
+
+        data = self.get_json("/leases?fields=project")
+
+        self.assertEqual([{"project": "lessee"}], data["leases"])
+        self.assertEqual(
+            ["id", "uuid", "project_id"], mock_get_all.call_args[0][0]["fields"]
+        )
+        mock_gpl.assert_called_once()
+        mock_gri.assert_not_called()
+
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    @mock.patch("esi_leap.objects.lease.Lease.get_all")
+    def test_get_no_detail(self, mock_get_all, mock_gpl, mock_gri):
+        mock_get_all.return_value = [self.test_lease]
+
+        data = self.get_json("/leases?detail=false")
+
+        self.assertEqual(self.test_lease.uuid, data["leases"][0]["uuid"])
+        self.assertNotIn("project", data["leases"][0])
+        self.assertNotIn("project", mock_get_all.call_args[0][0]["fields"])
+        mock_gpl.assert_not_called()
+        mock_gri.assert_not_called()
+
+    @mock.patch("esi_leap.objects.lease.Lease.get_all")
+    def test_get_invalid_fields(self, mock_get_all):
+        request = self.get_json("/leases?fields=uuid,fake", expect_errors=True)
+
+        self.assertEqual(http_client.BAD_REQUEST, request.status_int)
+        mock_get_all.assert_not_called()
+
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     @mock.patch("esi_leap.api.controllers.v1.utils." "lease_get_dict_with_added_info")
     @mock.patch(
@@ -342,11 +403,11 @@ class TestLeasesController(test_api_base.APITestCase):
     )
     @mock.patch("esi_leap.objects.lease.Lease.get_all")
     def test_get_nofilters(
-        self, mock_get_all, mock_lgaaf, mock_lgdwai, mock_gpl, mock_gnl
+        self, mock_get_all, mock_lgaaf, mock_lgdwai, mock_gpl, mock_gri
     ):
         mock_get_all.return_value = [self.test_lease, self.test_lease]
         mock_gpl.return_value = []
-        mock_gnl.return_value = []
+        mock_gri.return_value = {}
 
         self.get_json("/leases")
 
@@ -364,10 +425,82 @@ class TestLeasesController(test_api_base.APITestCase):
         )
         mock_get_all.assert_called_once()
         mock_gpl.assert_called_once()
-        mock_gnl.assert_called_once()
+        mock_gri.assert_called_once()
         self.assertEqual(2, mock_lgdwai.call_count)
 
-    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils." "lease_get_dict_with_added_info")
+    @mock.patch(
+        "esi_leap.api.controllers.v1.lease.LeasesController."
+        "_lease_get_all_authorize_filters"
+    )
+    @mock.patch("esi_leap.objects.lease.Lease.get_all")
+    def test_get_paginate(
+        self, mock_get_all, mock_lgaaf, mock_lgdwai, mock_gpl, mock_gri
+    ):
+        mock_lgaaf.return_value = {"project_or_owner_id": self.context.project_id}
+        mock_get_all.return_value = [self.test_lease, self.test_lease]
+        mock_lgdwai.return_value = {}
+        mock_gpl.return_value = []
+        mock_gri.return_value = {}
+
+        data = self.get_json("/leases?limit=2&marker=fake-marker&sort_key=start_time")
+
+        expected_filters = {
+            "project_or_owner_id": self.context.project_id,
+            "limit": 2,
+            "marker": "fake-marker",
+            "sort_key": "start_time",
+        }
+        mock_get_all.assert_called_once_with(expected_filters, self.context)
+        self.assertEqual(
+            "http://localhost/v1/leases?sort_key=start_time&limit=2&marker=%s"
+            % self.test_lease.uuid,
+            data["next"],
+        )
+
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    @mock.patch(
+        "esi_leap.api.controllers.v1.lease.LeasesController."
+        "_lease_get_all_authorize_filters"
+    )
+    def test_get_stream(self, mock_lgaaf, mock_gpl):
+        mock_lgaaf.return_value = {}
+        mock_gpl.return_value = keystone.ProjectList([])
+        for i in range(5):
+            lease_obj.Lease.dbapi.lease_create(
+                dict(
+                    uuid=uuidutils.generate_uuid(),
+                    project_id="lesseeid",
+                    owner_id="ownerid",
+                    resource_type="test_node",
+                    resource_uuid=str(i),
+                    start_time=datetime.datetime(2016, 7, 16, 19, 20, 30),
+                    end_time=datetime.datetime(2016, 8, 16, 19, 20, 30),
+                    status=statuses.CREATED,
+                )
+            )
+
+        for path in ("/leases", "/leases?limit=4", "/leases?fields=uuid,resource"):
+            self.config(stream_list_responses=False, group="api")
+            expected = self.get_json(path)
+
+            self.config(stream_list_responses=True, stream_chunk_size=2, group="api")
+            response = self.get_json(path, expect_errors=True)
+
+            self.assertEqual(http_client.OK, response.status_int)
+            self.assertEqual("application/json", response.content_type)
+            self.assertEqual(expected, response.json)
+
+    @mock.patch("esi_leap.objects.lease.Lease.get_all")
+    def test_get_invalid_sort_key(self, mock_get_all):
+        request = self.get_json("/leases?sort_key=purpose", expect_errors=True)
+
+        mock_get_all.assert_not_called()
+        self.assertEqual(http_client.BAD_REQUEST, request.status_int)
+
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     @mock.patch("esi_leap.api.controllers.v1.utils." "lease_get_dict_with_added_info")
     @mock.patch("esi_leap.common.keystone.get_project_uuid_from_ident")
@@ -377,12 +510,12 @@ class TestLeasesController(test_api_base.APITestCase):
     )
     @mock.patch("esi_leap.objects.lease.Lease.get_all")
     def test_get_project_filter(
-        self, mock_get_all, mock_lgaaf, mock_gpufi, mock_lgdwai, mock_gpl, mock_gnl
+        self, mock_get_all, mock_lgaaf, mock_gpufi, mock_lgdwai, mock_gpl, mock_gri
     ):
         mock_gpufi.return_value = "12345"
         mock_get_all.return_value = [self.test_lease, self.test_lease]
         mock_gpl.return_value = []
-        mock_gnl.return_value = []
+        mock_gri.return_value = {}
         self.get_json("/leases?project_id=12345")
 
         mock_gpufi.assert_called_once_with("12345")
@@ -400,10 +533,10 @@ class TestLeasesController(test_api_base.APITestCase):
         )
         mock_get_all.assert_called_once()
         mock_gpl.assert_called_once()
-        mock_gnl.assert_called_once()
+        mock_gri.assert_called_once()
         self.assertEqual(2, mock_lgdwai.call_count)
 
-    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     @mock.patch("esi_leap.api.controllers.v1.utils." "lease_get_dict_with_added_info")
     @mock.patch("esi_leap.common.keystone.get_project_uuid_from_ident")
@@ -413,12 +546,12 @@ class TestLeasesController(test_api_base.APITestCase):
     )
     @mock.patch("esi_leap.objects.lease.Lease.get_all")
     def test_get_owner_filter(
-        self, mock_get_all, mock_lgaaf, mock_gpufi, mock_lgdwai, mock_gpl, mock_gnl
+        self, mock_get_all, mock_lgaaf, mock_gpufi, mock_lgdwai, mock_gpl, mock_gri
     ):
         mock_gpufi.return_value = "54321"
         mock_get_all.return_value = [self.test_lease, self.test_lease]
         mock_gpl.return_value = []
-        mock_gnl.return_value = []
+        mock_gri.return_value = {}
 
         self.get_json("/leases?owner_id=54321")
 
@@ -438,10 +571,10 @@ class TestLeasesController(test_api_base.APITestCase):
 
         mock_get_all.assert_called_once()
         mock_gpl.assert_called_once()
-        mock_gnl.assert_called_once()
+        mock_gri.assert_called_once()
         self.assertEqual(2, mock_lgdwai.call_count)
 
-    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     @mock.patch("esi_leap.api.controllers.v1.utils." "lease_get_dict_with_added_info")
     @mock.patch("esi_leap.api.controllers.v1.lease.get_resource_object")
@@ -451,12 +584,12 @@ class TestLeasesController(test_api_base.APITestCase):
     )
     @mock.patch("esi_leap.objects.lease.Lease.get_all")
     def test_get_resource_filter(
-        self, mock_get_all, mock_lgaaf, mock_gro, mock_lgdwai, mock_gpl, mock_gnl
+        self, mock_get_all, mock_lgaaf, mock_gro, mock_lgdwai, mock_gpl, mock_gri
     ):
         mock_gro.return_value = FakeNode("54321")
         mock_get_all.return_value = [self.test_lease, self.test_lease]
         mock_gpl.return_value = []
-        mock_gnl.return_value = []
+        mock_gri.return_value = {}
 
         self.get_json("/leases?resource_uuid=54321&resource_type=test_node")
 
@@ -476,10 +609,10 @@ class TestLeasesController(test_api_base.APITestCase):
 
         mock_get_all.assert_called_once()
         mock_gpl.assert_called_once()
-        mock_gnl.assert_called_once()
+        mock_gri.assert_called_once()
         self.assertEqual(2, mock_lgdwai.call_count)
 
-    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     @mock.patch("esi_leap.api.controllers.v1.utils." "lease_get_dict_with_added_info")
     @mock.patch(
@@ -488,7 +621,7 @@ class TestLeasesController(test_api_base.APITestCase):
     )
     @mock.patch("esi_leap.objects.lease.Lease.get_all")
     def test_get_resource_class_filter(
-        self, mock_get_all, mock_lgaaf, mock_lgdwai, mock_gpl, mock_gnl
+        self, mock_get_all, mock_lgaaf, mock_lgdwai, mock_gpl, mock_gri
     ):
         def _get_lease_response(lease, use_datetime=False):
             if use_datetime:
@@ -517,7 +650,7 @@ class TestLeasesController(test_api_base.APITestCase):
 
         mock_get_all.return_value = [self.test_lease, self.test_lease]
         mock_gpl.return_value = []
-        mock_gnl.return_value = []
+        mock_gri.return_value = {}
         mock_lgdwai.side_effect = [
             _get_lease_response(self.test_lease, use_datetime=True),
             _get_lease_response(self.test_lease_1, use_datetime=True),
@@ -541,11 +674,11 @@ class TestLeasesController(test_api_base.APITestCase):
 
         mock_get_all.assert_called_once()
         mock_gpl.assert_called_once()
-        mock_gnl.assert_called_once()
+        mock_gri.assert_called_once()
         self.assertEqual(2, mock_lgdwai.call_count)
         self.assertEqual(response, expected_resp)
 
-    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     @mock.patch("esi_leap.api.controllers.v1.utils." "lease_get_dict_with_added_info")
     @mock.patch("esi_leap.api.controllers.v1.lease.get_resource_object")
@@ -555,13 +688,13 @@ class TestLeasesController(test_api_base.APITestCase):
     )
     @mock.patch("esi_leap.objects.lease.Lease.get_all")
     def test_get_resource_filter_default_resource_type(
-        self, mock_get_all, mock_lgaaf, mock_gro, mock_lgdwai, mock_gpl, mock_gnl
+        self, mock_get_all, mock_lgaaf, mock_gro, mock_lgdwai, mock_gpl, mock_gri
     ):
         fake_uuid = uuidutils.generate_uuid()
         mock_gro.return_value = IronicNode(fake_uuid)
         mock_get_all.return_value = [self.test_lease, self.test_lease]
         mock_gpl.return_value = []
-        mock_gnl.return_value = []
+        mock_gri.return_value = {}
 
         self.get_json("/leases?resource_uuid=%s" % fake_uuid)
 
@@ -581,12 +714,14 @@ class TestLeasesController(test_api_base.APITestCase):
 
         mock_get_all.assert_called_once()
         mock_gpl.assert_called_once()
-        mock_gnl.assert_called_once()
+        mock_gri.assert_called_once()
         self.assertEqual(2, mock_lgdwai.call_count)
 
+    @mock.patch("esi_leap.api.controllers.v1.utils.notify_manager_lease")
     @mock.patch("esi_leap.api.controllers.v1.utils." "check_lease_policy_and_retrieve")
+    @mock.patch("esi_leap.objects.lease.Lease.request_cancel")
     @mock.patch("esi_leap.objects.lease.Lease.cancel")
-    def test_lease_delete(self, mock_cancel, mock_clpar):
+    def test_lease_delete(self, mock_cancel, mock_rc, mock_clpar, mock_nml):
         mock_clpar.return_value = self.test_lease
 
         self.delete_json("/leases/" + self.test_lease.uuid)
@@ -597,7 +732,25 @@ class TestLeasesController(test_api_base.APITestCase):
             self.test_lease.uuid,
             statuses.LEASE_CAN_DELETE,
         )
-        mock_cancel.assert_called_once()
+        mock_rc.assert_called_once_with(self.context)
+        mock_nml.assert_called_once_with(self.context, "cancel_lease", self.test_lease)
+        mock_cancel.assert_not_called()
+
+    @mock.patch("esi_leap.api.controllers.v1.utils.notify_manager_lease")
+    @mock.patch("esi_leap.api.controllers.v1.utils." "check_lease_policy_and_retrieve")
+    @mock.patch("esi_leap.objects.lease.Lease.request_cancel")
+    def test_lease_delete_invalid_state(self, mock_rc, mock_clpar, mock_nml):
+        mock_clpar.return_value = self.test_lease
+        mock_rc.side_effect = exception.LeaseInvalidState(
+            lease_id=self.test_lease.uuid, status=statuses.EXPIRED
+        )
+
+        response = self.delete_json(
+            "/leases/" + self.test_lease.uuid, expect_errors=True
+        )
+
+        self.assertEqual(http_client.CONFLICT, response.status_int)
+        mock_nml.assert_not_called()
 
 
 class TestLeaseControllersGetAllFilters(testtools.TestCase):
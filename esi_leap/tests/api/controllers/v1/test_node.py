@@ -14,6 +14,11 @@ from datetime import datetime
 
 import mock
 
+from esi_leap.api.controllers.v1 import node
+from esi_leap.common import ironic
+from esi_leap.common import keystone
+from esi_leap.common import statuses
+from esi_leap.db.sqlalchemy import interval_index
 from esi_leap.tests.api import base as test_api_base
 
 
@@ -73,13 +78,31 @@ class TestNodesController(test_api_base.APITestCase):
         mock_gnl.return_value = [fake_node]
         mock_oga.return_value = [fake_offer, fake_future_offer]
         mock_lga.return_value = [fake_future_lease]
-        mock_gpl.return_value = [fake_project]
+        mock_gpl.return_value = keystone.ProjectList([fake_project])
 
         data = self.get_json("/nodes")
 
-        mock_gnl.assert_called_once_with(self.context)
-        mock_oga.assert_called_once()
-        mock_lga.assert_called_once()
+        mock_gnl.assert_called_once_with(
+            self.context, fields=node.NODE_FIELDS, limit=1000
+        )
+        mock_oga.assert_called_once_with(
+            {
+                "status": [statuses.AVAILABLE],
+                "resource_type": "ironic_node",
+                "resource_uuids": ["fake-uuid"],
+                "fields": ["uuid", "resource_uuid", "start_time", "end_time"],
+            },
+            self.context,
+        )
+        mock_lga.assert_called_once_with(
+            {
+                "status": [statuses.CREATED],
+                "resource_type": "ironic_node",
+                "resource_uuids": ["fake-uuid"],
+                "fields": ["uuid", "resource_uuid"],
+            },
+            self.context,
+        )
         mock_gpl.assert_called_once()
 
         self.assertEqual(data["nodes"][0]["name"], "fake-node")
@@ -93,17 +116,130 @@ class TestNodesController(test_api_base.APITestCase):
         self.assertEqual(data["nodes"][0]["future_offers"], ["fake-future-offer-uuid"])
         self.assertEqual(data["nodes"][0]["future_leases"], ["fake-future-lease-uuid"])
 
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    def test_get_all_limit_next(self, mock_gnl):
+        mock_gnl.return_value = ironic.NodeList([FakeIronicNode()])
+
+        data = self.get_json("/nodes?limit=1&fields=name")
+
+        mock_gnl.assert_called_once_with(self.context, fields=["uuid", "name"], limit=1)
+        self.assertEqual([{"name": "fake-node"}], data["nodes"])
+        self.assertIn("marker=fake-uuid", data["next"])
+
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.objects.offer.Offer.get_all")
+    @mock.patch("esi_leap.objects.lease.Lease.get_all")
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    def test_get_all_fields(self, mock_gpl, mock_lga, mock_oga, mock_gnl):
+        mock_gnl.return_value = [FakeIronicNode()]
+
+        data = self.get_json("/nodes?fields=name,lease_uuid")
+
+        mock_gnl.assert_called_once_with(
+            self.context, fields=["uuid", "name", "properties"], limit=1000
+        )
+        mock_oga.assert_not_called()
+        mock_lga.assert_not_called()
+        mock_gpl.assert_not_called()
+        self.assertEqual(
+            [{"name": "fake-node", "lease_uuid": "fake-lease-uuid"}], data["nodes"]
+        )
+
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.objects.offer.Offer.get_all")
+    @mock.patch("esi_leap.objects.lease.Lease.get_all")
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    def test_get_all_no_detail(self, mock_gpl, mock_lga, mock_oga, mock_gnl):
+        mock_gnl.return_value = [FakeIronicNode()]
+
+        data = self.get_json("/nodes?detail=false")
+
+        mock_oga.assert_not_called()
+        mock_lga.assert_not_called()
+        mock_gpl.assert_not_called()
+        self.assertEqual("fake-uuid", data["nodes"][0]["uuid"])
+        self.assertNotIn("owner", data["nodes"][0])
+        self.assertNotIn("future_offers", data["nodes"][0])
+
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.db.api.resource_get_intervals")
+    @mock.patch("esi_leap.objects.offer.Offer.get_all")
+    @mock.patch("esi_leap.objects.lease.Lease.get_all")
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    def test_get_all_interval_index(
+        self, mock_gpl, mock_lga, mock_oga, mock_rgi, mock_gnl
+    ):
+        self.config(interval_index_enabled=True, group="api")
+        mock_gnl.return_value = [FakeIronicNode()]
+        mock_gpl.return_value = keystone.ProjectList([FakeProject()])
+        mock_rgi.return_value = [
+            interval_index.Interval(
+                datetime.min,
+                datetime.max,
+                "offer",
+                "fake-offer-uuid",
+                statuses.AVAILABLE,
+                "ironic_node",
+                "fake-uuid",
+                None,
+            ),
+            interval_index.Interval(
+                datetime.max,
+                datetime.max,
+                "offer",
+                "fake-future-offer-uuid",
+                statuses.AVAILABLE,
+                "ironic_node",
+                "fake-uuid",
+                None,
+            ),
+            interval_index.Interval(
+                datetime.max,
+                datetime.max,
+                "lease",
+                "fake-future-lease-uuid",
+                statuses.CREATED,
+                "ironic_node",
+                "fake-uuid",
+                None,
+            ),
+            interval_index.Interval(
+                datetime.min,
+                datetime.max,
+                "lease",
+                "fake-active-lease-uuid",
+                statuses.ACTIVE,
+                "ironic_node",
+                "fake-uuid",
+                None,
+            ),
+        ]
+
+        data = self.get_json("/nodes")
+
+        mock_rgi.assert_called_once_with("ironic_node", "fake-uuid")
+        mock_oga.assert_not_called()
+        mock_lga.assert_not_called()
+        self.assertEqual(data["nodes"][0]["offer_uuid"], "fake-offer-uuid")
+        self.assertEqual(data["nodes"][0]["future_offers"], ["fake-future-offer-uuid"])
+        self.assertEqual(data["nodes"][0]["future_leases"], ["fake-future-lease-uuid"])
+
     @mock.patch("esi_leap.common.ironic.get_node_list")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     def test_get_all_resource_class_filter(self, mock_gpl, mock_gnl):
         fake_node = FakeIronicNode()
         fake_project = FakeProject()
         mock_gnl.return_value = [fake_node]
-        mock_gpl.return_value = [fake_project]
+        mock_gpl.return_value = keystone.ProjectList([fake_project])
 
         data = self.get_json("/nodes?resource_class=baremetal")
 
-        mock_gnl.assert_called_once_with(self.context, resource_class="baremetal")
+        mock_gnl.assert_called_once_with(
+            self.context,
+            fields=node.NODE_FIELDS,
+            resource_class="baremetal",
+            limit=1000,
+        )
         mock_gpl.assert_called_once()
 
         self.assertEqual(data["nodes"][0]["resource_class"], "baremetal")
@@ -115,13 +251,15 @@ class TestNodesController(test_api_base.APITestCase):
         fake_node = FakeIronicNode()
         fake_project = FakeProject()
         mock_gnl.return_value = [fake_node]
-        mock_gpl.return_value = [fake_project]
+        mock_gpl.return_value = keystone.ProjectList([fake_project])
 
         mock_get_project_uuid.return_value = fake_project.id
 
         data = self.get_json("/nodes?owner=fake-project")
 
-        mock_gnl.assert_called_once_with(self.context, owner=fake_project.id)
+        mock_gnl.assert_called_once_with(
+            self.context, fields=node.NODE_FIELDS, owner=fake_project.id, limit=1000
+        )
         mock_get_project_uuid.assert_called_once_with("fake-project")
 
         self.assertEqual(data["nodes"][0]["owner"], fake_project.name)
@@ -133,13 +271,15 @@ class TestNodesController(test_api_base.APITestCase):
         fake_node = FakeIronicNode()
         fake_project = FakeProject()
         mock_gnl.return_value = [fake_node]
-        mock_gpl.return_value = [fake_project]
+        mock_gpl.return_value = keystone.ProjectList([fake_project])
 
         mock_get_project_uuid.return_value = fake_project.id
 
         data = self.get_json("/nodes?lessee=fake-project")
 
-        mock_gnl.assert_called_once_with(self.context, lessee=fake_project.id)
+        mock_gnl.assert_called_once_with(
+            self.context, fields=node.NODE_FIELDS, lessee=fake_project.id, limit=1000
+        )
         mock_get_project_uuid.assert_called_once_with("fake-project")
 
         self.assertEqual(data["nodes"][0]["lessee"], "fake-project")
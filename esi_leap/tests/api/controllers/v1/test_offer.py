@@ -16,6 +16,7 @@ import mock
 from oslo_utils import uuidutils
 
 from esi_leap.common import exception
+from esi_leap.common import keystone
 from esi_leap.common import statuses
 from esi_leap.objects import offer
 from esi_leap.resource_objects.ironic_node import IronicNode
@@ -359,20 +360,20 @@ class TestOffersController(test_api_base.APITestCase):
         mock_ogdwai.assert_not_called()
         self.assertEqual(http_client.FORBIDDEN, request.status_int)
 
-    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     @mock.patch("esi_leap.api.controllers.v1.utils." "offer_get_dict_with_added_info")
     @mock.patch("esi_leap.objects.offer.Offer.get_all")
-    def test_get_nofilters(self, mock_get_all, mock_ogdwai, mock_gpl, mock_gnl):
+    def test_get_nofilters(self, mock_get_all, mock_ogdwai, mock_gpl, mock_gri):
         mock_get_all.return_value = [self.test_offer, self.test_offer_2]
         mock_ogdwai.side_effect = [
             _get_offer_response(self.test_offer, use_datetime=True),
             _get_offer_response(self.test_offer_2, use_datetime=True),
         ]
         mock_gpl.return_value = []
-        mock_gnl.return_value = []
+        mock_gri.return_value = {}
 
-        expected_filters = {"status": statuses.OFFER_CAN_DELETE}
+        expected_filters = {"status": statuses.OFFER_CAN_DELETE, "limit": 1000}
         expected_resp = {
             "offers": [
                 _get_offer_response(self.test_offer),
@@ -384,24 +385,95 @@ class TestOffersController(test_api_base.APITestCase):
 
         mock_get_all.assert_called_once_with(expected_filters, self.context)
         mock_gpl.assert_called_once()
-        mock_gnl.assert_called_once()
+        mock_gri.assert_called_once()
         assert mock_ogdwai.call_count == 2
         self.assertEqual(request, expected_resp)
 
-    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.objects.offer.Offer.get_availabilities_by_offer")
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    @mock.patch("esi_leap.objects.offer.Offer.get_all")
+    def test_get_fields(self, mock_get_all, mock_gpl, mock_gri, mock_gabo):
+        mock_get_all.return_value = [self.test_offer]
+
+        request = self.get_json("/offers?fields=uuid,name")
+
+        expected_filters = {
+            "status": statuses.OFFER_CAN_DELETE,
+            "limit": 1000,
+            "fields": ["id", "uuid", "name"],
+        }
+        mock_get_all.assert_called_once_with(expected_filters, self.context)
+        mock_gpl.assert_not_called()
+        mock_gri.assert_not_called()
+        mock_gabo.assert_not_called()
+        self.assertEqual(
+            {"offers": [{"uuid": self.test_offer.uuid, "name": "test_offer"}]},
+            request,
+        )
+
+    @mock.patch("esi_leap.objects.offer.Offer.get_availabilities_by_offer")
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    @mock.patch("esi_leap.objects.offer.Offer.get_all")
+    def test_get_fields_availabilities(
+        self, mock_get_all, mock_gpl, mock_gri, mock_gabo
+    ):
+        mock_get_all.return_value = [self.test_offer]
+        mock_gabo.return_value = {self.test_offer.uuid: []}
+
+        request = self.get_json("/offers?fields=availabilities")
+
+        self.assertEqual(
+            ["id", "uuid", "status", "start_time", "end_time"],
+            mock_get_all.call_args[0][0]["fields"],
+        )
+        mock_gpl.assert_not_called()
+        mock_gri.assert_not_called()
+        mock_gabo.assert_called_once_with([self.test_offer])
+        self.assertEqual({"offers": [{"availabilities": []}]}, request)
+
+    @mock.patch("esi_leap.common.keystone.get_project_list")
+    def test_get_stream(self, mock_gpl):
+        mock_gpl.return_value = keystone.ProjectList([])
+        for i in range(3):
+            offer.Offer.dbapi.offer_create(
+                dict(
+                    uuid=uuidutils.generate_uuid(),
+                    project_id=self.context.project_id,
+                    resource_type="test_node",
+                    resource_uuid=str(i),
+                    # in the future so availabilities do not depend on now
+                    start_time=datetime.datetime(3016, 7, 16, 19, 20, 30),
+                    end_time=datetime.datetime(3016, 8, 16, 19, 20, 30),
+                    status=statuses.AVAILABLE,
+                )
+            )
+
+        for path in ("/offers", "/offers?limit=2"):
+            self.config(stream_list_responses=False, group="api")
+            expected = self.get_json(path)
+
+            self.config(stream_list_responses=True, stream_chunk_size=2, group="api")
+            response = self.get_json(path, expect_errors=True)
+
+            self.assertEqual(http_client.OK, response.status_int)
+            self.assertEqual(expected, response.json)
+
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     @mock.patch("esi_leap.api.controllers.v1.utils." "offer_get_dict_with_added_info")
     @mock.patch("esi_leap.objects.offer.Offer.get_all")
-    def test_get_any_status(self, mock_get_all, mock_ogdwai, mock_gpl, mock_gnl):
+    def test_get_any_status(self, mock_get_all, mock_ogdwai, mock_gpl, mock_gri):
         mock_get_all.return_value = [self.test_offer, self.test_offer_2]
         mock_ogdwai.side_effect = [
             _get_offer_response(self.test_offer, use_datetime=True),
             _get_offer_response(self.test_offer_2, use_datetime=True),
         ]
         mock_gpl.return_value = []
-        mock_gnl.return_value = []
+        mock_gri.return_value = {}
 
-        expected_filters = {}
+        expected_filters = {"limit": 1000}
         expected_resp = {
             "offers": [
                 _get_offer_response(self.test_offer),
@@ -413,24 +485,24 @@ class TestOffersController(test_api_base.APITestCase):
 
         mock_get_all.assert_called_once_with(expected_filters, self.context)
         mock_gpl.assert_called_once()
-        mock_gnl.assert_called_once()
+        mock_gri.assert_called_once()
         assert mock_ogdwai.call_count == 2
         self.assertEqual(request, expected_resp)
 
-    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     @mock.patch("esi_leap.api.controllers.v1.utils." "offer_get_dict_with_added_info")
     @mock.patch("esi_leap.objects.offer.Offer.get_all")
-    def test_get_status_filter(self, mock_get_all, mock_ogdwai, mock_gpl, mock_gnl):
+    def test_get_status_filter(self, mock_get_all, mock_ogdwai, mock_gpl, mock_gri):
         mock_get_all.return_value = [self.test_offer, self.test_offer_2]
         mock_ogdwai.side_effect = [
             _get_offer_response(self.test_offer, use_datetime=True),
             _get_offer_response(self.test_offer_2, use_datetime=True),
         ]
         mock_gpl.return_value = []
-        mock_gnl.return_value = []
+        mock_gri.return_value = {}
 
-        expected_filters = {"status": [statuses.AVAILABLE]}
+        expected_filters = {"status": [statuses.AVAILABLE], "limit": 1000}
         expected_resp = {
             "offers": [
                 _get_offer_response(self.test_offer),
@@ -442,17 +514,17 @@ class TestOffersController(test_api_base.APITestCase):
 
         mock_get_all.assert_called_once_with(expected_filters, self.context)
         mock_gpl.assert_called_once()
-        mock_gnl.assert_called_once()
+        mock_gri.assert_called_once()
         assert mock_ogdwai.call_count == 2
         self.assertEqual(request, expected_resp)
 
-    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     @mock.patch("esi_leap.common.keystone.get_project_uuid_from_ident")
     @mock.patch("esi_leap.api.controllers.v1.utils." "offer_get_dict_with_added_info")
     @mock.patch("esi_leap.objects.offer.Offer.get_all")
     def test_get_project_filter(
-        self, mock_get_all, mock_ogdwai, mock_gpufi, mock_gpl, mock_gnl
+        self, mock_get_all, mock_ogdwai, mock_gpufi, mock_gpl, mock_gri
     ):
         mock_get_all.return_value = [self.test_offer, self.test_offer_2]
         mock_ogdwai.side_effect = [
@@ -461,9 +533,10 @@ class TestOffersController(test_api_base.APITestCase):
         ]
         mock_gpufi.return_value = self.context.project_id
         mock_gpl.return_value = []
-        mock_gnl.return_value = []
+        mock_gri.return_value = {}
 
         expected_filters = {
+            "limit": 1000,
             "project_id": self.context.project_id,
             "status": statuses.OFFER_CAN_DELETE,
         }
@@ -479,17 +552,17 @@ class TestOffersController(test_api_base.APITestCase):
         mock_gpufi.assert_called_once_with(self.context.project_id)
         mock_get_all.assert_called_once_with(expected_filters, self.context)
         mock_gpl.assert_called_once()
-        mock_gnl.assert_called_once()
+        mock_gri.assert_called_once()
         assert mock_ogdwai.call_count == 2
         self.assertEqual(request, expected_resp)
 
-    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     @mock.patch("esi_leap.api.controllers.v1.offer.get_resource_object")
     @mock.patch("esi_leap.api.controllers.v1.utils." "offer_get_dict_with_added_info")
     @mock.patch("esi_leap.objects.offer.Offer.get_all")
     def test_get_resource_filter(
-        self, mock_get_all, mock_ogdwai, mock_gro, mock_gpl, mock_gnl
+        self, mock_get_all, mock_ogdwai, mock_gro, mock_gpl, mock_gri
     ):
         mock_get_all.return_value = [self.test_offer, self.test_offer_2]
         mock_ogdwai.side_effect = [
@@ -498,9 +571,10 @@ class TestOffersController(test_api_base.APITestCase):
         ]
         mock_gro.return_value = FakeNode("54321")
         mock_gpl.return_value = []
-        mock_gnl.return_value = []
+        mock_gri.return_value = {}
 
         expected_filters = {
+            "limit": 1000,
             "status": statuses.OFFER_CAN_DELETE,
             "resource_uuid": "54321",
             "resource_type": "test_node",
@@ -519,16 +593,16 @@ class TestOffersController(test_api_base.APITestCase):
         mock_gro.assert_called_once_with("test_node", "54321")
         mock_get_all.assert_called_once_with(expected_filters, self.context)
         mock_gpl.assert_called_once()
-        mock_gnl.assert_called_once()
+        mock_gri.assert_called_once()
         assert mock_ogdwai.call_count == 2
         self.assertEqual(request, expected_resp)
 
-    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     @mock.patch("esi_leap.api.controllers.v1.utils." "offer_get_dict_with_added_info")
     @mock.patch("esi_leap.objects.offer.Offer.get_all")
     def test_get_resource_class_filter(
-        self, mock_get_all, mock_ogdwai, mock_gpl, mock_gnl
+        self, mock_get_all, mock_ogdwai, mock_gpl, mock_gri
     ):
         mock_get_all.return_value = [
             self.test_offer,
@@ -541,8 +615,8 @@ class TestOffersController(test_api_base.APITestCase):
             _get_offer_response(self.test_offer_drt, use_datetime=True),
         ]
         mock_gpl.return_value = []
-        mock_gnl.return_value = []
-        expected_filters = {"status": statuses.OFFER_CAN_DELETE}
+        mock_gri.return_value = {}
+        expected_filters = {"status": statuses.OFFER_CAN_DELETE, "limit": 1000}
         expected_resp = {
             "offers": [
                 _get_offer_response(self.test_offer),
@@ -553,17 +627,17 @@ class TestOffersController(test_api_base.APITestCase):
 
         mock_get_all.assert_called_once_with(expected_filters, self.context)
         mock_gpl.assert_called_once()
-        mock_gnl.assert_called_once()
+        mock_gri.assert_called_once()
         assert mock_ogdwai.call_count == 3
         self.assertEqual(request, expected_resp)
 
-    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     @mock.patch("esi_leap.api.controllers.v1.offer.get_resource_object")
     @mock.patch("esi_leap.api.controllers.v1.utils." "offer_get_dict_with_added_info")
     @mock.patch("esi_leap.objects.offer.Offer.get_all")
     def test_get_resource_filter_default_resource_type(
-        self, mock_get_all, mock_ogdwai, mock_gro, mock_gpl, mock_gnl
+        self, mock_get_all, mock_ogdwai, mock_gro, mock_gpl, mock_gri
     ):
         fake_uuid = uuidutils.generate_uuid()
         mock_get_all.return_value = [self.test_offer, self.test_offer_2]
@@ -573,9 +647,10 @@ class TestOffersController(test_api_base.APITestCase):
         ]
         mock_gro.return_value = IronicNode(fake_uuid)
         mock_gpl.return_value = []
-        mock_gnl.return_value = []
+        mock_gri.return_value = {}
 
         expected_filters = {
+            "limit": 1000,
             "status": statuses.OFFER_CAN_DELETE,
             "resource_uuid": fake_uuid,
             "resource_type": "ironic_node",
@@ -591,17 +666,17 @@ class TestOffersController(test_api_base.APITestCase):
         mock_gro.assert_called_once_with("ironic_node", fake_uuid)
         mock_get_all.assert_called_once_with(expected_filters, self.context)
         mock_gpl.assert_called_once()
-        mock_gnl.assert_called_once()
+        mock_gri.assert_called_once()
         assert mock_ogdwai.call_count == 2
         self.assertEqual(request, expected_resp)
 
-    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_resource_info")
     @mock.patch("esi_leap.common.keystone.get_project_list")
     @mock.patch("esi_leap.api.controllers.v1.utils." "offer_get_dict_with_added_info")
     @mock.patch("esi_leap.objects.offer.Offer.get_all")
     @mock.patch("esi_leap.api.controllers.v1.utils.policy_authorize")
     def test_get_lessee_filter(
-        self, mock_authorize, mock_get_all, mock_ogdwai, mock_gpl, mock_gnl
+        self, mock_authorize, mock_get_all, mock_ogdwai, mock_gpl, mock_gri
     ):
         mock_get_all.return_value = [self.test_offer, self.test_offer_2]
         mock_ogdwai.side_effect = [
@@ -613,9 +688,10 @@ class TestOffersController(test_api_base.APITestCase):
             exception.HTTPForbidden(rule="esi_leap:offer:get"),
         ]
         mock_gpl.return_value = []
-        mock_gnl.return_value = []
+        mock_gri.return_value = {}
 
         expected_filters = {
+            "limit": 1000,
             "status": statuses.OFFER_CAN_DELETE,
             "lessee_id": self.context.project_id,
         }
@@ -630,7 +706,7 @@ class TestOffersController(test_api_base.APITestCase):
 
         mock_get_all.assert_called_once_with(expected_filters, self.context)
         mock_gpl.assert_called_once()
-        mock_gnl.assert_called_once()
+        mock_gri.assert_called_once()
         assert mock_ogdwai.call_count == 2
         self.assertEqual(request, expected_resp)
 
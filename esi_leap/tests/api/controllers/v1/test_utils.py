@@ -668,6 +668,31 @@ class TestOfferGetDictWithAddedInfoUtils(testtools.TestCase):
         self.assertEqual(expected_offer_dict, o_dict)
         self.assertEqual(2, mock_gpn.call_count)
 
+    @mock.patch("esi_leap.common.keystone.get_project_name")
+    @mock.patch("esi_leap.objects.offer.Offer.get_availabilities")
+    def test_offer_get_dict_with_added_info_availabilities(
+        self, mock_get_availabilities, mock_gpn
+    ):
+        mock_gpn.return_value = "project-name"
+
+        start = datetime.datetime(2016, 7, 16)
+        o = offer.Offer(
+            resource_type="test_node",
+            resource_uuid="1234567890",
+            name="o",
+            status=statuses.AVAILABLE,
+            start_time=start,
+            end_time=start + datetime.timedelta(days=100),
+            project_id=uuidutils.generate_uuid(),
+            lessee_id=None,
+        )
+        availabilities = [[o.start_time, o.end_time]]
+
+        o_dict = utils.offer_get_dict_with_added_info(o, availabilities=availabilities)
+
+        mock_get_availabilities.assert_not_called()
+        self.assertEqual(availabilities, o_dict["availabilities"])
+
 
 class TestLeaseGetDictWithAddedInfoUtils(testtools.TestCase):
     def setUp(self):
@@ -706,6 +731,48 @@ class TestLeaseGetDictWithAddedInfoUtils(testtools.TestCase):
         mock_gn.assert_called_once()
         self.assertEqual(expected_output_dict, output_dict)
 
+    @mock.patch("esi_leap.common.keystone.get_project_name")
+    @mock.patch("esi_leap.objects.lease.get_resource_object")
+    def test_lease_get_dict_with_added_info_resource_info(self, mock_gro, mock_gpn):
+        mock_gpn.return_value = "project-name"
+        resource_info = {
+            ("test_node", "111"): {
+                "name": "resource-name",
+                "resource_class": "fake",
+                "properties": {"cpu": "40"},
+            }
+        }
+
+        output_dict = utils.lease_get_dict_with_added_info(
+            self.test_lease, resource_info=resource_info
+        )
+
+        mock_gro.assert_not_called()
+        self.assertEqual("resource-name", output_dict["resource"])
+        self.assertEqual("fake", output_dict["resource_class"])
+        self.assertEqual({"cpu": "40"}, output_dict["resource_properties"])
+
+
+class TestGetResourceInfoUtils(testtools.TestCase):
+    @mock.patch("esi_leap.resource_objects.ironic_node.IronicNode.get_many")
+    @mock.patch("esi_leap.resource_objects.fake_node.FakeNode.get_many")
+    def test_get_resource_info(self, mock_fake_gm, mock_ironic_gm):
+        leases = [
+            lease.Lease(resource_type="test_node", resource_uuid="111"),
+            lease.Lease(resource_type="test_node", resource_uuid="111"),
+            lease.Lease(resource_type="test_node", resource_uuid="222"),
+        ]
+        mock_fake_gm.return_value = {"111": "info-111", "222": "info-222"}
+
+        resource_info = utils.get_resource_info(leases)
+
+        mock_fake_gm.assert_called_once_with({"111", "222"})
+        mock_ironic_gm.assert_not_called()
+        self.assertEqual(
+            {("test_node", "111"): "info-111", ("test_node", "222"): "info-222"},
+            resource_info,
+        )
+
 
 class TestCheckLeaseLength(testtools.TestCase):
     def setUp(self):
@@ -758,3 +825,99 @@ class TestCheckLeaseLength(testtools.TestCase):
         )
 
         assert not mock_authorize.called
+
+
+class TestPaginationUtils(testtools.TestCase):
+    def test_validate_limit(self):
+        self.assertEqual(1000, utils.validate_limit(None))
+        self.assertEqual(10, utils.validate_limit(10))
+        self.assertEqual(1000, utils.validate_limit(5000))
+
+    def test_validate_limit_invalid(self):
+        self.assertRaises(exception.InvalidLimit, utils.validate_limit, 0)
+        self.assertRaises(exception.InvalidLimit, utils.validate_limit, -1)
+
+    def test_validate_sort_dir(self):
+        self.assertIsNone(utils.validate_sort_dir(None))
+        self.assertEqual("desc", utils.validate_sort_dir("desc"))
+        self.assertRaises(exception.InvalidSortDir, utils.validate_sort_dir, "up")
+
+    def test_validate_sort_key(self):
+        self.assertIsNone(utils.validate_sort_key(None, ("id",)))
+        self.assertEqual("id", utils.validate_sort_key("id", ("id",)))
+        self.assertRaises(
+            exception.InvalidSortKey, utils.validate_sort_key, "name", ("id",)
+        )
+
+
+class TestFieldsUtils(testtools.TestCase):
+    def test_validate_fields(self):
+        valid = ("uuid", "name", "project")
+        self.assertIsNone(utils.validate_fields(None, None, valid, ("uuid",)))
+        self.assertIsNone(utils.validate_fields(None, True, valid, ("uuid",)))
+        self.assertEqual(
+            ("uuid",), utils.validate_fields(None, False, valid, ("uuid",))
+        )
+        self.assertEqual(
+            ("name", "project"),
+            utils.validate_fields("name, project", False, valid, ("uuid",)),
+        )
+
+    def test_validate_fields_invalid(self):
+        valid = ("uuid", "name")
+        self.assertRaises(
+            exception.InvalidFields,
+            utils.validate_fields,
+            "uuid,fake",
+            None,
+            valid,
+            valid,
+        )
+        self.assertRaises(
+            exception.InvalidFields, utils.validate_fields, ",", None, valid, valid
+        )
+
+    def test_get_db_fields(self):
+        derived = {"project": ("project_id",), "resource": ("type", "uuid")}
+        self.assertIsNone(utils.get_db_fields(None, derived))
+        self.assertEqual(
+            ["id", "uuid", "project_id", "type", "name"],
+            utils.get_db_fields(("project", "resource", "name"), derived),
+        )
+
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_manager_rpcapi")
+    def test_notify_manager_reschedule(self, mock_gmr):
+        context = ctx.RequestContext()
+
+        utils.notify_manager_reschedule(context)
+
+        mock_gmr.return_value.reschedule.assert_called_once_with(context)
+
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_manager_rpcapi")
+    def test_notify_manager_reschedule_error(self, mock_gmr):
+        mock_gmr.return_value.reschedule.side_effect = Exception("bus down")
+
+        utils.notify_manager_reschedule(ctx.RequestContext())
+
+        mock_gmr.return_value.reschedule.assert_called_once()
+
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_manager_rpcapi")
+    def test_notify_manager_lease(self, mock_gmr):
+        context = ctx.RequestContext()
+        lease = mock.Mock(uuid="lease-uuid")
+
+        utils.notify_manager_lease(context, "cancel_lease", lease)
+
+        mock_gmr.return_value.cancel_lease.assert_called_once_with(
+            context, "lease-uuid"
+        )
+
+    @mock.patch("esi_leap.api.controllers.v1.utils.get_manager_rpcapi")
+    def test_notify_manager_lease_error(self, mock_gmr):
+        mock_gmr.return_value.fulfill_lease.side_effect = Exception("bus down")
+
+        utils.notify_manager_lease(
+            ctx.RequestContext(), "fulfill_lease", mock.Mock(uuid="lease-uuid")
+        )
+
+        mock_gmr.return_value.fulfill_lease.assert_called_once()
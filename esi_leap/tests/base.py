@@ -16,6 +16,7 @@ from oslo_concurrency import lockutils
 from oslo_config import fixture as config
 from oslo_context import context as ctx
 from oslo_db.sqlalchemy import enginefacade
+from oslo_messaging import conffixture as messaging_conffixture
 from oslotest import base
 
 import esi_leap.conf
@@ -55,6 +56,13 @@ class TestCase(base.BaseTestCase):
         self.config = self.useFixture(config.Config(lockutils.CONF)).config
         super(TestCase, self).setUp()
 
+        # services parse the config at startup; the fixture resets it after
+        # each test, so parse it again for code such as the policy enforcer
+        CONF([], project="esi-leap")
+
+        self.messaging_conf = self.useFixture(messaging_conffixture.ConfFixture(CONF))
+        self.messaging_conf.transport_url = "fake:/"
+
         if not hasattr(self, "context"):
             self.context = ctx.RequestContext(
                 auth_token=None, project_id="12345", is_admin=True, overwrite=False
@@ -10,12 +10,20 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
+import threading
+import time
+
 import mock
 
 from esi_leap.common import ironic
+from esi_leap.common import utils
 from esi_leap.tests import base
 
 
+FIELDS = ironic.ENRICHMENT_FIELDS
+
+
 class FakeNode(object):
     def __init__(self):
         self.uuid = "uuid"
@@ -35,7 +43,7 @@ class IronicTestCase(base.TestCase):
     @mock.patch.object(ironic, "get_ironic_client", autospec=True)
     def test_get_node_list(self, mock_ironic):
         fake_node = FakeNode()
-        node_list = [fake_node]
+        node_list = ironic.NodeList([fake_node])
         node = ironic.get_node("uuid", node_list)
 
         self.assertEqual(fake_node, node)
@@ -43,11 +51,43 @@ class IronicTestCase(base.TestCase):
     @mock.patch.object(ironic, "get_ironic_client", autospec=True)
     def test_get_node_list_no_match(self, mock_ironic):
         fake_node = FakeNode()
-        node_list = [fake_node]
+        node_list = ironic.NodeList([fake_node])
         node = ironic.get_node("uuid2", node_list)
 
         self.assertEqual(None, node)
 
+    def test_node_list(self):
+        fake_node = FakeNode()
+        node_list = ironic.NodeList([fake_node])
+
+        self.assertEqual([fake_node], list(node_list))
+        self.assertEqual(1, len(node_list))
+        self.assertIs(fake_node, node_list[-1])
+        self.assertIs(fake_node, node_list.get("uuid"))
+        self.assertIs(fake_node, node_list.get("name"))
+        self.assertIsNone(node_list.get("uuid2"))
+
+    @mock.patch.object(ironic, "get_ironic_client", autospec=True)
+    def test_get_node_list_uncached(self, mock_ironic):
+        fake_node = FakeNode()
+        mock_ironic.return_value.node.list.return_value = [fake_node]
+
+        node_list = ironic.get_node_list(self.context, owner="ownerid")
+
+        self.assertIs(fake_node, node_list.get("uuid"))
+        self.assertIs(fake_node, node_list[0])
+        mock_ironic.return_value.node.list.assert_called_once_with(
+            detail=True, owner="ownerid"
+        )
+
+    @mock.patch.object(ironic, "get_ironic_client", autospec=True)
+    def test_get_node_list_fields(self, mock_ironic):
+        ironic.get_node_list(self.context, fields=["name"], owner="ownerid")
+
+        mock_ironic.return_value.node.list.assert_called_once_with(
+            fields=["name", "uuid"], owner="ownerid"
+        )
+
     def test_get_condensed_properties(self):
         properties = {
             "lease_uuid": "12345",
@@ -58,3 +98,192 @@ class IronicTestCase(base.TestCase):
         cp = ironic.get_condensed_properties(properties)
 
         self.assertEqual(cp, {"cpu": "40", "local_gb": "1000"})
+
+
+def _reset_client_cache(test):
+    for name in (
+        "_cached_ironic_client",
+        "_cached_http_session",
+        "_cached_service_auth",
+        "_cached_endpoint",
+    ):
+        patcher = mock.patch.object(ironic, name, None)
+        patcher.start()
+        test.addCleanup(patcher.stop)
+
+
+class IronicClientTestCase(base.TestCase):
+    def setUp(self):
+        super(IronicClientTestCase, self).setUp()
+        _reset_client_cache(self)
+
+    @mock.patch.object(ironic.ironic_client, "get_client", autospec=True)
+    @mock.patch.object(ironic.ks_loading, "load_auth_from_conf_options")
+    def test_get_ironic_client_shared(self, mock_load_auth, mock_get_client):
+        client = ironic.get_ironic_client()
+
+        self.assertIs(client, ironic.get_ironic_client())
+        mock_load_auth.assert_called_once_with(ironic.CONF, "ironic")
+        mock_get_client.assert_called_once_with(
+            1, session=mock.ANY, os_ironic_api_version="1.65"
+        )
+
+    @mock.patch.object(ironic.ironic_client, "get_client", autospec=True)
+    @mock.patch.object(ironic.ks_loading, "load_adapter_from_conf_options")
+    @mock.patch.object(ironic.ks_loading, "load_auth_from_conf_options")
+    def test_get_ironic_client_context(
+        self, mock_load_auth, mock_load_adapter, mock_get_client
+    ):
+        mock_load_adapter.return_value.get_endpoint.return_value = "http://ironic"
+
+        ironic.get_ironic_client(self.context)
+        ironic.get_ironic_client(self.context)
+        ironic.get_ironic_client()
+
+        # auth and endpoint are loaded once and every client shares one pool
+        mock_load_auth.assert_called_once_with(ironic.CONF, "ironic")
+        mock_load_adapter.assert_called_once()
+        self.assertEqual(3, mock_get_client.call_count)
+        sessions = [c[1]["session"] for c in mock_get_client.call_args_list]
+        self.assertEqual(1, len({id(sess.session) for sess in sessions}))
+        self.assertEqual("http://ironic", sessions[0].auth.user_auth.get_endpoint(None))
+        self.assertIs(mock_load_auth.return_value, sessions[2].auth)
+
+
+class NodeListCacheTestCase(base.TestCase):
+    def setUp(self):
+        super(NodeListCacheTestCase, self).setUp()
+        self.config(node_list_cache_ttl=30, group="ironic")
+        self.config(node_list_cache_max_stale=300, group="ironic")
+        patcher = mock.patch.object(ironic, "_node_list_cache", utils.TTLCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.now = datetime.datetime(2016, 7, 16, 19, 20, 30)
+        utcnow = mock.patch("oslo_utils.timeutils.utcnow")
+        self.mock_utcnow = utcnow.start()
+        self.mock_utcnow.return_value = self.now
+        self.addCleanup(utcnow.stop)
+
+    def _age(self, seconds):
+        self.mock_utcnow.return_value = self.now + datetime.timedelta(seconds=seconds)
+
+    @mock.patch.object(ironic, "_fetch_node_list", autospec=True)
+    def test_get_node_list_cached(self, mock_fetch):
+        mock_fetch.return_value = [FakeNode()]
+
+        self.assertEqual(mock_fetch.return_value, ironic.get_node_list(fields=FIELDS))
+        self._age(29)
+        self.assertEqual(mock_fetch.return_value, ironic.get_node_list(fields=FIELDS))
+
+        mock_fetch.assert_called_once_with(fields=FIELDS)
+
+    @mock.patch.object(ironic, "_fetch_node_list", autospec=True)
+    def test_get_node_list_not_cached(self, mock_fetch):
+        ironic.get_node_list(self.context, fields=FIELDS)
+        ironic.get_node_list(owner="ownerid", fields=FIELDS)
+        ironic.get_node_list()
+        ironic.get_node_list(fields=["uuid", "driver_info"])
+        self.config(node_list_cache_ttl=0, group="ironic")
+        ironic.get_node_list(fields=FIELDS)
+        ironic.get_node_list(fields=FIELDS)
+
+        self.assertEqual(6, mock_fetch.call_count)
+
+    @mock.patch.object(ironic, "_fetch_node_list", autospec=True)
+    def test_get_node_list_stale_while_revalidate(self, mock_fetch):
+        old, new = [FakeNode()], [FakeNode()]
+        refreshing = threading.Event()
+        release = threading.Event()
+
+        def slow_fetch(fields=None):
+            refreshing.set()
+            release.wait()
+            return new
+
+        mock_fetch.return_value = old
+        ironic.get_node_list(fields=FIELDS)
+        mock_fetch.side_effect = slow_fetch
+        self._age(60)
+
+        # the old list is returned while a single refresh is in flight
+        self.assertIs(old, ironic.get_node_list(fields=FIELDS))
+        self.assertTrue(refreshing.wait(5))
+        self.assertIs(old, ironic.get_node_list(fields=FIELDS))
+        release.set()
+
+        for _ in range(50):
+            if ironic.get_node_list(fields=FIELDS) is new:
+                break
+            time.sleep(0.1)
+        self.assertIs(new, ironic.get_node_list(fields=FIELDS))
+        self.assertEqual(2, mock_fetch.call_count)
+
+    @mock.patch.object(ironic, "_fetch_node_list", autospec=True)
+    def test_get_node_list_too_stale(self, mock_fetch):
+        old, new = [FakeNode()], [FakeNode()]
+        mock_fetch.return_value = old
+        ironic.get_node_list(fields=FIELDS)
+        mock_fetch.return_value = new
+        self._age(330)
+
+        self.assertIs(new, ironic.get_node_list(fields=FIELDS))
+
+    @mock.patch.object(ironic, "_fetch_node_list", autospec=True)
+    def test_get_node_list_single_flight(self, mock_fetch):
+        nodes = [FakeNode()]
+        fetching = threading.Event()
+        release = threading.Event()
+
+        def slow_fetch(fields=None):
+            fetching.set()
+            release.wait()
+            return nodes
+
+        mock_fetch.side_effect = slow_fetch
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(ironic.get_node_list(fields=FIELDS))
+            )
+            for _ in range(5)
+        ]
+        threads[0].start()
+        self.assertTrue(fetching.wait(5))
+        for t in threads[1:]:
+            t.start()
+        release.set()
+        for t in threads:
+            t.join(5)
+
+        self.assertEqual([nodes] * 5, results)
+        mock_fetch.assert_called_once_with(fields=FIELDS)
+
+    @mock.patch.object(ironic, "_fetch_node_list", autospec=True)
+    def test_get_node_list_error(self, mock_fetch):
+        mock_fetch.side_effect = Exception("ironic down")
+
+        self.assertRaises(Exception, ironic.get_node_list, fields=FIELDS)
+
+        mock_fetch.side_effect = None
+        mock_fetch.return_value = [FakeNode()]
+        self.assertEqual(mock_fetch.return_value, ironic.get_node_list(fields=FIELDS))
+
+    @mock.patch.object(ironic, "_fetch_node_list", autospec=True)
+    def test_invalidate_node_list_cache(self, mock_fetch):
+        ironic.get_node_list(fields=FIELDS)
+        ironic.invalidate_node_list_cache()
+        ironic.get_node_list(fields=FIELDS)
+
+        self.assertEqual(2, mock_fetch.call_count)
+
+    @mock.patch.object(ironic, "_fetch_node_list", autospec=True)
+    def test_get_cached_node_list(self, mock_fetch):
+        self.assertIsNone(ironic.get_cached_node_list())
+
+        ironic.get_node_list(fields=FIELDS)
+        self.assertIs(mock_fetch.return_value, ironic.get_cached_node_list())
+
+        self._age(30)
+        self.assertIsNone(ironic.get_cached_node_list())
+        mock_fetch.assert_called_once_with(fields=FIELDS)
@@ -14,16 +14,24 @@ import mock
 
 from esi_leap.common import exception as e
 from esi_leap.common import keystone
+from esi_leap.common import utils
 from esi_leap.tests import base
 
 
 class FakeProject(object):
-    def __init__(self):
-        self.id = "uuid"
-        self.name = "name"
+    def __init__(self, id="uuid", name="name", parent_id=None):
+        self.id = id
+        self.name = name
+        self.parent_id = parent_id
 
 
 class KeystoneTestCase(base.TestCase):
+    def setUp(self):
+        super(KeystoneTestCase, self).setUp()
+        patcher = mock.patch.object(keystone, "_project_list_cache", utils.TTLCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     @mock.patch("oslo_utils.uuidutils.is_uuid_like")
     def test_get_project_uuid_from_ident_uuid(self, mock_iul):
         mock_iul.return_value = True
@@ -39,11 +47,25 @@ class KeystoneTestCase(base.TestCase):
         mock_iul.return_value = False
         mock_keystone.return_value.projects.list.return_value = [FakeProject()]
 
+        project_uuid = keystone.get_project_uuid_from_ident("name")
         project_uuid = keystone.get_project_uuid_from_ident("name")
 
-        mock_iul.assert_called_once_with("name")
+        mock_iul.assert_called_with("name")
         self.assertEqual("uuid", project_uuid)
-        mock_keystone.return_value.projects.list.assert_called_once_with(name="name")
+        mock_keystone.return_value.projects.list.assert_called_once_with()
+
+    @mock.patch.object(keystone, "get_keystone_client", autospec=True)
+    @mock.patch("oslo_utils.uuidutils.is_uuid_like")
+    def test_get_project_uuid_from_ident_name_not_cached(self, mock_iul, mock_keystone):
+        mock_iul.return_value = False
+        mock_keystone.return_value.projects.list.side_effect = [[], [FakeProject()]]
+
+        project_uuid = keystone.get_project_uuid_from_ident("name")
+
+        self.assertEqual("uuid", project_uuid)
+        mock_keystone.return_value.projects.list.assert_has_calls(
+            [mock.call(), mock.call(name="name")]
+        )
 
     @mock.patch.object(keystone, "get_keystone_client", autospec=True)
     @mock.patch("oslo_utils.uuidutils.is_uuid_like")
@@ -56,7 +78,7 @@ class KeystoneTestCase(base.TestCase):
         )
 
         mock_iul.assert_called_once_with("name")
-        mock_keystone.return_value.projects.list.assert_called_once_with(name="name")
+        mock_keystone.return_value.projects.list.assert_called_with(name="name")
 
     @mock.patch.object(keystone, "get_keystone_client", autospec=True)
     def test_get_project_name_no_list(self, mock_keystone):
@@ -68,21 +90,96 @@ class KeystoneTestCase(base.TestCase):
 
     @mock.patch.object(keystone, "get_keystone_client", autospec=True)
     def test_get_project_name_list(self, mock_keystone):
-        project_list = [FakeProject()]
+        project_list = keystone.ProjectList([FakeProject()])
         project_name = keystone.get_project_name("uuid", project_list)
 
         self.assertEqual("name", project_name)
 
     @mock.patch.object(keystone, "get_keystone_client", autospec=True)
     def test_get_project_name_list_no_match(self, mock_keystone):
-        project_list = [FakeProject()]
+        project_list = keystone.ProjectList([FakeProject()])
         project_name = keystone.get_project_name("uuid2", project_list)
 
         self.assertEqual("", project_name)
 
     @mock.patch.object(keystone, "get_keystone_client", autospec=True)
     def test_get_project_name_none(self, mock_keystone):
-        project_list = [FakeProject()]
+        project_list = keystone.ProjectList([FakeProject()])
         project_name = keystone.get_project_name(None, project_list)
 
         self.assertEqual("", project_name)
+
+    @mock.patch.object(keystone, "get_keystone_client", autospec=True)
+    def test_get_project_list_cached(self, mock_keystone):
+        mock_keystone.return_value.projects.list.return_value = [FakeProject()]
+
+        project_list = keystone.get_project_list()
+
+        self.assertIs(project_list, keystone.get_project_list())
+        self.assertEqual("name", project_list.get("uuid").name)
+        self.assertEqual("uuid", project_list.get_id("name"))
+        self.assertEqual(1, len(project_list))
+        mock_keystone.return_value.projects.list.assert_called_once_with()
+
+    @mock.patch.object(keystone, "get_keystone_client", autospec=True)
+    def test_get_project_list_no_cache(self, mock_keystone):
+        self.config(project_list_cache_ttl=0, group="keystone")
+
+        keystone.get_project_list()
+        keystone.get_project_list()
+
+        self.assertEqual(2, mock_keystone.return_value.projects.list.call_count)
+
+    @mock.patch.object(keystone, "get_keystone_client", autospec=True)
+    def test_get_parent_project_id_tree(self, mock_keystone):
+        domain = FakeProject("domain", "domain")
+        projects = [
+            FakeProject("root", "root", "domain"),
+            FakeProject("child", "child", "root"),
+            FakeProject("grandchild", "grandchild", "child"),
+        ]
+        mock_keystone.return_value.projects.list.return_value = projects
+        mock_keystone.return_value.projects.get.return_value = domain
+
+        expected = ["grandchild", "child", "root", "domain"]
+        self.assertEqual(expected, keystone.get_parent_project_id_tree("grandchild"))
+        self.assertEqual(expected, keystone.get_parent_project_id_tree("grandchild"))
+
+        # only the domain, which is not listed, is fetched on its own
+        mock_keystone.return_value.projects.list.assert_called_once_with()
+        mock_keystone.return_value.projects.get.assert_called_once_with("domain")
+
+    @mock.patch.object(keystone, "get_keystone_client", autospec=True)
+    def test_get_parent_project_id_tree_refresh(self, mock_keystone):
+        domain = FakeProject("domain", "domain")
+        mock_keystone.return_value.projects.list.return_value = [
+            FakeProject("root", "root", "domain")
+        ]
+        mock_keystone.return_value.projects.get.return_value = domain
+
+        project_list = keystone.get_project_list()
+        keystone.get_parent_project_id_tree("root")
+        self.assertIs(domain, project_list.get("domain"))
+        # added projects are looked up by id only
+        self.assertEqual(1, len(project_list))
+        self.assertIsNone(project_list.get_id("domain"))
+
+        # a refreshed list forgets the projects added to the old one
+        keystone._project_list_cache.invalidate()
+        self.assertIsNone(keystone.get_project_list().get("domain"))
+
+    @mock.patch.object(keystone, "get_keystone_client", autospec=True)
+    def test_get_parent_project_id_tree_no_cache(self, mock_keystone):
+        self.config(project_list_cache_ttl=0, group="keystone")
+        projects = {
+            "child": FakeProject("child", "child", "root"),
+            "root": FakeProject("root", "root"),
+        }
+        mock_keystone.return_value.projects.get.side_effect = projects.get
+
+        self.assertEqual(
+            ["child", "root"], keystone.get_parent_project_id_tree("child")
+        )
+
+        mock_keystone.return_value.projects.list.assert_not_called()
+        self.assertEqual(2, mock_keystone.return_value.projects.get.call_count)
@@ -10,6 +10,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+
+import mock
+from oslo_context import context
 from oslo_policy import policy as oslo_policy
 
 from esi_leap.common import policy
@@ -49,3 +52,64 @@ class PolicyTestCase(base.TestCase):
             creds,
             creds,
         )
+
+    def test_get_enforcer_created_once(self):
+        enforcer = policy.get_enforcer()
+        with mock.patch.object(policy, "CONF") as mock_conf:
+            self.assertIs(enforcer, policy.get_enforcer())
+            mock_conf.assert_not_called()
+
+    def test_authorize_decision_cache(self):
+        creds = {"roles": ["esi_leap_owner"], "project_id": "0wn3r"}
+        enforcer = policy.get_enforcer()
+        self.assertTrue(policy.start_decision_cache())
+        self.addCleanup(policy.clear_decision_cache)
+        self.assertFalse(policy.start_decision_cache())
+
+        with mock.patch.object(
+            enforcer, "authorize", wraps=enforcer.authorize
+        ) as mock_authorize:
+            for _ in range(3):
+                self.assertTrue(policy.authorize("esi_leap:offer:get", creds, creds))
+                self.assertRaises(
+                    oslo_policy.PolicyNotAuthorized,
+                    policy.authorize,
+                    "esi_leap:offer:offer_admin",
+                    creds,
+                    creds,
+                )
+            self.assertEqual(2, mock_authorize.call_count)
+
+            policy.clear_decision_cache()
+            policy.authorize("esi_leap:offer:get", creds, creds)
+            self.assertEqual(3, mock_authorize.call_count)
+
+    def test_authorize_decision_cache_key(self):
+        creds = {"roles": ["esi_leap_owner"], "project_id": "0wn3r"}
+        policy.start_decision_cache()
+        self.addCleanup(policy.clear_decision_cache)
+
+        self.assertTrue(policy.authorize("esi_leap:offer:get", creds, creds))
+        creds = {"roles": ["generic_user"], "project_id": "0wn3r"}
+        self.assertRaises(
+            oslo_policy.PolicyNotAuthorized,
+            policy.authorize,
+            "esi_leap:offer:get",
+            creds,
+            creds,
+        )
+
+    def test_authorize_decision_cache_policy_values(self):
+        enforcer = policy.get_enforcer()
+        policy.start_decision_cache()
+        self.addCleanup(policy.clear_decision_cache)
+
+        with mock.patch.object(
+            enforcer, "authorize", wraps=enforcer.authorize
+        ) as mock_authorize:
+            for _ in range(2):
+                creds = context.RequestContext(
+                    project_id="0wn3r", roles=["esi_leap_owner"]
+                ).to_policy_values()
+                self.assertTrue(policy.authorize("esi_leap:offer:get", creds, creds))
+            mock_authorize.assert_called_once()
@@ -10,10 +10,17 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+
+import mock
+
 from esi_leap.common import utils
+import esi_leap.conf
 from esi_leap.tests import base
 
 
+CONF = esi_leap.conf.CONF
+
+
 class LockTestCase(base.TestCase):
     def test_get_resource_lock_name(self):
         resource_type = "ironic_node"
@@ -23,3 +30,44 @@ class LockTestCase(base.TestCase):
             resource_type + "-" + resource_uuid,
             utils.get_resource_lock_name(resource_type, resource_uuid),
         )
+
+    @mock.patch.object(utils.db_api, "resource_lock", autospec=True)
+    @mock.patch.object(utils, "_lock", autospec=True)
+    def test_lock_file(self, mock_lock, mock_rl):
+        self.assertEqual(
+            mock_lock.return_value, utils.lock("dummy_node-1111", external=True)
+        )
+        mock_lock.assert_called_once_with("dummy_node-1111", external=True)
+        mock_rl.assert_not_called()
+
+    @mock.patch.object(
+        utils.db_api, "resource_lock_supported", autospec=True, return_value=True
+    )
+    @mock.patch.object(utils.db_api, "resource_lock", autospec=True)
+    @mock.patch.object(utils, "_lock", autospec=True)
+    def test_lock_database(self, mock_lock, mock_rl, mock_rls):
+        self.config(lock_backend="database", lock_timeout=30, group="api")
+
+        self.assertEqual(
+            mock_rl.return_value, utils.lock("dummy_node-1111", external=True)
+        )
+        mock_rl.assert_called_once_with("esileap-dummy_node-1111", 30)
+        mock_lock.assert_not_called()
+
+        # internal locks never need the database
+        utils.lock("dummy_node-1111")
+        mock_lock.assert_called_once_with("dummy_node-1111", external=False)
+
+    @mock.patch.object(
+        utils.db_api, "resource_lock_supported", autospec=True, return_value=False
+    )
+    @mock.patch.object(utils.db_api, "resource_lock", autospec=True)
+    @mock.patch.object(utils, "_lock", autospec=True)
+    def test_lock_database_sqlite(self, mock_lock, mock_rl, mock_rls):
+        self.config(lock_backend="database", group="api")
+
+        self.assertEqual(
+            mock_lock.return_value, utils.lock("dummy_node-1111", external=True)
+        )
+        mock_lock.assert_called_once_with("dummy_node-1111", external=True)
+        mock_rl.assert_not_called()
@@ -13,12 +13,16 @@
 import datetime
 import mock
 
+from oslo_db import exception as db_exc
+from oslo_db.sqlalchemy import enginefacade
 from oslo_utils import timeutils
 from oslo_utils import uuidutils
+import sqlalchemy as sa
 
 from esi_leap.common import exception as e
 from esi_leap.common import statuses
 from esi_leap.db.sqlalchemy import api
+from esi_leap.db.sqlalchemy import models
 import esi_leap.tests.base as base
 
 now = datetime.datetime(2016, 7, 16, 19, 20, 30)
@@ -404,6 +408,26 @@ class TestOfferAPI(base.DBTestCase):
         end = now + datetime.timedelta(days=87)
         api.offer_verify_availability(offer, start, end)
 
+    def test_offer_verify_availability_wait_cancel(self):
+        offer = api.offer_create(test_offer_1)
+        api.lease_create(
+            dict(test_lease_1, offer_uuid=offer.uuid, status=statuses.WAIT_CANCEL)
+        )
+        start = now + datetime.timedelta(days=12)
+        end = now + datetime.timedelta(days=14)
+
+        self.assertRaises(
+            e.OfferNoTimeAvailabilities,
+            api.offer_verify_availability,
+            offer,
+            start,
+            end,
+        )
+        res = api.offer_get_all(
+            {"available_start_time": start, "available_end_time": end}
+        )
+        self.assertEqual([], res.all())
+
     def test_offer_get_conflict_times(self):
         o1 = api.offer_create(test_offer_1)
         self.assertEqual(api.offer_get_conflict_times(o1), [])
@@ -418,6 +442,26 @@ class TestOfferAPI(base.DBTestCase):
             [(now + datetime.timedelta(days=50), now + datetime.timedelta(days=60))],
         )
 
+    def test_offer_get_conflict_times_by_offer(self):
+        o1 = api.offer_create(test_offer_1)
+        o2 = api.offer_create(test_offer_2)
+        self.assertEqual(api.offer_get_conflict_times_by_offer([]), [])
+        self.assertEqual(api.offer_get_conflict_times_by_offer([o1.uuid, o2.uuid]), [])
+        api.lease_create(dict(test_lease_3, offer_uuid=o1.uuid))
+        api.lease_create(dict(test_lease_4, offer_uuid=o1.uuid))
+        api.lease_create(dict(test_lease_2, offer_uuid=o2.uuid))
+        api.lease_create(dict(test_lease_1, offer_uuid=o2.uuid))
+        expected = sorted(
+            [
+                (o1.uuid, test_lease_3["start_time"], test_lease_3["end_time"]),
+                (o2.uuid, test_lease_1["start_time"], test_lease_1["end_time"]),
+                (o2.uuid, test_lease_2["start_time"], test_lease_2["end_time"]),
+            ]
+        )
+        self.assertEqual(
+            api.offer_get_conflict_times_by_offer([o1.uuid, o2.uuid]), expected
+        )
+
     def test_offer_get_next_lease_start_time(self):
         o1 = api.offer_create(test_offer_1)
         self.assertEqual(
@@ -436,6 +480,22 @@ class TestOfferAPI(base.DBTestCase):
             (now + datetime.timedelta(days=50),),
         )
 
+    def test_offer_get_end_times(self):
+        api.offer_create(test_offer_1)
+        api.offer_create(test_offer_2)
+        api.offer_create(test_offer_5)
+
+        self.assertEqual(
+            [test_offer_1["end_time"]],
+            api.offer_get_end_times(
+                [statuses.AVAILABLE], test_offer_5["end_time"] - datetime.timedelta(1)
+            ),
+        )
+        self.assertEqual(
+            [],
+            api.offer_get_end_times([statuses.ERROR], test_offer_5["end_time"]),
+        )
+
     def test_offer_get_by_uuid(self):
         o1 = api.offer_create(test_offer_1)
         res = api.offer_get_by_uuid(o1.uuid)
@@ -557,6 +617,94 @@ class TestOfferAPI(base.DBTestCase):
             (res[0].to_dict(), res[1].to_dict(), res[2].to_dict(), res[3].to_dict()),
         )
 
+    def test_offer_get_all_paginate(self):
+        o1 = api.offer_create(test_offer_1)
+        o2 = api.offer_create(test_offer_2)
+        o3 = api.offer_create(test_offer_3)
+
+        res = api.offer_get_all({"limit": 2, "marker": o1.uuid})
+        self.assertEqual([o2.uuid, o3.uuid], [o.uuid for o in res])
+
+    def test_offer_get_all_availability_filter(self):
+        o1 = api.offer_create(test_offer_1)
+        o2 = api.offer_create(test_offer_2)
+        o3 = api.offer_create(test_offer_3)
+        api.lease_create(
+            dict(
+                test_lease_1,
+                uuid=uuidutils.generate_uuid(),
+                offer_uuid=o1.uuid,
+                start_time=now + datetime.timedelta(days=55),
+                end_time=now + datetime.timedelta(days=60),
+            )
+        )
+        api.lease_create(
+            dict(
+                test_lease_5,
+                uuid=uuidutils.generate_uuid(),
+                offer_uuid=o2.uuid,
+                start_time=now + datetime.timedelta(days=55),
+                end_time=now + datetime.timedelta(days=60),
+            )
+        )
+        api.lease_create(
+            dict(
+                test_lease_3,
+                uuid=uuidutils.generate_uuid(),
+                offer_uuid=o3.uuid,
+                start_time=now + datetime.timedelta(days=70),
+                end_time=now + datetime.timedelta(days=80),
+            )
+        )
+        res = api.offer_get_all(
+            {
+                "available_start_time": now + datetime.timedelta(days=50),
+                "available_end_time": now + datetime.timedelta(days=60),
+            }
+        )
+
+        self.assertEqual([o2.uuid, o3.uuid], [o.uuid for o in res])
+
+    def test_offer_get_all_availability_filter_query_count(self):
+        statements = []
+
+        def count_statements(conn, cursor, statement, *args):
+            if "FROM" in statement:
+                statements.append(statement)
+
+        engine = enginefacade.writer.get_engine()
+        sa.event.listen(engine, "before_cursor_execute", count_statements)
+        self.addCleanup(
+            sa.event.remove, engine, "before_cursor_execute", count_statements
+        )
+
+        filters = {
+            "available_start_time": now + datetime.timedelta(days=1),
+            "available_end_time": now + datetime.timedelta(days=2),
+        }
+        counts = []
+        total_offers = 0
+        for num_offers in (5, 50):
+            total_offers += num_offers
+            for _ in range(num_offers):
+                offer = api.offer_create(
+                    dict(test_offer_1, uuid=uuidutils.generate_uuid())
+                )
+                api.lease_create(
+                    dict(
+                        test_lease_1,
+                        uuid=uuidutils.generate_uuid(),
+                        offer_uuid=offer.uuid,
+                    )
+                )
+            del statements[:]
+            res = api.offer_get_all(dict(filters)).all()
+            counts.append(len(statements))
+            self.assertEqual(total_offers, len(res))
+
+        self.assertEqual(1, counts[0])
+        self.assertEqual(counts[0], counts[1])
+
 
 class TestLeaseAPI(base.DBTestCase):
     def test_lease_get_by_uuid(self):
@@ -607,6 +755,85 @@ class TestLeaseAPI(base.DBTestCase):
         self.assertIn(test_lease_1["uuid"], res_uuids)
         self.assertIn(test_lease_2["uuid"], res_uuids)
 
+    def test_lease_get_all_paginate(self):
+        l1 = api.lease_create(test_lease_1)
+        l2 = api.lease_create(test_lease_2)
+        l3 = api.lease_create(test_lease_3)
+
+        res = api.lease_get_all({"limit": 2})
+        self.assertEqual([l1.uuid, l2.uuid], [lease.uuid for lease in res])
+
+        res = api.lease_get_all({"limit": 2, "marker": l2.uuid})
+        self.assertEqual([l3.uuid], [lease.uuid for lease in res])
+
+    def test_lease_get_all_paginate_sort(self):
+        l1 = api.lease_create(test_lease_1)
+        l2 = api.lease_create(test_lease_2)
+        l3 = api.lease_create(test_lease_3)
+
+        res = api.lease_get_all(
+            {"limit": 2, "sort_key": "start_time", "sort_dir": "desc"}
+        )
+        self.assertEqual([l3.uuid, l2.uuid], [lease.uuid for lease in res])
+
+        res = api.lease_get_all(
+            {
+                "limit": 2,
+                "marker": l2.uuid,
+                "sort_key": "start_time",
+                "sort_dir": "desc",
+            }
+        )
+        self.assertEqual([l1.uuid], [lease.uuid for lease in res])
+
+    def test_lease_get_all_fields(self):
+        l1 = api.lease_create(test_lease_1)
+        l2 = api.lease_create(test_lease_2)
+
+        res = list(
+            api.lease_get_all(
+                {"fields": ["uuid", "status"], "limit": 2, "sort_key": "start_time"}
+            )
+        )
+        self.assertEqual([l1.uuid, l2.uuid], [lease.uuid for lease in res])
+
+        unloaded = sa.inspect(res[0]).unloaded
+        self.assertIn("purpose", unloaded)
+        self.assertNotIn("status", unloaded)
+
+    def test_lease_get_all_chunks(self):
+        l1 = api.lease_create(test_lease_1)
+        l2 = api.lease_create(test_lease_2)
+        l3 = api.lease_create(test_lease_3)
+
+        chunks = api.lease_get_all_chunks({"limit": 3}, 2)
+        self.assertEqual(
+            [[l1.uuid, l2.uuid], [l3.uuid]],
+            [[lease.uuid for lease in chunk] for chunk in chunks],
+        )
+
+    def test_lease_get_all_resource_uuids(self):
+        l1 = api.lease_create(test_lease_1)
+        api.lease_create(test_lease_6)
+
+        res = api.lease_get_all({"resource_uuids": ["1111", "fake"]})
+        self.assertEqual([l1.uuid], [lease.uuid for lease in res])
+        self.assertEqual([], list(api.lease_get_all({"resource_uuids": []})))
+
+    def test_lease_get_all_paginate_marker_not_found(self):
+        api.lease_create(test_lease_1)
+
+        self.assertRaises(
+            e.MarkerNotFound, api.lease_get_all, {"limit": 2, "marker": "fake"}
+        )
+
+    def test_lease_get_all_paginate_invalid_sort_key(self):
+        api.lease_create(test_lease_1)
+
+        self.assertRaises(
+            e.InvalidSortKey, api.lease_get_all, {"limit": 2, "sort_key": "fake"}
+        )
+
     def test_lease_get_all_filter_by_status(self):
         api.lease_create(test_lease_1)
         api.lease_create(test_lease_2)
@@ -682,6 +909,65 @@ class TestLeaseAPI(base.DBTestCase):
         assert len(l2) == 1
         assert l2[0].to_dict() == l1.to_dict()
 
+    def test_lease_get_due_to_fulfill(self):
+        l1 = api.lease_create(test_lease_1)
+        l2 = api.lease_create(test_lease_2)
+        api.lease_create(test_lease_3)
+        created = [statuses.CREATED]
+
+        due = api.lease_get_due_to_fulfill(created, l1.start_time, 10)
+        self.assertEqual([l1.uuid], [lease.uuid for lease in due])
+
+        # a lease whose end time has been reached is no longer due to start
+        due = api.lease_get_due_to_fulfill(created, l1.end_time, 10)
+        self.assertEqual([l2.uuid], [lease.uuid for lease in due])
+
+        due = api.lease_get_due_to_fulfill(created, now, 10)
+        self.assertEqual([], due)
+
+    def test_lease_get_due_to_expire(self):
+        l1 = api.lease_create(test_lease_1)
+        l2 = api.lease_create(test_lease_2)
+        l3 = api.lease_create(test_lease_3)
+        api.lease_create(test_lease_4)
+        status = [statuses.CREATED, statuses.ACTIVE]
+        end = test_lease_4["end_time"]
+
+        due = api.lease_get_due_to_expire(status, end, 10)
+        self.assertEqual([l1.uuid, l2.uuid, l3.uuid], [lease.uuid for lease in due])
+
+        due = api.lease_get_due_to_expire(status, end, 2)
+        self.assertEqual([l1.uuid, l2.uuid], [lease.uuid for lease in due])
+        due = api.lease_get_due_to_expire(status, end, 2, due[-1].id)
+        self.assertEqual([l3.uuid], [lease.uuid for lease in due])
+
+        due = api.lease_get_due_to_expire(status, l1.end_time, 10)
+        self.assertEqual([l1.uuid], [lease.uuid for lease in due])
+
+    def test_lease_get_start_and_end_times(self):
+        api.lease_create(test_lease_1)
+        api.lease_create(test_lease_2)
+        api.lease_create(test_lease_3)
+        created = [statuses.CREATED]
+
+        self.assertEqual(
+            [test_lease_1["start_time"]],
+            api.lease_get_start_times(created, test_lease_1["start_time"]),
+        )
+        self.assertEqual(
+            sorted([test_lease_1["start_time"], test_lease_2["start_time"]]),
+            sorted(api.lease_get_start_times(created, test_lease_3["end_time"])),
+        )
+        # test_lease_1 ends when test_lease_2 starts
+        self.assertEqual(
+            [test_lease_1["end_time"]],
+            api.lease_get_end_times(created, test_lease_2["start_time"]),
+        )
+        self.assertEqual(
+            [test_lease_3["end_time"]],
+            api.lease_get_end_times([statuses.ACTIVE], test_lease_3["end_time"]),
+        )
+
     def test_lease_update(self):
         o1 = api.offer_create(test_offer_2)
         test_lease_4["offer_uuid"] = o1.uuid
@@ -960,6 +1246,341 @@ class TestResourceVerifyAvailabilityAPI(base.DBTestCase):
             end,
         )
 
+    def test_resource_verify_availability_wait_cancel(self):
+        test_lease = api.lease_create(test_lease_1)
+        api.lease_update(test_lease.uuid, {"status": statuses.WAIT_CANCEL})
+
+        # a lease being cancelled holds the resource until it is deleted
+        self.assertRaises(
+            e.ResourceTimeConflict,
+            api.resource_verify_availability,
+            test_lease.resource_type,
+            test_lease.resource_uuid,
+            test_lease.start_time,
+            test_lease.end_time,
+        )
+
+        api.lease_update(test_lease.uuid, {"status": statuses.DELETED})
+        api.resource_verify_availability(
+            test_lease.resource_type,
+            test_lease.resource_uuid,
+            test_lease.start_time,
+            test_lease.end_time,
+        )
+
+    def test_resource_verify_availability_one_query(self):
+        api.offer_create(test_offer_4)
+        api.lease_create(test_lease_1)
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            # skip the connection ping and transaction control
+            if "FROM" in statement:
+                statements.append(statement)
+
+        engine = enginefacade.writer.get_engine()
+        sa.event.listen(engine, "before_cursor_execute", count)
+        self.addCleanup(sa.event.remove, engine, "before_cursor_execute", count)
+
+        api.resource_verify_availability(
+            test_offer_4["resource_type"],
+            test_offer_4["resource_uuid"],
+            test_offer_4["end_time"] + datetime.timedelta(days=1),
+            test_offer_4["end_time"] + datetime.timedelta(days=5),
+        )
+        self.assertEqual(1, len(statements))
+        self.assertIn("UNION ALL", statements[0])
+
+    def test_any_conflict(self):
+        api.offer_create(test_offer_4)
+        api.lease_create(test_lease_1)
+
+        self.assertEqual(
+            ("offer", test_offer_4["start_time"], test_offer_4["end_time"]),
+            tuple(
+                api._any_conflict(
+                    api.model_query(models.Offer),
+                    api.model_query(models.Lease).filter(sa.false()),
+                    test_offer_4["start_time"],
+                    test_offer_4["end_time"],
+                )
+            ),
+        )
+        self.assertEqual(
+            ("lease", test_lease_1["start_time"], test_lease_1["end_time"]),
+            tuple(
+                api._any_conflict(
+                    api.model_query(models.Offer).filter(sa.false()),
+                    api.model_query(models.Lease),
+                    test_lease_1["start_time"],
+                    test_lease_1["end_time"],
+                )
+            ),
+        )
+        self.assertIsNone(
+            api._any_conflict(
+                api.model_query(models.Offer),
+                api.model_query(models.Lease),
+                now - datetime.timedelta(days=2),
+                now - datetime.timedelta(days=1),
+            )
+        )
+
+
+class TestResourceGetConflictsAPI(base.DBTestCase):
+    def test_resource_get_conflicts(self):
+        api.offer_create(test_offer_4)
+        api.lease_create(test_lease_1)
+        api.lease_create(test_lease_4)
+
+        windows = [
+            (
+                "dummy_node",
+                "1111",
+                test_lease_1["start_time"] + datetime.timedelta(days=1),
+                test_lease_1["end_time"] + datetime.timedelta(days=-1),
+            ),
+            (
+                "dummy_node",
+                "1111",
+                test_offer_4["start_time"] + datetime.timedelta(days=-1),
+                test_offer_4["end_time"] + datetime.timedelta(days=1),
+            ),
+            (
+                "dummy_node",
+                "1111",
+                test_lease_1["end_time"] + datetime.timedelta(days=1),
+                test_lease_1["end_time"] + datetime.timedelta(days=5),
+            ),
+            (
+                "dummy_node",
+                "2222",
+                test_lease_1["start_time"],
+                test_lease_1["end_time"],
+            ),
+        ]
+
+        conflicts = api.resource_get_conflicts(windows)
+
+        self.assertEqual(
+            [
+                [("lease", test_lease_1["start_time"], test_lease_1["end_time"])],
+                [("offer", test_offer_4["start_time"], test_offer_4["end_time"])],
+                [],
+                [],
+            ],
+            conflicts,
+        )
+
+    def test_resource_get_conflicts_empty(self):
+        self.assertEqual([], api.resource_get_conflicts([]))
+
+
+class TestResourceLockAPI(base.DBTestCase):
+    def _lock_names(self):
+        with enginefacade.reader.using(api._CONTEXT) as session:
+            return [r.name for r in session.query(models.ResourceLock)]
+
+    def test_resource_lock(self):
+        with api.resource_lock("esileap-dummy_node-1111", 5):
+            # writes inside the lock are not part of the lock transaction
+            api.offer_create(test_offer_1)
+        with api.resource_lock("esileap-dummy_node-1111", 5):
+            with api.resource_lock("esileap-dummy_node-2222", 5):
+                pass
+
+        self.assertEqual(
+            ["esileap-dummy_node-1111", "esileap-dummy_node-2222"],
+            sorted(self._lock_names()),
+        )
+        self.assertEqual(1, api.offer_get_all({}).count())
+
+    def test_resource_lock_error(self):
+        def locked():
+            with api.resource_lock("esileap-dummy_node-1111", 5):
+                raise ValueError()
+
+        self.assertRaises(ValueError, locked)
+        with api.resource_lock("esileap-dummy_node-1111", 5):
+            pass
+        self.assertEqual(["esileap-dummy_node-1111"], self._lock_names())
+
+    def test_resource_lock_timeout(self):
+        with mock.patch.object(
+            api, "_lock_timeout", side_effect=db_exc.DBDeadlock()
+        ) as mock_lt:
+            self.assertRaises(
+                e.ResourceLockTimeout,
+                api.resource_lock("esileap-dummy_node-1111", 5).__enter__,
+            )
+            mock_lt.assert_called_once_with(mock.ANY, 5)
+
+    def test_resource_lock_supported(self):
+        self.assertFalse(api.resource_lock_supported())
+
+    def test_lock_timeout_mysql(self):
+        session = mock.Mock()
+        session.get_bind.return_value.dialect.name = "mysql"
+        session.execute.return_value.scalar.return_value = 50
+
+        def statements():
+            return [str(c.args[0]) for c in session.execute.call_args_list]
+
+        with api._lock_timeout(session, 5):
+            self.assertEqual(
+                [
+                    "SELECT @@innodb_lock_wait_timeout",
+                    "SET innodb_lock_wait_timeout = 5",
+                ],
+                statements(),
+            )
+        # the pooled connection gets its own timeout back
+        self.assertEqual("SET innodb_lock_wait_timeout = 50", statements()[-1])
+
+    def test_lock_timeout_postgresql(self):
+        session = mock.Mock()
+        session.get_bind.return_value.dialect.name = "postgresql"
+
+        with api._lock_timeout(session, 5):
+            pass
+
+        session.execute.assert_called_once_with(mock.ANY)
+        self.assertEqual(
+            "SET LOCAL lock_timeout = 5000", str(session.execute.call_args.args[0])
+        )
+
+
+class TestResourceTimeRangesAPI(base.DBTestCase):
+    def setUp(self):
+        super(TestResourceTimeRangesAPI, self).setUp()
+        self.config(overlap_enforcement="database", group="api")
+
+    def _lease(self, start_day, end_day, **kwargs):
+        values = dict(
+            uuid=uuidutils.generate_uuid(),
+            project_id="1e5533",
+            owner_id="0wn3r",
+            resource_type="dummy_node",
+            resource_uuid="1111",
+            start_time=now + datetime.timedelta(days=start_day),
+            end_time=now + datetime.timedelta(days=end_day),
+            status=statuses.CREATED,
+        )
+        values.update(kwargs)
+        return values
+
+    def _ranges(self):
+        with enginefacade.reader.using(api._CONTEXT) as session:
+            return session.query(models.ResourceTimeRange).count()
+
+    def test_lease_create_conflict(self):
+        api.lease_create(self._lease(1, 3))
+        self.assertEqual(1, self._ranges())
+
+        self.assertRaises(e.ResourceTimeConflict, api.lease_create, self._lease(2, 5))
+        # the lease is rolled back with its ranges
+        self.assertEqual(1, api.lease_get_all({}).count())
+
+        api.lease_create(self._lease(4, 5))
+        api.lease_create(self._lease(1, 3, resource_uuid="2222"))
+        self.assertEqual(3, api.lease_get_all({}).count())
+
+    def test_lease_create_adjacent(self):
+        api.lease_create(self._lease(1.3, 2.7))
+        api.lease_create(self._lease(2.7, 3.1))
+        api.lease_create(self._lease(0.5, 1.3))
+        self.assertRaises(
+            e.ResourceTimeConflict, api.lease_create, self._lease(3.0, 3.5)
+        )
+        self.assertEqual(3, self._ranges())
+        with enginefacade.reader.using(api._CONTEXT) as session:
+            locks = [r.name for r in session.query(models.ResourceLock)]
+        self.assertEqual(["time-range:resource:dummy_node:1111"], locks)
+
+    def test_offer_create_open_ended(self):
+        api.offer_create(
+            dict(test_offer_1, start_time=now, end_time=datetime.datetime.max)
+        )
+        self.assertEqual(1, self._ranges())
+        self.assertRaises(
+            e.ResourceTimeConflict, api.lease_create, self._lease(3650, 3651)
+        )
+
+    def test_offer_and_parent_lease_scopes(self):
+        offer = api.offer_create(
+            dict(
+                test_offer_1,
+                start_time=now + datetime.timedelta(days=10),
+                end_time=now + datetime.timedelta(days=20),
+            )
+        )
+        # an offer holds the resource
+        self.assertRaises(e.ResourceTimeConflict, api.lease_create, self._lease(5, 15))
+
+        parent = api.lease_create(self._lease(12, 14, offer_uuid=offer.uuid))
+        self.assertRaises(
+            e.OfferNoTimeAvailabilities,
+            api.lease_create,
+            self._lease(13, 16, offer_uuid=offer.uuid),
+        )
+
+        api.lease_create(self._lease(12, 13, parent_lease_uuid=parent.uuid))
+        self.assertRaises(
+            e.LeaseNoTimeAvailabilities,
+            api.lease_create,
+            self._lease(12, 13, parent_lease_uuid=parent.uuid),
+        )
+
+    def test_lease_update(self):
+        lease = api.lease_create(self._lease(1, 3))
+        other = api.lease_create(self._lease(6, 8))
+
+        self.assertRaises(
+            e.ResourceTimeConflict,
+            api.lease_update,
+            lease.uuid,
+            {"end_time": now + datetime.timedelta(days=7)},
+        )
+        self.assertEqual(
+            now + datetime.timedelta(days=3), api.lease_get_by_uuid(lease.uuid).end_time
+        )
+
+        api.lease_update(lease.uuid, {"end_time": now + datetime.timedelta(days=5)})
+        api.lease_update(other.uuid, {"status": statuses.EXPIRED})
+        api.lease_update(lease.uuid, {"end_time": now + datetime.timedelta(days=7)})
+        self.assertEqual(1, self._ranges())
+
+    def test_lease_update_wait_cancel(self):
+        lease = api.lease_create(self._lease(1, 3))
+
+        api.lease_update(lease.uuid, {"status": statuses.WAIT_CANCEL})
+        self.assertEqual(1, self._ranges())
+        self.assertRaises(e.ResourceTimeConflict, api.lease_create, self._lease(2, 5))
+
+        api.lease_update(lease.uuid, {"status": statuses.DELETED})
+        self.assertEqual(0, self._ranges())
+        api.lease_create(self._lease(2, 5))
+
+    def test_resource_time_ranges_rebuild(self):
+        self.config(overlap_enforcement="application", group="api")
+        api.lease_create(self._lease(1, 3, resource_uuid="2222"))
+        api.lease_create(
+            self._lease(5, 6, resource_uuid="2222", status=statuses.EXPIRED)
+        )
+        api.offer_create(test_offer_1)
+        self.assertEqual(0, self._ranges())
+
+        self.config(overlap_enforcement="database", group="api")
+        api.resource_time_ranges_rebuild()
+        self.assertEqual(2, self._ranges())
+        self.assertRaises(e.ResourceTimeConflict, api.lease_create, self._lease(2, 4))
+        self.assertRaises(
+            e.ResourceTimeConflict,
+            api.lease_create,
+            self._lease(2, 4, resource_uuid="2222"),
+        )
+        api.lease_create(self._lease(5, 6, resource_uuid="2222"))
+
 
 class TestEventAPI(base.DBTestCase):
     def test_event_get_all(self):
@@ -973,6 +1594,21 @@ class TestEventAPI(base.DBTestCase):
         self.assertIn(test_event_1["id"], event_ids)
         self.assertIn(test_event_2["id"], event_ids)
 
+    def test_event_get_all_fields(self):
+        api.event_create(test_event_1)
+
+        events = list(api.event_get_all({"fields": ["id", "event_type"]}))
+        self.assertEqual([test_event_1["event_type"]], [e.event_type for e in events])
+        self.assertIn("resource_uuid", sa.inspect(events[0]).unloaded)
+
+    def test_event_get_all_paginate(self):
+        api.event_create(test_event_1)
+        api.event_create(test_event_2)
+        api.event_create(test_event_3)
+
+        events = api.event_get_all({"limit": 1, "marker": 1})
+        self.assertEqual([2], [event.id for event in events])
+
     def test_event_get_all_filter_by_last_event_time(self):
         api.event_create(test_event_1)
         api.event_create(test_event_2)
@@ -0,0 +1,281 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import random
+
+import mock
+from oslo_db.sqlalchemy import enginefacade
+from oslo_utils import uuidutils
+
+from esi_leap.common import exception as e
+from esi_leap.common import statuses
+from esi_leap.db.sqlalchemy import api
+from esi_leap.db.sqlalchemy import interval_index
+import esi_leap.tests.base as base
+
+now = datetime.datetime(2016, 7, 16, 19, 20, 30)
+
+
+def _offer(resource_uuid, start, end, status=statuses.AVAILABLE):
+    return dict(
+        uuid=uuidutils.generate_uuid(),
+        project_id="0wn3r",
+        resource_uuid=resource_uuid,
+        resource_type="dummy_node",
+        start_time=start,
+        end_time=end,
+        status=status,
+    )
+
+
+def _lease(resource_uuid, start, end, status=statuses.CREATED, offer_uuid=None):
+    return dict(
+        uuid=uuidutils.generate_uuid(),
+        project_id="1e5533",
+        owner_id="0wn3r",
+        resource_uuid=resource_uuid,
+        resource_type="dummy_node",
+        start_time=start,
+        end_time=end,
+        status=status,
+        offer_uuid=offer_uuid,
+    )
+
+
+class TestIntervalIndex(base.DBTestCase):
+    def setUp(self):
+        super(TestIntervalIndex, self).setUp()
+        self.index = interval_index.IntervalIndex()
+
+    def _refresh(self, force=False):
+        with enginefacade.reader.using(api._CONTEXT) as session:
+            self.index.refresh(session, force=force)
+
+    def test_get_intervals_matches_sql(self):
+        rand = random.Random(42)
+        for _ in range(60):
+            start = now + datetime.timedelta(hours=rand.randint(0, 2000))
+            end = start + datetime.timedelta(hours=rand.randint(1, 300))
+            r_uuid = rand.choice(["1111", "2222"])
+            if rand.random() < 0.5:
+                api.offer_create(_offer(r_uuid, start, end))
+            else:
+                status = rand.choice(
+                    [statuses.CREATED, statuses.ACTIVE, statuses.EXPIRED]
+                )
+                api.lease_create(_lease(r_uuid, start, end, status))
+        self._refresh()
+
+        windows = []
+        for _ in range(100):
+            start = now + datetime.timedelta(hours=rand.randint(0, 2300))
+            end = start + datetime.timedelta(hours=rand.randint(0, 200))
+            windows.append(("dummy_node", rand.choice(["1111", "2222"]), start, end))
+
+        expected = api.resource_get_conflicts(windows)
+        for window, conflicts in zip(windows, expected):
+            intervals = self.index.get_intervals(*window)
+            actual = [
+                (i.source, i.start_time, i.end_time)
+                for i in intervals
+                if i.status in (statuses.AVAILABLE, statuses.CREATED, statuses.ACTIVE)
+            ]
+            self.assertEqual(sorted(conflicts), sorted(actual))
+
+    def test_refresh_applies_changes(self):
+        o = api.offer_create(_offer("1111", now, now + datetime.timedelta(days=10)))
+        lease = api.lease_create(
+            _lease(
+                "1111",
+                now + datetime.timedelta(days=1),
+                now + datetime.timedelta(days=2),
+                offer_uuid=o.uuid,
+            )
+        )
+        self._refresh()
+        self.assertEqual(2, len(self.index.get_intervals("dummy_node", "1111")))
+
+        api.lease_update(lease.uuid, {"status": statuses.EXPIRED})
+        api.offer_create(_offer("2222", now, now + datetime.timedelta(days=10)))
+
+        # within the refresh interval nothing changes without force
+        self._refresh()
+        self.assertEqual(2, len(self.index.get_intervals("dummy_node", "1111")))
+
+        self._refresh(force=True)
+        self.assertEqual(
+            [o.uuid],
+            [i.uuid for i in self.index.get_intervals("dummy_node", "1111")],
+        )
+        self.assertEqual(1, len(self.index.get_intervals("dummy_node", "2222")))
+
+    def test_refresh_rebuild_drops_deleted_rows(self):
+        o = api.offer_create(_offer("1111", now, now + datetime.timedelta(days=10)))
+        self._refresh()
+        api.offer_destroy(o.uuid)
+
+        self._refresh(force=True)
+        self.assertEqual(1, len(self.index.get_intervals("dummy_node", "1111")))
+
+        self.config(interval_index_rebuild_interval=0, group="api")
+        self._refresh()
+        self.index._rebuild_thread.join()
+        self.assertEqual([], self.index.get_intervals("dummy_node", "1111"))
+
+    def test_refresh_rebuilds_in_background(self):
+        self._refresh()
+        self.assertIsNone(self.index._rebuild_thread)
+
+        self.config(interval_index_rebuild_interval=0, group="api")
+        with mock.patch.object(self.index, "_rebuild_in_background") as mock_rib:
+            self._refresh()
+        mock_rib.assert_called_once_with()
+
+    def test_apply_row_and_remove(self):
+        o = api.offer_create(_offer("1111", now, now + datetime.timedelta(days=10)))
+        self.index.apply_row(interval_index.OFFER, o)
+        self.assertEqual([], self.index.get_intervals("dummy_node", "1111"))
+
+        self._refresh()
+        o.status = statuses.DELETED
+        self.index.apply_row(interval_index.OFFER, o)
+        self.assertEqual([], self.index.get_intervals("dummy_node", "1111"))
+
+        o.status = statuses.AVAILABLE
+        self.index.apply_row(interval_index.OFFER, o)
+        self.assertEqual(1, len(self.index.get_intervals("dummy_node", "1111")))
+        self.index.remove(interval_index.OFFER, o.uuid)
+        self.assertEqual([], self.index.get_intervals("dummy_node", "1111"))
+
+
+class TestIntervalIndexAPI(base.DBTestCase):
+    def setUp(self):
+        super(TestIntervalIndexAPI, self).setUp()
+        self.config(interval_index_enabled=True, group="api")
+        patcher = mock.patch.object(interval_index, "_INDEX", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_offer_get_conflict_times_stale_index(self):
+        o = api.offer_create(_offer("1111", now, now + datetime.timedelta(days=10)))
+        api.resource_get_intervals("dummy_node", "1111")
+
+        # leases created by another API worker never reach this index
+        with mock.patch.object(api, "_index_write"):
+            l1 = api.lease_create(
+                _lease(
+                    "1111",
+                    now + datetime.timedelta(days=3),
+                    now + datetime.timedelta(days=4),
+                    offer_uuid=o.uuid,
+                )
+            )
+        l2 = api.lease_create(
+            _lease(
+                "1111",
+                now + datetime.timedelta(days=1),
+                now + datetime.timedelta(days=2),
+                offer_uuid=o.uuid,
+            )
+        )
+
+        self.assertEqual(
+            [(l2.start_time, l2.end_time), (l1.start_time, l1.end_time)],
+            api.offer_get_conflict_times(o),
+        )
+        self.assertEqual(
+            [
+                (o.uuid, l2.start_time, l2.end_time),
+                (o.uuid, l1.start_time, l1.end_time),
+            ],
+            api.offer_get_conflict_times_by_offer([o.uuid]),
+        )
+
+    def test_resource_verify_availability(self):
+        api.lease_create(
+            _lease(
+                "1111",
+                now + datetime.timedelta(days=1),
+                now + datetime.timedelta(days=2),
+            )
+        )
+
+        api.resource_verify_availability(
+            "dummy_node",
+            "1111",
+            now + datetime.timedelta(days=2),
+            now + datetime.timedelta(days=3),
+        )
+        self.assertRaises(
+            e.ResourceTimeConflict,
+            api.resource_verify_availability,
+            "dummy_node",
+            "1111",
+            now,
+            now + datetime.timedelta(days=3),
+        )
+
+    def test_resource_verify_availability_stale_index(self):
+        o = api.offer_create(_offer("1111", now, now + datetime.timedelta(days=10)))
+        api.resource_get_intervals("dummy_node", "1111")
+
+        # a write by another API worker never reaches this process's index
+        with mock.patch.object(api, "_index_write"):
+            api.offer_update(o.uuid, {"status": statuses.DELETED})
+        self.assertEqual(1, len(api.resource_get_intervals("dummy_node", "1111")))
+
+        api.resource_verify_availability(
+            "dummy_node", "1111", now, now + datetime.timedelta(days=1)
+        )
+
+    def test_local_writes_update_index(self):
+        o = api.offer_create(_offer("1111", now, now + datetime.timedelta(days=10)))
+        api.resource_get_intervals("dummy_node", "1111")
+
+        api.offer_update(o.uuid, {"status": statuses.DELETED})
+        self.assertEqual([], api.resource_get_intervals("dummy_node", "1111"))
+
+        lease = api.lease_create(
+            _lease(
+                "1111",
+                now + datetime.timedelta(days=1),
+                now + datetime.timedelta(days=2),
+            )
+        )
+        self.assertEqual(
+            [lease.uuid],
+            [i.uuid for i in api.resource_get_intervals("dummy_node", "1111")],
+        )
+        api.lease_destroy(lease.uuid)
+        self.assertEqual([], api.resource_get_intervals("dummy_node", "1111"))
+
+    def test_resource_get_intervals(self):
+        o = api.offer_create(_offer("1111", now, now + datetime.timedelta(days=10)))
+        lease = api.lease_create(
+            _lease(
+                "1111",
+                now + datetime.timedelta(days=1),
+                now + datetime.timedelta(days=2),
+            )
+        )
+        expected = [
+            ("offer", o.uuid, statuses.AVAILABLE),
+            ("lease", lease.uuid, statuses.CREATED),
+        ]
+
+        intervals = api.resource_get_intervals("dummy_node", "1111")
+        self.assertEqual(expected, [(i.source, i.uuid, i.status) for i in intervals])
+
+        self.config(interval_index_enabled=False, group="api")
+        intervals = api.resource_get_intervals("dummy_node", "1111")
+        self.assertEqual(expected, [(i.source, i.uuid, i.status) for i in intervals])
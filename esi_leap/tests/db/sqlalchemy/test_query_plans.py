@@ -0,0 +1,163 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import re
+
+from oslo_db.sqlalchemy import enginefacade
+import sqlalchemy as sa
+
+from esi_leap.common import exception
+from esi_leap.common import statuses
+from esi_leap.db.sqlalchemy import api
+import esi_leap.tests.base as base
+
+now = datetime.datetime(2016, 7, 16, 19, 20, 30)
+
+# a full table scan of a hot table shows up as e.g. "SCAN leases" (or
+# "SCAN TABLE leases" on older SQLite releases)
+FULL_SCAN = re.compile(r"\bSCAN (TABLE )?(leases|offers)\b")
+
+test_offer = dict(
+    uuid="11111",
+    project_id="0wn3r",
+    name="o1",
+    resource_uuid="1111",
+    resource_type="dummy_node",
+    start_time=now,
+    end_time=now + datetime.timedelta(days=100),
+    status=statuses.AVAILABLE,
+)
+
+test_lease = dict(
+    uuid="22222",
+    project_id="1e5533",
+    owner_id="0wn3r",
+    name="l1",
+    resource_uuid="1111",
+    resource_type="dummy_node",
+    offer_uuid="11111",
+    start_time=now + datetime.timedelta(days=10),
+    end_time=now + datetime.timedelta(days=20),
+    status=statuses.ACTIVE,
+)
+
+
+class TestQueryPlans(base.DBTestCase):
+    """Run EXPLAIN on the hot queries and fail on full table scans."""
+
+    def setUp(self):
+        super(TestQueryPlans, self).setUp()
+        self.offer = api.offer_create(test_offer)
+        self.lease = api.lease_create(test_lease)
+
+        self.engine = enginefacade.writer.get_engine()
+        self.statements = []
+        sa.event.listen(self.engine, "before_cursor_execute", self._record)
+        self.addCleanup(
+            sa.event.remove, self.engine, "before_cursor_execute", self._record
+        )
+
+    def _record(self, conn, cursor, statement, parameters, *args):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM" in statement:
+            self.statements.append((statement, parameters))
+
+    def _explain(self, statement, parameters):
+        with self.engine.connect() as conn:
+            rows = conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN " + statement, parameters
+            ).fetchall()
+        return [row[-1] for row in rows]
+
+    def assertNoFullScan(self, func, *args):
+        del self.statements[:]
+        try:
+            func(*args)
+        except exception.ESILeapException:
+            pass
+
+        self.assertNotEqual([], self.statements)
+        for statement, parameters in list(self.statements):
+            plan = self._explain(statement, parameters)
+            scans = [line for line in plan if FULL_SCAN.search(line)]
+            self.assertEqual(
+                [], scans, "Full scan in plan %s for query %s" % (plan, statement)
+            )
+
+    def test_resource_verify_availability(self):
+        self.assertNoFullScan(
+            api.resource_verify_availability,
+            "dummy_node",
+            "1111",
+            now + datetime.timedelta(days=30),
+            now + datetime.timedelta(days=40),
+        )
+
+    def test_offer_verify_availability(self):
+        self.assertNoFullScan(
+            api.offer_verify_availability,
+            self.offer,
+            now + datetime.timedelta(days=30),
+            now + datetime.timedelta(days=40),
+        )
+
+    def test_lease_verify_child_availability(self):
+        self.assertNoFullScan(
+            api.lease_verify_child_availability,
+            self.lease,
+            now + datetime.timedelta(days=12),
+            now + datetime.timedelta(days=14),
+        )
+
+    def test_offer_get_conflict_times(self):
+        self.assertNoFullScan(api.offer_get_conflict_times, self.offer)
+
+    def test_offer_get_next_lease_start_time(self):
+        self.assertNoFullScan(api.offer_get_next_lease_start_time, self.offer.uuid, now)
+
+    def test_offer_get_by_name(self):
+        self.assertNoFullScan(api.offer_get_by_name, "o1")
+
+    def test_lease_get_by_name(self):
+        self.assertNoFullScan(api.lease_get_by_name, "l1")
+
+    def test_lease_get_due_to_fulfill(self):
+        self.assertNoFullScan(
+            api.lease_get_due_to_fulfill,
+            [statuses.CREATED, statuses.WAIT_FULFILL],
+            now,
+            100,
+        )
+
+    def test_lease_get_due_to_expire(self):
+        self.assertNoFullScan(
+            api.lease_get_due_to_expire,
+            [statuses.ACTIVE, statuses.CREATED],
+            now,
+            100,
+            self.lease.id,
+        )
+
+    def test_lease_get_start_times(self):
+        self.assertNoFullScan(
+            api.lease_get_start_times, [statuses.CREATED, statuses.WAIT_FULFILL], now
+        )
+
+    def test_lease_get_end_times(self):
+        self.assertNoFullScan(
+            api.lease_get_end_times, [statuses.ACTIVE, statuses.CREATED], now
+        )
+
+    def test_offer_get_end_times(self):
+        self.assertNoFullScan(
+            api.offer_get_end_times, [statuses.AVAILABLE, statuses.ERROR], now
+        )
@@ -0,0 +1,110 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+import mock
+import oslo_messaging as messaging
+from oslo_utils import uuidutils
+
+import esi_leap.conf
+from esi_leap.manager import rpcapi
+from esi_leap.manager import service
+from esi_leap.manager import utils
+from esi_leap.tests import base
+
+CONF = esi_leap.conf.CONF
+
+
+class TestManagerRPCAPI(base.TestCase):
+    def test_target(self):
+        target = rpcapi.ManagerRPCAPI()._client.target
+
+        self.assertEqual(utils.TOPIC, target.topic)
+        self.assertEqual(utils.NAMESPACE, target.namespace)
+        self.assertEqual(utils.RPC_API_VERSION, target.version)
+        self.assertIsNone(target.server)
+
+    def test_reschedule(self):
+        api = rpcapi.ManagerRPCAPI()
+
+        with mock.patch.object(api._client, "prepare") as mock_prepare:
+            api.reschedule(self.context)
+
+        mock_prepare.assert_called_once_with(version="1.1", retry=0)
+        mock_prepare.return_value.cast.assert_called_once_with(
+            self.context.to_dict(), "reschedule"
+        )
+
+    def _test_lease_cast(self, method):
+        api = rpcapi.ManagerRPCAPI()
+
+        with mock.patch.object(api._client, "prepare") as mock_prepare:
+            getattr(api, method)(self.context, "lease-uuid")
+
+        mock_prepare.assert_called_once_with(version="1.2", retry=0)
+        mock_prepare.return_value.cast.assert_called_once_with(
+            self.context.to_dict(), method, lease_uuid="lease-uuid"
+        )
+
+    def test_fulfill_lease(self):
+        self._test_lease_cast("fulfill_lease")
+
+    def test_expire_lease(self):
+        self._test_lease_cast("expire_lease")
+
+    def test_cancel_lease(self):
+        self._test_lease_cast("cancel_lease")
+
+
+class TestManagerRPCFakeDriver(base.TestCase):
+    """Send casts through the fake driver to a real ManagerEndpoint."""
+
+    def setUp(self):
+        super(TestManagerRPCFakeDriver, self).setUp()
+        # fake driver exchanges are process wide; keep casts left over from
+        # other tests out of this server's queue
+        self.config(control_exchange=uuidutils.generate_uuid())
+        self.scheduler = mock.Mock()
+        self.called = threading.Event()
+        self.scheduler.run_soon.side_effect = lambda job: self.called.set()
+
+        # the manager runs on another host than the API sending casts
+        self.config(host="manager-host")
+        self.server = messaging.get_rpc_server(
+            target=utils.get_target(),
+            transport=messaging.get_rpc_transport(CONF),
+            endpoints=[service.ManagerEndpoint(self.scheduler)],
+            executor="threading",
+        )
+        self.server.start()
+        self.addCleanup(self.server.wait)
+        self.addCleanup(self.server.stop)
+        self.config(host="api-host")
+
+    def _test_cast(self, method, job):
+        getattr(rpcapi.ManagerRPCAPI(), method)(self.context, "lease-uuid")
+
+        self.assertTrue(self.called.wait(5))
+        self.scheduler.run_soon.assert_called_once_with(job)
+
+    def test_fulfill_lease(self):
+        self._test_cast("fulfill_lease", service.FULFILL_LEASES)
+        self.scheduler.reload.assert_called_once_with()
+
+    def test_expire_lease(self):
+        self._test_cast("expire_lease", service.EXPIRE_LEASES)
+        self.scheduler.reload.assert_called_once_with()
+
+    def test_cancel_lease(self):
+        self._test_cast("cancel_lease", service.CANCEL_LEASES)
+        self.scheduler.reload.assert_not_called()
@@ -0,0 +1,107 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import mock
+
+from esi_leap.manager import scheduler
+from esi_leap.tests import base
+
+now = datetime.datetime(2016, 7, 16, 19, 20, 30)
+
+
+class TestDeadlineScheduler(base.TestCase):
+    def setUp(self):
+        super(TestDeadlineScheduler, self).setUp()
+        self.fulfill = mock.Mock()
+        self.expire = mock.Mock()
+        self.load = mock.Mock(return_value=[])
+        self.scheduler = scheduler.DeadlineScheduler(
+            {"fulfill": self.fulfill, "expire": self.expire}, self.load, 3600
+        )
+
+    @mock.patch("oslo_utils.timeutils.utcnow")
+    def test_run_once(self, mock_utcnow):
+        mock_utcnow.return_value = now
+        self.load.return_value = [
+            (now - datetime.timedelta(seconds=5), "fulfill"),
+            (now, "fulfill"),
+            (now + datetime.timedelta(seconds=30), "expire"),
+        ]
+
+        timeout = self.scheduler.run_once()
+
+        self.load.assert_called_once_with(now + datetime.timedelta(seconds=3600))
+        self.fulfill.assert_called_once_with()
+        self.expire.assert_not_called()
+        self.assertEqual(30, timeout)
+
+        mock_utcnow.return_value = now + datetime.timedelta(seconds=30)
+        timeout = self.scheduler.run_once()
+
+        self.load.assert_called_once()
+        self.fulfill.assert_called_once_with()
+        self.expire.assert_called_once_with()
+        self.assertEqual(3570, timeout)
+
+    @mock.patch("oslo_utils.timeutils.utcnow")
+    def test_run_once_reloads_at_horizon(self, mock_utcnow):
+        mock_utcnow.return_value = now
+        self.scheduler.run_once()
+        mock_utcnow.return_value = now + datetime.timedelta(seconds=3600)
+        self.scheduler.run_once()
+
+        self.assertEqual(2, self.load.call_count)
+
+    @mock.patch("oslo_utils.timeutils.utcnow")
+    def test_reload(self, mock_utcnow):
+        mock_utcnow.return_value = now
+        self.scheduler.run_once()
+        self.load.return_value = [(now + datetime.timedelta(seconds=1), "expire")]
+
+        self.scheduler.reload()
+        timeout = self.scheduler.run_once()
+
+        self.assertEqual(2, self.load.call_count)
+        self.assertEqual(1, timeout)
+
+    @mock.patch("oslo_utils.timeutils.utcnow")
+    def test_poll(self, mock_utcnow):
+        mock_utcnow.return_value = now
+        self.scheduler.poll()
+        self.scheduler.run_once()
+
+        self.fulfill.assert_called_once_with()
+        self.expire.assert_called_once_with()
+
+    @mock.patch("oslo_utils.timeutils.utcnow")
+    def test_run_soon(self, mock_utcnow):
+        mock_utcnow.return_value = now
+        self.load.return_value = [(now + datetime.timedelta(seconds=30), "expire")]
+        self.scheduler.run_once()
+
+        self.scheduler.run_soon("expire")
+        timeout = self.scheduler.run_once()
+
+        self.expire.assert_called_once_with()
+        self.assertEqual(30, timeout)
+
+    @mock.patch("oslo_utils.timeutils.utcnow")
+    def test_run_once_job_error(self, mock_utcnow):
+        mock_utcnow.return_value = now
+        self.expire.side_effect = Exception("whoops")
+        self.scheduler.poll()
+
+        self.scheduler.run_once()
+
+        self.fulfill.assert_called_once_with()
+        self.expire.assert_called_once_with()
@@ -11,10 +11,12 @@
 #    under the License.
 
 import datetime
+import fixtures
 import mock
 from oslo_utils import uuidutils
 
 from esi_leap.common import statuses
+from esi_leap.manager import service
 from esi_leap.manager.service import ManagerService
 from esi_leap.objects import lease
 from esi_leap.objects import offer
@@ -48,24 +50,89 @@ class TestService(base.TestCase):
 
     @mock.patch("esi_leap.objects.lease.Lease.fulfill")
     @mock.patch("oslo_utils.timeutils.utcnow")
-    @mock.patch("esi_leap.objects.lease.Lease.get_all")
-    def test__fulfill_leases(self, mock_ga, mock_utcnow, mock_fulfill):
-        mock_ga.return_value = [self.test_lease, self.test_lease]
+    @mock.patch("esi_leap.objects.lease.Lease.get_due_to_fulfill")
+    def test__fulfill_leases(self, mock_gdtf, mock_utcnow, mock_fulfill):
+        mock_gdtf.return_value = [self.test_lease, self.test_lease]
         mock_utcnow.return_value = datetime.datetime(3500, 7, 16)
 
         s = ManagerService()
         s._fulfill_leases()
 
         assert mock_fulfill.call_count == 2
-        mock_ga.assert_called_once_with(
-            {"status": [statuses.CREATED, statuses.WAIT_FULFILL]}, s._context
+        mock_gdtf.assert_called_once_with(
+            [statuses.CREATED, statuses.WAIT_FULFILL],
+            datetime.datetime(3500, 7, 16),
+            service.LEASE_BATCH_SIZE,
+            None,
+            s._context,
+        )
+
+    @mock.patch("esi_leap.objects.lease.Lease.fulfill")
+    @mock.patch("oslo_utils.timeutils.utcnow")
+    @mock.patch("esi_leap.objects.lease.Lease.get_due_to_fulfill")
+    def test__fulfill_leases_batches(self, mock_gdtf, mock_utcnow, mock_fulfill):
+        self.useFixture(fixtures.MockPatchObject(service, "LEASE_BATCH_SIZE", 2))
+        leases = []
+        for i in range(3):
+            leases.append(
+                lease.Lease(
+                    id=i + 1,
+                    uuid=uuidutils.generate_uuid(),
+                    status=statuses.CREATED,
+                )
+            )
+        mock_gdtf.side_effect = [leases[:2], leases[2:]]
+        mock_utcnow.return_value = datetime.datetime(3500, 7, 16)
+
+        s = ManagerService()
+        s._fulfill_leases()
+
+        assert mock_fulfill.call_count == 3
+        mock_gdtf.assert_has_calls(
+            [
+                mock.call(
+                    [statuses.CREATED, statuses.WAIT_FULFILL],
+                    datetime.datetime(3500, 7, 16),
+                    2,
+                    None,
+                    s._context,
+                ),
+                mock.call(
+                    [statuses.CREATED, statuses.WAIT_FULFILL],
+                    datetime.datetime(3500, 7, 16),
+                    2,
+                    2,
+                    s._context,
+                ),
+            ]
+        )
+
+    @mock.patch("esi_leap.objects.lease.Lease.fulfill")
+    @mock.patch("oslo_utils.timeutils.utcnow")
+    @mock.patch("esi_leap.objects.lease.Lease.get_due_to_fulfill")
+    def test__fulfill_leases_wait_retry(self, mock_gdtf, mock_utcnow, mock_fulfill):
+        def fulfill(context):
+            self.test_lease.status = statuses.WAIT_FULFILL
+
+        mock_gdtf.return_value = [self.test_lease]
+        mock_utcnow.return_value = datetime.datetime(3500, 7, 16)
+        mock_fulfill.side_effect = fulfill
+
+        s = ManagerService()
+        with mock.patch.object(s._scheduler, "add") as mock_add:
+            s._fulfill_leases()
+
+        mock_add.assert_called_once_with(
+            datetime.datetime(3500, 7, 16, 0, 1), service.FULFILL_LEASES
         )
 
     @mock.patch("esi_leap.objects.lease.Lease.save")
     @mock.patch("esi_leap.objects.lease.Lease.fulfill")
     @mock.patch("oslo_utils.timeutils.utcnow")
-    @mock.patch("esi_leap.objects.lease.Lease.get_all")
-    def test__fulfill_leases_error(self, mock_ga, mock_utcnow, mock_fulfill, mock_save):
+    @mock.patch("esi_leap.objects.lease.Lease.get_due_to_fulfill")
+    def test__fulfill_leases_error(
+        self, mock_gdtf, mock_utcnow, mock_fulfill, mock_save
+    ):
         error_lease = lease.Lease(
             offer_uuid=self.test_offer.uuid,
             name="c",
@@ -75,7 +142,7 @@ class TestService(base.TestCase):
             start_time=datetime.datetime(3000, 7, 16),
             end_time=datetime.datetime(4000, 7, 16),
         )
-        mock_ga.return_value = [error_lease]
+        mock_gdtf.return_value = [error_lease]
         mock_utcnow.return_value = datetime.datetime(3500, 7, 16)
         mock_fulfill.side_effect = Exception("whoops")
 
@@ -83,40 +150,58 @@ class TestService(base.TestCase):
         s._fulfill_leases()
 
         mock_fulfill.assert_called_once()
-        mock_ga.assert_called_once_with(
-            {"status": [statuses.CREATED, statuses.WAIT_FULFILL]}, s._context
-        )
+        mock_gdtf.assert_called_once()
         self.assertEqual(statuses.ERROR, error_lease.status)
         mock_save.assert_called_once()
 
     @mock.patch("esi_leap.objects.lease.Lease.expire")
     @mock.patch("oslo_utils.timeutils.utcnow")
-    @mock.patch("esi_leap.objects.lease.Lease.get_all")
-    def test__expire_leases(self, mock_ga, mock_utcnow, mock_expire):
-        mock_ga.return_value = [self.test_lease, self.test_lease]
+    @mock.patch("esi_leap.objects.lease.Lease.get_due_to_expire")
+    def test__expire_leases(self, mock_gdte, mock_utcnow, mock_expire):
+        mock_gdte.return_value = [self.test_lease, self.test_lease]
         mock_utcnow.return_value = datetime.datetime(5000, 7, 16)
 
         s = ManagerService()
         s._expire_leases()
 
         assert mock_expire.call_count == 2
-        mock_ga.assert_called_once_with(
-            {
-                "status": [
-                    statuses.ACTIVE,
-                    statuses.CREATED,
-                    statuses.WAIT_EXPIRE,
-                    statuses.WAIT_FULFILL,
-                ]
-            },
+        mock_gdte.assert_called_once_with(
+            [
+                statuses.ACTIVE,
+                statuses.CREATED,
+                statuses.WAIT_EXPIRE,
+                statuses.WAIT_FULFILL,
+            ],
+            datetime.datetime(5000, 7, 16),
+            service.LEASE_BATCH_SIZE,
+            None,
             s._context,
         )
 
+    @mock.patch("esi_leap.objects.lease.Lease.expire")
+    @mock.patch("oslo_utils.timeutils.utcnow")
+    @mock.patch("esi_leap.objects.lease.Lease.get_due_to_expire")
+    def test__expire_leases_wait_retry(self, mock_gdte, mock_utcnow, mock_expire):
+        def expire(context):
+            self.test_lease.status = statuses.WAIT_EXPIRE
+
+        mock_gdte.return_value = [self.test_lease]
+        mock_utcnow.return_value = datetime.datetime(5000, 7, 16)
+        mock_expire.side_effect = expire
+
+        s = ManagerService()
+        with mock.patch.object(s._scheduler, "add") as mock_add:
+            s._expire_leases()
+
+        mock_add.assert_called_once_with(
+            datetime.datetime(5000, 7, 16, 0, 1), service.EXPIRE_LEASES
+        )
+
     @mock.patch("esi_leap.objects.lease.Lease.save")
     @mock.patch("esi_leap.objects.lease.Lease.expire")
     @mock.patch("oslo_utils.timeutils.utcnow")
-    @mock.patch("esi_leap.objects.lease.Lease.get_all")
-    def test__expire_leases_error(self, mock_ga, mock_utcnow, mock_expire, mock_save):
+    @mock.patch("esi_leap.objects.lease.Lease.get_due_to_expire")
+    def test__expire_leases_error(self, mock_gdte, mock_utcnow, mock_expire, mock_save):
         error_lease = lease.Lease(
             offer_uuid=self.test_offer.uuid,
             name="c",
@@ -126,7 +211,7 @@ class TestService(base.TestCase):
             start_time=datetime.datetime(3000, 7, 16),
             end_time=datetime.datetime(4000, 7, 16),
         )
-        mock_ga.return_value = [error_lease]
+        mock_gdte.return_value = [error_lease]
         mock_utcnow.return_value = datetime.datetime(5000, 7, 16)
         mock_expire.side_effect = Exception("whoops")
 
@@ -134,17 +219,7 @@ class TestService(base.TestCase):
         s._expire_leases()
 
         mock_expire.assert_called_once()
-        mock_ga.assert_called_once_with(
-            {
-                "status": [
-                    statuses.ACTIVE,
-                    statuses.CREATED,
-                    statuses.WAIT_EXPIRE,
-                    statuses.WAIT_FULFILL,
-                ]
-            },
-            s._context,
-        )
+        mock_gdte.assert_called_once()
         self.assertEqual(statuses.ERROR, error_lease.status)
         mock_save.assert_called_once()
 
@@ -238,3 +313,72 @@ class TestService(base.TestCase):
         s._clean_expired_console_tokens()
 
         mock_cect.assert_called_once
+
+    @mock.patch("esi_leap.objects.offer.Offer.get_end_times")
+    @mock.patch("esi_leap.objects.lease.Lease.get_end_times")
+    @mock.patch("esi_leap.objects.lease.Lease.get_start_times")
+    def test__load_deadlines(self, mock_gst, mock_get, mock_oget):
+        t1 = datetime.datetime(3000, 7, 16)
+        t2 = datetime.datetime(4000, 7, 16)
+        until = datetime.datetime(3500, 7, 16)
+        mock_gst.return_value = [t1]
+        mock_get.return_value = [t1, t2]
+        mock_oget.return_value = [t2]
+
+        s = ManagerService()
+        deadlines = s._load_deadlines(until)
+
+        mock_gst.assert_called_once_with(service.LEASE_FULFILL_STATUSES, until)
+        mock_get.assert_called_once_with(service.LEASE_EXPIRE_STATUSES, until)
+        mock_oget.assert_called_once_with(statuses.OFFER_CAN_DELETE, until)
+        self.assertEqual(
+            [
+                (t1, service.FULFILL_LEASES),
+                (t1, service.EXPIRE_LEASES),
+                (t2, service.EXPIRE_LEASES),
+                (t2, service.EXPIRE_OFFERS),
+            ],
+            deadlines,
+        )
+
+    def test_endpoint_reschedule(self):
+        s = ManagerService()
+
+        with mock.patch.object(s._scheduler, "reload") as mock_reload:
+            service.ManagerEndpoint(s._scheduler).reschedule(self.context.to_dict())
+
+        mock_reload.assert_called_once_with()
+
+    def test_endpoint_fulfill_lease(self):
+        s = ManagerService()
+
+        with mock.patch.object(s._scheduler, "reload") as mock_reload:
+            with mock.patch.object(s._scheduler, "run_soon") as mock_run_soon:
+                service.ManagerEndpoint(s._scheduler).fulfill_lease(
+                    self.context.to_dict(), self.test_lease.uuid
+                )
+
+        mock_reload.assert_called_once_with()
+        mock_run_soon.assert_called_once_with(service.FULFILL_LEASES)
+
+    def test_endpoint_expire_lease(self):
+        s = ManagerService()
+
+        with mock.patch.object(s._scheduler, "reload") as mock_reload:
+            with mock.patch.object(s._scheduler, "run_soon") as mock_run_soon:
+                service.ManagerEndpoint(s._scheduler).expire_lease(
+                    self.context.to_dict(), self.test_lease.uuid
+                )
+
+        mock_reload.assert_called_once_with()
+        mock_run_soon.assert_called_once_with(service.EXPIRE_LEASES)
+
+    def test_endpoint_cancel_lease(self):
+        s = ManagerService()
+
+        with mock.patch.object(s._scheduler, "run_soon") as mock_run_soon:
+            service.ManagerEndpoint(s._scheduler).cancel_lease(
+                self.context.to_dict(), self.test_lease.uuid
+            )
+
+        mock_run_soon.assert_called_once_with(service.CANCEL_LEASES)
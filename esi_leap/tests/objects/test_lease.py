@@ -122,6 +122,38 @@ class TestLeaseObject(base.DBTestCase):
             self.assertIsInstance(leases[0], lease_obj.Lease)
             self.assertEqual(self.context, leases[0]._context)
 
+    def test_get_due_to_fulfill(self):
+        now = datetime.datetime(2016, 7, 16)
+        with mock.patch.object(
+            self.db_api, "lease_get_due_to_fulfill", autospec=True
+        ) as mock_lgdtf:
+            mock_lgdtf.return_value = [self.test_lease_dict]
+
+            leases = lease_obj.Lease.get_due_to_fulfill(
+                [statuses.CREATED], now, 10, 5, self.context
+            )
+
+            mock_lgdtf.assert_called_once_with([statuses.CREATED], now, 10, 5)
+            self.assertEqual(len(leases), 1)
+            self.assertIsInstance(leases[0], lease_obj.Lease)
+            self.assertEqual(self.context, leases[0]._context)
+
+    def test_get_due_to_expire(self):
+        now = datetime.datetime(2016, 7, 16)
+        with mock.patch.object(
+            self.db_api, "lease_get_due_to_expire", autospec=True
+        ) as mock_lgdte:
+            mock_lgdte.return_value = [self.test_lease_dict]
+
+            leases = lease_obj.Lease.get_due_to_expire(
+                [statuses.ACTIVE], now, 10, context=self.context
+            )
+
+            mock_lgdte.assert_called_once_with([statuses.ACTIVE], now, 10, None)
+            self.assertEqual(len(leases), 1)
+            self.assertIsInstance(leases[0], lease_obj.Lease)
+            self.assertEqual(self.context, leases[0]._context)
+
     @mock.patch("esi_leap.objects.lease.Lease.verify_time_range")
     @mock.patch("esi_leap.db.sqlalchemy.api.lease_create")
     def test_create(self, mock_lc, mock_vtr):
@@ -140,6 +172,30 @@ class TestLeaseObject(base.DBTestCase):
             lease.resource_uuid,
         )
 
+    @mock.patch("esi_leap.common.utils.lock")
+    @mock.patch("esi_leap.db.sqlalchemy.api.offer_verify_availability")
+    @mock.patch("esi_leap.db.sqlalchemy.api.lease_create")
+    def test_create_overlap_enforced_by_database(self, mock_lc, mock_ova, mock_lock):
+        self.config(overlap_enforcement="database", group="api")
+        lease = lease_obj.Lease(self.context, **self.test_lease_create_offer_dict)
+        mock_lc.return_value = self.test_lease_dict
+
+        with mock.patch.object(
+            offer_obj.Offer, "get", return_value=self.test_offer
+        ) as mock_og:
+            lease.create()
+
+        mock_og.assert_called_once_with(self.test_offer.uuid)
+        mock_lock.assert_not_called()
+        mock_ova.assert_not_called()
+        mock_lc.assert_called_once_with(self.test_lease_create_offer_dict)
+
+        # the offer still has to contain the lease
+        lease = lease_obj.Lease(self.context, **self.test_lease_create_offer_dict)
+        lease.end_time = self.test_offer.end_time + datetime.timedelta(days=1)
+        with mock.patch.object(offer_obj.Offer, "get", return_value=self.test_offer):
+            self.assertRaises(exception.OfferNoTimeAvailabilities, lease.create)
+
     def test_create_conflict(self):
         lease = lease_obj.Lease(self.context, **self.test_lease_create_offer_dict)
         lease2 = lease_obj.Lease(self.context, **self.test_lease_create_offer_dict)
@@ -242,12 +298,14 @@ class TestLeaseObject(base.DBTestCase):
                 assert mock_vtr.call_count == 2
                 mock_save.assert_called_once()
 
+    @mock.patch("esi_leap.db.sqlalchemy.api.lease_get_by_uuid")
     @mock.patch("esi_leap.objects.lease.Lease.resource_object")
     @mock.patch("esi_leap.resource_objects.fake_node.FakeNode.set_lease")
     @mock.patch("esi_leap.objects.lease.Lease.save")
     @mock.patch("esi_leap.common.notification_utils" "._emit_notification")
-    def test_fulfill(self, mock_notify, mock_save, mock_set_lease, mock_ro):
+    def test_fulfill(self, mock_notify, mock_save, mock_set_lease, mock_ro, mock_lgbu):
         lease = lease_obj.Lease(self.context, **self.test_lease_dict)
+        mock_lgbu.return_value.status = statuses.CREATED
         test_node = FakeNode(uuidutils.generate_uuid(), "12345")
 
         mock_ro.return_value = test_node
@@ -281,12 +339,16 @@ class TestLeaseObject(base.DBTestCase):
         mock_save.assert_called_once()
         self.assertEqual(lease.status, statuses.ACTIVE)
 
+    @mock.patch("esi_leap.db.sqlalchemy.api.lease_get_by_uuid")
     @mock.patch("esi_leap.objects.lease.Lease.resource_object")
     @mock.patch("esi_leap.resource_objects.fake_node.FakeNode.set_lease")
     @mock.patch("esi_leap.objects.lease.Lease.save")
     @mock.patch("esi_leap.common.notification_utils" "._emit_notification")
-    def test_fulfill_error(self, mock_notify, mock_save, mock_set_lease, mock_ro):
+    def test_fulfill_error(
+        self, mock_notify, mock_save, mock_set_lease, mock_ro, mock_lgbu
+    ):
         lease = lease_obj.Lease(self.context, **self.test_lease_dict)
+        mock_lgbu.return_value.status = statuses.CREATED
         test_node = FakeNode(uuidutils.generate_uuid(), "12345")
 
         mock_ro.return_value = test_node
@@ -321,6 +383,54 @@ class TestLeaseObject(base.DBTestCase):
         mock_save.assert_called_once()
         self.assertEqual(lease.status, statuses.WAIT_FULFILL)
 
+    @mock.patch("esi_leap.db.sqlalchemy.api.lease_get_by_uuid")
+    @mock.patch("esi_leap.objects.lease.Lease.resource_object")
+    @mock.patch("esi_leap.objects.lease.Lease.save")
+    def test_fulfill_wait_cancel(self, mock_save, mock_ro, mock_lgbu):
+        lease = lease_obj.Lease(self.context, **self.test_lease_dict)
+        mock_lgbu.return_value.status = statuses.WAIT_CANCEL
+
+        lease.fulfill()
+
+        mock_ro.assert_not_called()
+        mock_save.assert_not_called()
+        self.assertEqual(statuses.CREATED, lease.status)
+
+    @mock.patch("esi_leap.db.sqlalchemy.api.lease_get_by_uuid")
+    @mock.patch("esi_leap.objects.lease.Lease.save")
+    def test_request_cancel(self, mock_save, mock_lgbu):
+        lease = lease_obj.Lease(self.context, **self.test_lease_dict)
+        mock_lgbu.return_value.status = statuses.ACTIVE
+
+        with mock.patch.object(lease_obj.utils, "lock") as mock_lock:
+            lease.request_cancel(self.context)
+
+        mock_lock.assert_called_once_with("dummy_node-1718", external=True)
+        mock_lgbu.assert_called_once_with(lease.uuid)
+        mock_save.assert_called_once_with(self.context)
+        self.assertEqual(statuses.WAIT_CANCEL, lease.status)
+
+    @mock.patch("esi_leap.db.sqlalchemy.api.lease_get_by_uuid")
+    @mock.patch("esi_leap.objects.lease.Lease.save")
+    def test_request_cancel_expired(self, mock_save, mock_lgbu):
+        lease = lease_obj.Lease(self.context, **self.test_lease_dict)
+        mock_lgbu.return_value.status = statuses.EXPIRED
+
+        self.assertRaises(
+            exception.LeaseInvalidState, lease.request_cancel, self.context
+        )
+        mock_save.assert_not_called()
+        self.assertEqual(statuses.CREATED, lease.status)
+
+    @mock.patch("esi_leap.db.sqlalchemy.api.lease_get_by_uuid")
+    @mock.patch("esi_leap.objects.lease.Lease.save")
+    def test_request_cancel_deleted(self, mock_save, mock_lgbu):
+        lease = lease_obj.Lease(self.context, **self.test_lease_dict)
+        mock_lgbu.return_value = None
+
+        self.assertRaises(exception.LeaseNotFound, lease.request_cancel, self.context)
+        mock_save.assert_not_called()
+
     @mock.patch("esi_leap.resource_objects.fake_node.FakeNode.set_lease")
     @mock.patch("esi_leap.objects.lease.Lease.get")
     @mock.patch("esi_leap.objects.lease.Lease.resource_object")
@@ -226,6 +226,48 @@ class TestOfferObject(base.DBTestCase):
         a = o.get_availabilities()
         self.assertEqual(a, expect)
 
+    @mock.patch("esi_leap.db.sqlalchemy.api.offer_get_conflict_times_by_offer")
+    @mock.patch("esi_leap.objects.offer.datetime")
+    def test_get_availabilities_by_offer(self, mock_datetime, mock_ogctbo):
+        o1 = offer.Offer(self.context, **self.test_offer_data)
+        o2 = offer.Offer(self.context, **self.test_offer_data)
+        o2.uuid = uuidutils.generate_uuid()
+        o3 = offer.Offer(self.context, **self.test_offer_data)
+        o3.uuid = uuidutils.generate_uuid()
+        o3.status = statuses.DELETED
+
+        now = o1.start_time + datetime.timedelta(days=-5)
+        mock_datetime.datetime.now = mock.Mock(return_value=now)
+        mock_ogctbo.return_value = [
+            (
+                o1.uuid,
+                o1.start_time + datetime.timedelta(days=10),
+                o1.start_time + datetime.timedelta(days=20),
+            ),
+            (
+                o1.uuid,
+                o1.start_time + datetime.timedelta(days=50),
+                o1.start_time + datetime.timedelta(days=60),
+            ),
+        ]
+        expect = {
+            o1.uuid: [
+                [o1.start_time, o1.start_time + datetime.timedelta(days=10)],
+                [
+                    o1.start_time + datetime.timedelta(days=20),
+                    o1.start_time + datetime.timedelta(days=50),
+                ],
+                [o1.start_time + datetime.timedelta(days=60), o1.end_time],
+            ],
+            o2.uuid: [[o2.start_time, o2.end_time]],
+            o3.uuid: [],
+        }
+
+        a = offer.Offer.get_availabilities_by_offer([o1, o2, o3])
+
+        mock_ogctbo.assert_called_once_with([o1.uuid, o2.uuid])
+        self.assertEqual(a, expect)
+
     @mock.patch("esi_leap.db.sqlalchemy.api.resource_verify_availability")
     @mock.patch("esi_leap.db.sqlalchemy.api.offer_create")
     def test_create(self, mock_oc, mock_rva):
@@ -239,6 +281,20 @@ class TestOfferObject(base.DBTestCase):
         )
         mock_oc.assert_called_once_with(self.test_offer_create_data)
 
+    @mock.patch("esi_leap.common.utils.lock")
+    @mock.patch("esi_leap.db.sqlalchemy.api.resource_verify_availability")
+    @mock.patch("esi_leap.db.sqlalchemy.api.offer_create")
+    def test_create_overlap_enforced_by_database(self, mock_oc, mock_rva, mock_lock):
+        self.config(overlap_enforcement="database", group="api")
+        o = offer.Offer(self.context, **self.test_offer_create_data)
+        mock_oc.return_value = self.test_offer_data
+
+        o.create(self.context)
+
+        mock_lock.assert_not_called()
+        mock_rva.assert_not_called()
+        mock_oc.assert_called_once_with(self.test_offer_create_data)
+
     def test_create_invalid_time(self):
         start = self.test_offer_data["start_time"]
         bad_offer = {
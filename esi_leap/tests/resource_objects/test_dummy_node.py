@@ -79,6 +79,34 @@ class TestDummyNode(base.TestCase):
     def test_get_name(self):
         self.assertEqual("dummy-node-1111", self.fake_dummy_node.get_name())
 
+    def test_get_many(self):
+        mock_open = mock.mock_open(read_data=self.fake_read_data_1)
+        with mock.patch("builtins.open", mock_open) as mock_file_open:
+            resources = dummy_node.DummyNode.get_many(["1111"])
+            mock_file_open.assert_called_once()
+
+        self.assertEqual(
+            {
+                "1111": {
+                    "name": "dummy-node-1111",
+                    "resource_class": "fake",
+                    "properties": self.test_node_1["properties"],
+                    "owner_project_id": "123456",
+                    "lessee_project_id": "654321",
+                }
+            },
+            resources,
+        )
+
+    def test_get_many_not_found(self):
+        mock_open = mock.mock_open()
+        mock_open.side_effect = FileNotFoundError
+        with mock.patch("builtins.open", mock_open):
+            resources = dummy_node.DummyNode.get_many(["1111"])
+
+        self.assertEqual("unknown-class", resources["1111"]["resource_class"])
+        self.assertEqual("unknown-owner", resources["1111"]["owner_project_id"])
+
     def test_get_resource_class(self):
         mock_open = mock.mock_open(read_data=self.fake_read_data_1)
         with mock.patch("builtins.open", mock_open) as mock_file_open:
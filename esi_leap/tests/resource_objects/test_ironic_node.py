@@ -16,6 +16,7 @@ from ironicclient.common.apiclient import exceptions as ir_exception
 import mock
 
 from esi_leap.common import exception
+from esi_leap.common import ironic
 from esi_leap.common import statuses
 from esi_leap.resource_objects import ironic_node
 from esi_leap.tests import base
@@ -58,6 +59,69 @@ class TestIronicNode(base.TestCase):
         test_ironic_node = ironic_node.IronicNode(fake_uuid)
         self.assertEqual(fake_uuid, test_ironic_node.get_uuid())
 
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.common.ironic.get_cached_node_list")
+    def test_get_many_cached(self, mock_gcnl, mock_gnl):
+        mock_gcnl.return_value = ironic.NodeList([FakeIronicNode()])
+
+        resources = ironic_node.IronicNode.get_many([fake_uuid, "missing"])
+
+        mock_gnl.assert_not_called()
+        self.assertEqual(
+            {
+                fake_uuid: {
+                    "name": "fake-node",
+                    "resource_class": "baremetal",
+                    "properties": {"cpu": "40"},
+                    "owner_project_id": "123456",
+                    "lessee_project_id": "abcdef",
+                },
+                "missing": {
+                    "name": "",
+                    "resource_class": "",
+                    "properties": {},
+                    "owner_project_id": "",
+                    "lessee_project_id": "",
+                },
+            },
+            resources,
+        )
+
+    @mock.patch.object(ironic_node, "get_ironic_client", autospec=True)
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.common.ironic.get_cached_node_list")
+    def test_get_many_individually(self, mock_gcnl, mock_gnl, mock_client):
+        mock_gcnl.return_value = None
+
+        def node_get(uuid, fields=None):
+            self.assertEqual(list(ironic.ENRICHMENT_FIELDS), fields)
+            if uuid != fake_uuid:
+                raise ir_exception.NotFound()
+            return FakeIronicNode()
+
+        mock_client.return_value.node.get.side_effect = node_get
+
+        resources = ironic_node.IronicNode.get_many([fake_uuid, "missing"])
+
+        mock_gnl.assert_not_called()
+        self.assertEqual(2, mock_client.return_value.node.get.call_count)
+        self.assertEqual("fake-node", resources[fake_uuid]["name"])
+        self.assertEqual("", resources["missing"]["name"])
+
+    @mock.patch.object(ironic_node, "get_ironic_client", autospec=True)
+    @mock.patch("esi_leap.common.ironic.get_node_list")
+    @mock.patch("esi_leap.common.ironic.get_cached_node_list")
+    def test_get_many_bulk(self, mock_gcnl, mock_gnl, mock_client):
+        self.config(node_get_many_threshold=1, group="ironic")
+        mock_gcnl.return_value = None
+        mock_gnl.return_value = ironic.NodeList([FakeIronicNode()])
+
+        resources = ironic_node.IronicNode.get_many([fake_uuid, "missing"])
+
+        mock_gnl.assert_called_once_with(fields=ironic.ENRICHMENT_FIELDS)
+        mock_client.return_value.node.get.assert_not_called()
+        self.assertEqual("fake-node", resources[fake_uuid]["name"])
+
     @mock.patch("esi_leap.resource_objects.ironic_node.IronicNode._get_node")
     def test_get_name(self, mock_gn):
         test_ironic_node = ironic_node.IronicNode(fake_uuid)
@@ -151,11 +215,15 @@ class TestIronicNode(base.TestCase):
         mock_gn.assert_called_once()
 
     @mock.patch.object(ironic_node, "get_ironic_client", autospec=True)
-    def test_set_lease(self, client_mock):
+    @mock.patch("esi_leap.common.ironic.invalidate_node_list_cache")
+    def test_set_lease(self, mock_inlc, client_mock):
         test_ironic_node = ironic_node.IronicNode(fake_uuid)
+        test_ironic_node._node = FakeIronicNode()
         fake_lease = FakeLease()
 
         test_ironic_node.set_lease(fake_lease)
+        self.assertIsNone(test_ironic_node._node)
+        mock_inlc.assert_called_once_with()
         client_mock.assert_called_once()
         client_mock.return_value.node.update.assert_called_once_with(
             fake_uuid,
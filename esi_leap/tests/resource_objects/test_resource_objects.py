@@ -94,3 +94,39 @@ class TestResourceObjects(base.TestCase):
             "foo_node",
             "1111",
         )
+
+    @mock.patch("esi_leap.resource_objects.ironic_node.get_ironic_client")
+    def test_identity_map(self, mock_gic):
+        mock_gic.return_value.node.get.return_value = mock.MagicMock(uuid="1111")
+
+        with resource_objects.identity_map():
+            node = resource_objects.get_resource_object("ironic_node", "node-name")
+            self.assertIs(
+                node, resource_objects.get_resource_object("ironic_node", "node-name")
+            )
+            self.assertIs(
+                node, resource_objects.get_resource_object("ironic_node", "1111")
+            )
+            self.assertIsNot(
+                node, resource_objects.get_resource_object("dummy_node", "1111")
+            )
+
+            # a nested map shares the outer one and leaves it active
+            with resource_objects.identity_map():
+                self.assertIs(
+                    node, resource_objects.get_resource_object("ironic_node", "1111")
+                )
+            self.assertIs(
+                node, resource_objects.get_resource_object("ironic_node", "1111")
+            )
+
+        mock_gic.return_value.node.get.assert_called_once_with("node-name")
+        self.assertIsNot(
+            node, resource_objects.get_resource_object("ironic_node", "1111")
+        )
+
+    def test_identity_map_inactive(self):
+        self.assertIsNot(
+            resource_objects.get_resource_object("dummy_node", "1111"),
+            resource_objects.get_resource_object("dummy_node", "1111"),
+        )
@@ -66,6 +66,20 @@ class TestFakeNode(base.TestCase):
     def test_get_lessee_project_id(self):
         self.assertEqual(self.fake_test_node.get_lessee_project_id(), "123456")
 
+    def test_get_many(self):
+        self.assertEqual(
+            {
+                "1111": {
+                    "name": "test-node-1111",
+                    "resource_class": "fake",
+                    "properties": {},
+                    "owner_project_id": "12345",
+                    "lessee_project_id": "12345",
+                }
+            },
+            fake_node.FakeNode.get_many(["1111"]),
+        )
+
     def test_set_lease(self):
         fake_lease = get_test_lease()
         self.assertEqual(self.fake_test_node.set_lease(fake_lease), None)